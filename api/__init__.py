@@ -1,14 +1,19 @@
 # api/__init__.py
 """API модули для взаимодействия с Bybit, DeepSeek и Telegram"""
 
-from .bybit_api import BybitAPI, BybitAPIError
+from .async_bybit_api import AsyncBybitAPI, close_async_bybit, get_async_bybit
+from .bybit_api import BybitAPI, BybitAPIError, close_shared_session
 from .deepseek_api import DeepSeekAPI
 from .tg_notify import notify, send_telegram_message
 
 __all__ = [
+    'AsyncBybitAPI',
     'BybitAPI',
     'BybitAPIError',
+    'close_async_bybit',
+    'close_shared_session',
     'DeepSeekAPI',
+    'get_async_bybit',
     'notify',
     'send_telegram_message'
 ]
@@ -0,0 +1,424 @@
+"""Asyncio Bybit V5 client for coroutines running on the Telegram event loop.
+
+``AsyncBybitAPI`` mirrors the read side of :class:`api.bybit_api.BybitAPI`:
+the same signing, retry delays, retCode handling and dry-run write block, and
+the same class-level instrument, server-time and ticker caches.  Order
+placement and reconciliation stay on the synchronous client under the
+execution lock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from decimal import Decimal
+from typing import Any, Optional
+
+import aiohttp
+from loguru import logger
+from yarl import URL
+
+from api.bybit_api import (
+    HTTP_POOL_SIZE,
+    READ_ATTEMPTS,
+    TICKER_CACHE_SECONDS,
+    BybitAmbiguousWriteError,
+    BybitAPIError,
+    BybitClientBase,
+    InstrumentRules,
+    _decimal,
+    _next_cursor,
+    _object_rows,
+)
+from config import (
+    BYBIT_API_KEY,
+    BYBIT_API_SECRET,
+    BYBIT_BASE_URL,
+    BYBIT_CATEGORY,
+    BYBIT_HTTP_TIMEOUT_SECONDS,
+    DRY_RUN,
+)
+
+
+class _RetryableHTTPError(Exception):
+    """HTTP 429/5xx or retCode 10006, retried like a transport failure."""
+
+
+_TRANSPORT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, _RetryableHTTPError)
+
+
+class AsyncBybitAPI(BybitClientBase):
+    def __init__(
+        self,
+        api_key: str = BYBIT_API_KEY,
+        api_secret: str = BYBIT_API_SECRET,
+        base: str = BYBIT_BASE_URL,
+        *,
+        dry_run: bool = DRY_RUN,
+        timeout: float = BYBIT_HTTP_TIMEOUT_SECONDS,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        super().__init__(
+            api_key,
+            api_secret,
+            base,
+            dry_run=dry_run,
+            timeout=timeout,
+        )
+        self._owns_session = session is None
+        self._session = session
+        self._ticker_fetch_lock: Optional[asyncio.Lock] = None
+
+    def _client_session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session binds to the loop that first uses it.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={
+                    "Content-Type": "application/json",
+                    "User-Agent": "soroka01-crypto-bot/2",
+                },
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    @staticmethod
+    async def _decode(response: aiohttp.ClientResponse) -> dict[str, Any]:
+        if response.status == 403:
+            raise BybitAPIError("Bybit отклонил запрос (HTTP 403)", response=response)
+        if response.status == 429 or response.status >= 500:
+            raise _RetryableHTTPError(f"HTTP {response.status}")
+        response.raise_for_status()
+        text = await response.text()
+        try:
+            data = json.loads(text)
+        except ValueError as error:
+            raise BybitAPIError(
+                f"Bybit вернул не-JSON ответ HTTP {response.status}",
+                response=response,
+            ) from error
+        if not isinstance(data, dict):
+            raise BybitAPIError("Bybit вернул JSON неожиданного типа", response=data)
+        return data
+
+    async def _public_get(self, endpoint: str, params: Optional[dict[str, Any]] = None) -> dict:
+        session = self._client_session()
+        url = f"{self.base}{endpoint}"
+        last_error: Optional[Exception] = None
+        limiter = self._rate_limiter("GET", private=False, endpoint=endpoint)
+        for attempt in range(1, READ_ATTEMPTS + 1):
+            response: Optional[aiohttp.ClientResponse] = None
+            try:
+                await limiter.acquire_async()
+                async with session.get(url, params=params or {}) as response:
+                    self._capture_rate_headers(response.headers, limiter)
+                    data = await self._decode(response)
+                code = data.get("retCode")
+                if code == 0:
+                    if not isinstance(data.get("result"), dict):
+                        raise BybitAPIError(
+                            f"Bybit public GET {endpoint} вернул повреждённый result",
+                            response=data,
+                        )
+                    return data
+                if code == 10006:
+                    raise _RetryableHTTPError("Bybit rate limit")
+                raise BybitAPIError(
+                    str(data.get("retMsg", "Unknown public API error")),
+                    code=code,
+                    response=data,
+                )
+            except BybitAPIError:
+                raise
+            except _TRANSPORT_ERRORS as error:
+                last_error = error
+                if attempt >= READ_ATTEMPTS:
+                    break
+                await asyncio.sleep(self._retry_delay(attempt, response))
+        raise BybitAPIError(f"Ошибка публичного запроса Bybit: {last_error}") from last_error
+
+    async def sync_server_time(self) -> int:
+        before = int(time.time() * 1_000)
+        data = await self._public_get("/v5/market/time")
+        after = int(time.time() * 1_000)
+        return self._store_time_offset(self._time_from_response(data), before, after)
+
+    async def _ensure_time_sync(self) -> None:
+        if self._reuse_time_sync():
+            return
+        try:
+            await self.sync_server_time()
+        except Exception as error:
+            logger.warning(f"Не удалось синхронизировать время Bybit, использую системное: {error}")
+
+    async def _private_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[dict[str, Any]] = None,
+    ) -> dict:
+        method = method.upper()
+        payload = dict(params or {})
+        if method != "GET" and self.dry_run:
+            return self._dry_run_response(method, endpoint, payload)
+        if not self.api_key or not self.api_secret:
+            raise BybitAPIError("Не заданы BYBIT_API_KEY или BYBIT_API_SECRET")
+
+        await self._ensure_time_sync()
+        session = self._client_session()
+        url = f"{self.base}{endpoint}"
+        max_attempts = READ_ATTEMPTS if method == "GET" else 2
+        order_link_id = str(payload.get("orderLinkId") or "") or None
+        resynced = False
+        limiter = self._rate_limiter(method, private=True, endpoint=endpoint)
+
+        for attempt in range(1, max_attempts + 1):
+            await limiter.acquire_async()
+            query_string, body, headers = self._signed_request(method, payload)
+            # The query is already encoded and signed; yarl must not requote it.
+            request_url = URL(f"{url}?{query_string}" if query_string else url, encoded=True)
+            response: Optional[aiohttp.ClientResponse] = None
+            try:
+                async with session.request(
+                    method,
+                    request_url,
+                    headers=headers,
+                    data=body.encode("utf-8") if body else None,
+                ) as response:
+                    self._capture_rate_headers(response.headers, limiter)
+                    try:
+                        data = await self._decode(response)
+                    except BybitAPIError as error:
+                        if method != "GET" and response.status != 403:
+                            raise BybitAmbiguousWriteError(
+                                f"Bybit принял {endpoint}, но ответ невозможно разобрать",
+                                endpoint=endpoint,
+                                order_link_id=order_link_id,
+                                response=response,
+                            ) from error
+                        raise
+            except BybitAPIError:
+                raise
+            except _TRANSPORT_ERRORS as error:
+                if method != "GET":
+                    raise BybitAmbiguousWriteError(
+                        f"Неопределённый результат {endpoint}: {error}",
+                        endpoint=endpoint,
+                        order_link_id=order_link_id,
+                        response=response,
+                    ) from error
+                if attempt >= max_attempts:
+                    raise BybitAPIError(f"Ошибка приватного GET Bybit: {error}") from error
+                await asyncio.sleep(self._retry_delay(attempt, response))
+                continue
+
+            code = data.get("retCode")
+            if not isinstance(code, int):
+                if method != "GET":
+                    raise BybitAmbiguousWriteError(
+                        f"Bybit вернул неопределённый ответ на {endpoint}",
+                        endpoint=endpoint,
+                        order_link_id=order_link_id,
+                        response=data,
+                    )
+                raise BybitAPIError(
+                    f"Bybit GET {endpoint} не содержит корректный retCode",
+                    response=data,
+                )
+            if code == 0:
+                if not isinstance(data.get("result"), dict):
+                    if method != "GET":
+                        raise BybitAmbiguousWriteError(
+                            f"Bybit вернул повреждённый result на {endpoint}",
+                            endpoint=endpoint,
+                            order_link_id=order_link_id,
+                            response=data,
+                        )
+                    raise BybitAPIError(
+                        f"Bybit GET {endpoint} вернул повреждённый result",
+                        response=data,
+                    )
+                return data
+            message = str(data.get("retMsg", "Unknown error"))
+            if code == 10002 and not resynced:
+                await self.sync_server_time()
+                resynced = True
+                continue
+            if code == 10006 and attempt < max_attempts:
+                await asyncio.sleep(self._retry_delay(attempt, response))
+                continue
+            raise BybitAPIError(message, code=code, response=data)
+
+        raise BybitAPIError(f"Bybit не выполнил запрос {endpoint}")
+
+    # ---- Public market data -------------------------------------------------
+    async def _ticker_snapshot(
+        self,
+        max_age: float = TICKER_CACHE_SECONDS,
+    ) -> tuple[int, dict[str, dict]]:
+        """Same bulk snapshot as the sync client; one request per loop at a time."""
+        cached = self._cached_tickers(max_age)
+        if cached:
+            return cached
+        requested_at = time.monotonic()
+        if self._ticker_fetch_lock is None:
+            self._ticker_fetch_lock = asyncio.Lock()
+        async with self._ticker_fetch_lock:
+            cached = self._fresh_tickers_since(requested_at)
+            if cached:
+                return cached
+            return self._store_tickers(
+                await self._public_get(
+                    "/v5/market/tickers",
+                    params={"category": BYBIT_CATEGORY},
+                )
+            )
+
+    async def get_all_tickers(
+        self,
+        *,
+        max_age: float = TICKER_CACHE_SECONDS,
+    ) -> dict[str, dict]:
+        _, rows = await self._ticker_snapshot(max_age)
+        return {symbol: dict(row) for symbol, row in rows.items()}
+
+    async def get_tickers(
+        self,
+        symbol: str,
+        *,
+        max_age: float = TICKER_CACHE_SECONDS,
+    ) -> dict:
+        streamed = self._streamed_ticker_response(symbol, max_age)
+        if streamed is not None:
+            return streamed
+        return self._single_ticker_response(symbol, *(await self._ticker_snapshot(max_age)))
+
+    async def get_kline(self, symbol: str, interval: str, limit: int = 200) -> dict:
+        return await self._public_get(
+            "/v5/market/kline",
+            params={
+                "category": BYBIT_CATEGORY,
+                "symbol": symbol.upper(),
+                "interval": str(interval),
+                "limit": max(1, min(int(limit), 1_000)),
+            },
+        )
+
+    async def get_instrument_rules(
+        self,
+        symbol: str,
+        *,
+        refresh: bool = False,
+    ) -> InstrumentRules:
+        symbol = symbol.upper()
+        cached = self._cached_instrument(self.base, symbol, refresh)
+        if cached:
+            return cached
+        fetched_at = time.monotonic()
+        response = await self._public_get(
+            "/v5/market/instruments-info",
+            params={"category": BYBIT_CATEGORY, "symbol": symbol},
+        )
+        return self._store_instrument(self.base, symbol, response, fetched_at)
+
+    # ---- Account and positions ---------------------------------------------
+    async def _paginated(
+        self,
+        endpoint: str,
+        base_params: dict[str, Any],
+    ) -> dict:
+        rows: list[dict[str, Any]] = []
+        cursor = ""
+        seen_cursors: set[str] = set()
+        first: Optional[dict] = None
+        while True:
+            params = dict(base_params)
+            if cursor:
+                params["cursor"] = cursor
+            response = await self._private_request("GET", endpoint, params=params)
+            first = first or response
+            rows.extend(_object_rows(response, endpoint))
+            next_cursor = _next_cursor(response, endpoint)
+            if not next_cursor:
+                break
+            if next_cursor in seen_cursors:
+                raise BybitAPIError(
+                    f"Bybit {endpoint} повторил pagination cursor",
+                    response=response,
+                )
+            seen_cursors.add(next_cursor)
+            cursor = next_cursor
+        return self._merge_pages(first, rows)
+
+    async def get_positions(
+        self,
+        symbol: Optional[str] = None,
+        settle_coin: Optional[str] = "USDT",
+        *,
+        category: str = BYBIT_CATEGORY,
+    ) -> dict:
+        params: dict[str, Any] = {"category": category, "limit": 200}
+        if symbol:
+            params["symbol"] = symbol.upper()
+        elif settle_coin:
+            params["settleCoin"] = settle_coin
+        return await self._paginated("/v5/position/list", params)
+
+    async def get_open_orders(
+        self,
+        symbol: Optional[str] = None,
+        *,
+        category: str = BYBIT_CATEGORY,
+        settle_coin: Optional[str] = "USDT",
+    ) -> dict:
+        params: dict[str, Any] = {"category": category, "limit": 50}
+        if symbol:
+            params["symbol"] = symbol.upper()
+        elif settle_coin:
+            params["settleCoin"] = settle_coin
+        return await self._paginated("/v5/order/realtime", params)
+
+    async def get_wallet_balance(self, account_type: str = "UNIFIED") -> dict:
+        return await self._private_request(
+            "GET",
+            "/v5/account/wallet-balance",
+            params={"accountType": account_type},
+        )
+
+    async def get_account_info(self) -> dict:
+        return await self._private_request("GET", "/v5/account/info", params={})
+
+    async def get_fee_rate(self, symbol: str) -> Decimal:
+        response = await self._private_request(
+            "GET",
+            "/v5/account/fee-rate",
+            params={"category": BYBIT_CATEGORY, "symbol": symbol.upper()},
+        )
+        rows = _object_rows(response, "/v5/account/fee-rate")
+        if not rows:
+            raise BybitAPIError(f"Bybit не вернул комиссию для {symbol}")
+        return _decimal(rows[0].get("takerFeeRate", "0"))
+
+
+_async_client: Optional[AsyncBybitAPI] = None
+
+
+def get_async_bybit() -> AsyncBybitAPI:
+    """Loop-wide client; its single aiohttp session serves every handler."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncBybitAPI()
+    return _async_client
+
+
+async def close_async_bybit() -> None:
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.close()
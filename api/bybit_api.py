@@ -14,29 +14,70 @@ import random
 import threading
 import time
 import uuid
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, fields
 from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP, ROUND_UP
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Hashable, Mapping, Optional
 from urllib.parse import urlencode
 
 import requests
 from loguru import logger
-
+from requests.adapters import HTTPAdapter
+
+from api.bybit_private_stream import account_stream, start_private_stream, stop_private_stream
+from api.bybit_stream import market_stream
+from api.bybit_trade_stream import (
+    TradeStreamUnavailable,
+    start_trade_stream,
+    stop_trade_stream,
+    trade_stream,
+)
+from api.rate_limit import (
+    GROUP_PRIVATE_READ,
+    GROUP_PRIVATE_WRITE,
+    GROUP_PUBLIC,
+    PRIORITY_ORDER,
+    RequestLimiter,
+    current_priority,
+    request_limiter,
+    order_priority,
+)
 from config import (
+    ACCOUNT_STREAM_ENABLED,
     BYBIT_API_KEY,
     BYBIT_API_SECRET,
     BYBIT_BASE_URL,
     BYBIT_CATEGORY,
     BYBIT_HTTP_TIMEOUT_SECONDS,
     BYBIT_MAX_SLIPPAGE_PERCENT,
+    BYBIT_PRIVATE_WS_URL,
+    BYBIT_PUBLIC_CACHE_MS,
     BYBIT_RECV_WINDOW_MS,
+    BYBIT_TRADE_WS_URL,
     DRY_RUN,
+    FALLBACK_TAKER_FEE_RATE,
+    ORDER_WS_ENABLED,
 )
 
 
 READ_ATTEMPTS = 3
 INSTRUMENT_CACHE_SECONDS = 3_600
+TICKER_CACHE_SECONDS = 1.0
+FEE_CACHE_SECONDS = 3_600
+# After a failed fee refresh, the last known rates serve this long.
+FEE_RETRY_SECONDS = 60.0
+# Keep-alive connections shared by UI worker threads, the bounded market-data
+# fetch pool and the auto loop.
+HTTP_POOL_SIZE = 32
 MAX_HISTORY_WINDOW_MS = 7 * 24 * 60 * 60 * 1_000
+# While the private stream is live, one REST reconciliation per this many
+# seconds covers an event that never arrives.
+STREAM_RECONCILE_SECONDS = 2.0
+# Order writes the trade WebSocket can carry instead of REST.
+TRADE_STREAM_OPS = {
+    "/v5/order/create": "order.create",
+    "/v5/order/cancel": "order.cancel",
+}
 TERMINAL_ORDER_STATUSES = {
     "Filled",
     "Cancelled",
@@ -211,21 +252,209 @@ class InstrumentRules:
             )
 
 
-class BybitAPI:
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class InstrumentDiff:
+    """Symbols whose parsed rules differ between two instrument lists."""
+
+    added: tuple[str, ...] = ()
+    # symbol -> names of the changed InstrumentRules fields
+    changed: tuple[tuple[str, tuple[str, ...]], ...] = ()
+    removed: tuple[str, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def _rule_changes(old: InstrumentRules, new: InstrumentRules) -> tuple[str, ...]:
+    return tuple(
+        field.name
+        for field in fields(InstrumentRules)
+        if getattr(old, field.name) != getattr(new, field.name)
+    )
+
+
+def _session_headers(session: requests.Session) -> None:
+    session.headers.update(
+        {
+            "Content-Type": "application/json",
+            "User-Agent": "soroka01-crypto-bot/2",
+        }
+    )
+
+
+def shared_session() -> requests.Session:
+    """Process-wide keep-alive session so refreshes skip the TLS handshake."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=HTTP_POOL_SIZE,
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session_headers(session)
+            _shared_session = session
+        return _shared_session
+
+
+def close_shared_session() -> None:
+    """Close pooled connections once at shutdown; a later client reopens them."""
+    global _shared_session
+    with _shared_session_lock:
+        session, _shared_session = _shared_session, None
+    if session is not None:
+        session.close()
+
+
+class _InFlight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[dict] = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestCoalescer:
+    """Single-flight with an optional micro-TTL for identical public GETs.
+
+    Concurrent callers with the same key wait for the first caller's
+    response instead of sending their own.  Responses are shared, so callers
+    must treat them as read-only.
+    """
+
+    def __init__(self, ttl_seconds: float = 0.0) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, _InFlight] = {}
+        self._recent: dict[Hashable, tuple[float, dict]] = {}
+        self.hits = 0
+        self.joined = 0
+        self.misses = 0
+
+    def fetch(self, key: Hashable, loader: Callable[[], dict]) -> dict:
+        with self._lock:
+            cached = self._recent.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+                self.hits += 1
+                return cached[1]
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._in_flight[key] = _InFlight()
+                self.misses += 1
+            else:
+                self.joined += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result  # type: ignore[return-value]
+        try:
+            flight.result = loader()
+            return flight.result
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if flight.error is None and self.ttl_seconds > 0:
+                    now = time.monotonic()
+                    self._recent = {
+                        cached_key: entry
+                        for cached_key, entry in self._recent.items()
+                        if now - entry[0] < self.ttl_seconds
+                    }
+                    self._recent[key] = (now, flight.result)
+            flight.done.set()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "joined": self.joined, "misses": self.misses}
+
+
+_public_gets = RequestCoalescer(BYBIT_PUBLIC_CACHE_MS / 1_000)
+
+
+def public_get_stats() -> dict[str, int]:
+    """Counters of the shared public GET layer: TTL hits, joins, requests."""
+    return _public_gets.stats()
+
+
+class AckLatency:
+    """Recent submit-to-acknowledgement times of order writes per transport."""
+
+    def __init__(self, size: int = 200) -> None:
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+        self._size = size
+
+    def record(self, transport: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(transport, deque(maxlen=self._size))
+            samples.append(seconds * 1_000)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            samples = {transport: sorted(rows) for transport, rows in self._samples.items()}
+        return {
+            transport: {
+                "count": len(rows),
+                "p50_ms": rows[len(rows) // 2],
+                "p95_ms": rows[min(len(rows) - 1, int(len(rows) * 0.95))],
+                "max_ms": rows[-1],
+            }
+            for transport, rows in samples.items()
+            if rows
+        }
+
+
+_order_acks = AckLatency()
+
+
+def order_ack_stats() -> dict[str, dict[str, float]]:
+    """Submit-to-ACK latency of order create/cancel by transport (rest, ws)."""
+    return _order_acks.stats()
+
+
+class BybitClientBase:
+    """Transport-independent signing, clock and cache state of a V5 client.
+
+    The synchronous and asyncio clients share these class-level caches, so
+    instrument rules, server offsets and tickers are fetched once per host
+    and fee rates once per account.
+    """
+
     _instrument_cache: dict[tuple[str, str], tuple[float, InstrumentRules]] = {}
     _instrument_lock = threading.Lock()
     _time_cache: dict[str, tuple[float, int]] = {}
     _time_lock = threading.Lock()
+    # base -> (monotonic fetch time, server time ms, rows by symbol).
+    _ticker_cache: dict[str, tuple[float, int, dict[str, dict]]] = {}
+    _ticker_lock = threading.Lock()
+    # (base, api key) -> (monotonic fetch time, taker fee by symbol); a
+    # failed refresh keeps the last known good rates.
+    _fee_cache: dict[tuple[str, str], tuple[float, dict[str, Decimal]]] = {}
+    # (base, api key) -> monotonic time before which a failed refresh is not retried.
+    _fee_retry_at: dict[tuple[str, str], float] = {}
+    _fee_lock = threading.Lock()
 
     def __init__(
         self,
-        api_key: str = BYBIT_API_KEY,
-        api_secret: str = BYBIT_API_SECRET,
-        base: str = BYBIT_BASE_URL,
+        api_key: str,
+        api_secret: str,
+        base: str,
         *,
-        dry_run: bool = DRY_RUN,
-        timeout: float = BYBIT_HTTP_TIMEOUT_SECONDS,
-        session: Optional[requests.Session] = None,
+        dry_run: bool,
+        timeout: float,
     ) -> None:
         self.api_key = api_key
         self.api_secret = api_secret
@@ -233,13 +462,6 @@ class BybitAPI:
         self.dry_run = dry_run
         self.timeout = timeout
         self.recv_window = str(BYBIT_RECV_WINDOW_MS)
-        self.session = session or requests.Session()
-        self.session.headers.update(
-            {
-                "Content-Type": "application/json",
-                "User-Agent": "soroka01-crypto-bot/2",
-            }
-        )
         self._server_offset_ms = 0
         self._last_time_sync = 0.0
         with self._time_lock:
@@ -248,11 +470,12 @@ class BybitAPI:
             self._last_time_sync, self._server_offset_ms = cached_time
         self.last_rate_limit: dict[str, str] = {}
 
-    def close(self) -> None:
-        self.session.close()
-
     def _now_ms(self) -> str:
-        return str(int(time.time() * 1_000) + self._server_offset_ms)
+        return str(self.server_now_ms())
+
+    def server_now_ms(self) -> int:
+        """Local clock corrected by the last known Bybit server offset."""
+        return int(time.time() * 1_000) + self._server_offset_ms
 
     def _sign_v5(self, timestamp: str, params_str: str = "") -> str:
         """HMAC-SHA256(timestamp + api_key + recv_window + payload)."""
@@ -263,19 +486,86 @@ class BybitAPI:
             hashlib.sha256,
         ).hexdigest()
 
-    def _capture_rate_headers(self, response: requests.Response) -> None:
+    def _signed_request(
+        self,
+        method: str,
+        payload: dict[str, Any],
+    ) -> tuple[str, str, dict[str, str]]:
+        """Return the query string, JSON body and headers of one attempt."""
+        timestamp = self._now_ms()
+        query_string = urlencode(sorted(payload.items())) if method == "GET" else ""
+        body = (
+            ""
+            if method == "GET"
+            else json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+        )
+        signed_payload = query_string if method == "GET" else body
+        headers = {
+            "X-BAPI-API-KEY": self.api_key,
+            "X-BAPI-SIGN": self._sign_v5(timestamp, signed_payload),
+            "X-BAPI-TIMESTAMP": timestamp,
+            "X-BAPI-RECV-WINDOW": self.recv_window,
+            "cdn-request-id": uuid.uuid4().hex,
+        }
+        return query_string, body, headers
+
+    @staticmethod
+    def _dry_run_response(method: str, endpoint: str, payload: dict[str, Any]) -> dict:
+        logger.info(f"[DRY] Заблокирован {method} {endpoint}")
+        return {
+            "retCode": 0,
+            "retMsg": "DRY preview: запрос не отправлен",
+            "result": {
+                "simulated": True,
+                "orderLinkId": payload.get("orderLinkId", ""),
+            },
+        }
+
+    def _store_time_offset(self, server_ms: int, before: int, after: int) -> int:
+        if server_ms <= 0:
+            raise BybitAPIError("Bybit не вернул серверное время")
+        self._server_offset_ms = server_ms - ((before + after) // 2)
+        self._last_time_sync = time.monotonic()
+        with self._time_lock:
+            self._time_cache[self.base] = (
+                self._last_time_sync,
+                self._server_offset_ms,
+            )
+        return self._server_offset_ms
+
+    def _reuse_time_sync(self) -> bool:
+        """Adopt a recent offset from another client; False if a sync is due."""
+        if time.monotonic() - self._last_time_sync < 300:
+            return True
+        with self._time_lock:
+            cached = self._time_cache.get(self.base)
+        if cached and time.monotonic() - cached[0] < 300:
+            self._last_time_sync, self._server_offset_ms = cached
+            return True
+        return False
+
+    def _rate_limiter(self, method: str, private: bool, endpoint: str) -> RequestLimiter:
+        """Shared buckets and priority for one request of this client."""
+        if not private:
+            return request_limiter(self.base, GROUP_PUBLIC, endpoint, current_priority())
+        if method != "GET":
+            return request_limiter(self.base, GROUP_PRIVATE_WRITE, endpoint, PRIORITY_ORDER)
+        return request_limiter(self.base, GROUP_PRIVATE_READ, endpoint, current_priority())
+
+    def _capture_rate_headers(self, headers: Mapping[str, str], limiter: RequestLimiter) -> None:
+        limiter.observe(headers)
         self.last_rate_limit = {
-            key: response.headers.get(key, "")
+            key: str(headers.get(key, ""))
             for key in (
                 "X-Bapi-Limit",
                 "X-Bapi-Limit-Status",
                 "X-Bapi-Limit-Reset-Timestamp",
             )
-            if response.headers.get(key)
+            if headers.get(key)
         }
 
     @staticmethod
-    def _retry_delay(attempt: int, response: Optional[requests.Response] = None) -> float:
+    def _retry_delay(attempt: int, response: Any = None) -> float:
         if response is not None:
             reset = response.headers.get("X-Bapi-Limit-Reset-Timestamp")
             if reset and reset.isdigit():
@@ -290,6 +580,211 @@ class BybitAPI:
                     pass
         return min(4.0, (2 ** (attempt - 1)) + random.uniform(0.05, 0.30))
 
+    @staticmethod
+    def _cached_instrument(
+        base: str,
+        symbol: str,
+        refresh: bool,
+    ) -> Optional[InstrumentRules]:
+        with BybitClientBase._instrument_lock:
+            cached = BybitClientBase._instrument_cache.get((base, symbol))
+        if not refresh and cached and time.monotonic() - cached[0] < INSTRUMENT_CACHE_SECONDS:
+            return cached[1]
+        return None
+
+    @staticmethod
+    def _store_instrument(
+        base: str,
+        symbol: str,
+        response: dict,
+        fetched_at: float,
+    ) -> InstrumentRules:
+        rows = _object_rows(response, "/v5/market/instruments-info")
+        payload = next((row for row in rows if row.get("symbol") == symbol), None)
+        if not payload:
+            raise BybitAPIError(f"Bybit не вернул правила инструмента {symbol}")
+        rules = InstrumentRules.from_payload(payload)
+        with BybitClientBase._instrument_lock:
+            BybitClientBase._instrument_cache[(base, symbol)] = (fetched_at, rules)
+        return rules
+
+    @staticmethod
+    def _install_instruments(
+        base: str,
+        payloads: dict[str, dict[str, Any]],
+        fetched_at: float,
+    ) -> InstrumentDiff:
+        """Replace the host's cached rules with a full instrument list.
+
+        Payloads Bybit returns without complete rules are skipped; the diff
+        compares parsed rules, so a refetch of identical rules is not a change.
+        """
+        parsed: dict[str, InstrumentRules] = {}
+        for symbol, payload in payloads.items():
+            try:
+                parsed[symbol] = InstrumentRules.from_payload(payload)
+            except BybitAPIError:
+                continue
+        with BybitClientBase._instrument_lock:
+            cache = BybitClientBase._instrument_cache
+            previous = {
+                symbol: rules for (host, symbol), (_, rules) in cache.items() if host == base
+            }
+            for symbol in previous.keys() - parsed.keys():
+                del cache[(base, symbol)]
+            for symbol, rules in parsed.items():
+                cache[(base, symbol)] = (fetched_at, rules)
+        changed = []
+        for symbol in sorted(previous.keys() & parsed.keys()):
+            fields_changed = _rule_changes(previous[symbol], parsed[symbol])
+            if fields_changed:
+                changed.append((symbol, fields_changed))
+        return InstrumentDiff(
+            added=tuple(sorted(parsed.keys() - previous.keys())),
+            changed=tuple(changed),
+            removed=tuple(sorted(previous.keys() - parsed.keys())),
+        )
+
+    def _cached_fee_rates(self, max_age: Optional[float]) -> Optional[dict[str, Decimal]]:
+        """Cached taker fees of this account; ``max_age=None`` accepts any age."""
+        with self._fee_lock:
+            cached = self._fee_cache.get((self.base, self.api_key))
+        if cached and (max_age is None or time.monotonic() - cached[0] < max_age):
+            return cached[1]
+        return None
+
+    def _store_fee_rates(self, response: dict) -> dict[str, Decimal]:
+        rates = {
+            str(row["symbol"]): _decimal(row.get("takerFeeRate", "0"))
+            for row in _object_rows(response, "/v5/account/fee-rate")
+            if row.get("symbol")
+        }
+        if not rates:
+            raise BybitAPIError("Bybit не вернул комиссии", response=response)
+        with self._fee_lock:
+            self._fee_cache[(self.base, self.api_key)] = (time.monotonic(), rates)
+            self._fee_retry_at.pop((self.base, self.api_key), None)
+        return rates
+
+    def _fee_retry_pending(self) -> bool:
+        with self._fee_lock:
+            retry_at = self._fee_retry_at.get((self.base, self.api_key), 0.0)
+        return time.monotonic() < retry_at
+
+    @staticmethod
+    def _fee_rates_for(symbols: list[str], rates: dict[str, Decimal]) -> dict[str, Decimal]:
+        fallback = Decimal(str(FALLBACK_TAKER_FEE_RATE))
+        return {symbol.upper(): rates.get(symbol.upper(), fallback) for symbol in symbols}
+
+    def _cached_tickers(self, max_age: float) -> Optional[tuple[int, dict[str, dict]]]:
+        with self._ticker_lock:
+            cached = self._ticker_cache.get(self.base)
+        if cached and time.monotonic() - cached[0] < max_age:
+            return cached[1], cached[2]
+        return None
+
+    def _fresh_tickers_since(self, requested_at: float) -> Optional[tuple[int, dict[str, dict]]]:
+        with self._ticker_lock:
+            cached = self._ticker_cache.get(self.base)
+        if cached and cached[0] >= requested_at:
+            return cached[1], cached[2]
+        return None
+
+    def _store_tickers(self, data: dict) -> tuple[int, dict[str, dict]]:
+        server_ms = int(data.get("time") or time.time() * 1_000)
+        rows = {
+            str(row.get("symbol", "")).upper(): {
+                **row,
+                "_snapshot_time_ms": server_ms,
+            }
+            for row in data["result"].get("list", [])
+            if isinstance(row, dict)
+        }
+        with self._ticker_lock:
+            self._ticker_cache[self.base] = (time.monotonic(), server_ms, rows)
+        return server_ms, rows
+
+    def _streamed_ticker(self, symbol: str) -> Optional[dict]:
+        stream = market_stream(self.base)
+        return stream.ticker(symbol) if stream is not None else None
+
+    def _streamed_ticker_response(self, symbol: str, max_age: float) -> Optional[dict]:
+        """Ticker response from the live stream; ``max_age=0`` always uses REST."""
+        row = self._streamed_ticker(symbol) if max_age > 0 else None
+        if row is None:
+            return None
+        return self._single_ticker_response(
+            symbol,
+            int(row["_snapshot_time_ms"]),
+            {symbol.upper(): row},
+        )
+
+    @staticmethod
+    def _single_ticker_response(
+        symbol: str,
+        server_ms: int,
+        rows: dict[str, dict],
+    ) -> dict:
+        row = rows.get(symbol.upper())
+        return {
+            "retCode": 0,
+            "retMsg": "OK",
+            "result": {
+                "category": BYBIT_CATEGORY,
+                "list": [dict(row)] if row else [],
+            },
+            "time": server_ms,
+        }
+
+    @staticmethod
+    def _merge_pages(first: Optional[dict], rows: list[dict[str, Any]]) -> dict:
+        merged = dict(first or {"retCode": 0, "retMsg": "OK", "result": {}})
+        merged["result"] = {**merged.get("result", {}), "list": rows, "nextPageCursor": ""}
+        return merged
+
+    @staticmethod
+    def _time_from_response(data: dict) -> int:
+        result = data.get("result", {})
+        server_ms = int(data.get("time") or int(result.get("timeNano", "0")) // 1_000_000)
+        if server_ms <= 0:
+            server_ms = int(result.get("timeSecond", "0")) * 1_000
+        return server_ms
+
+
+class BybitAPI(BybitClientBase):
+    _ticker_fetch_locks: dict[str, threading.Lock] = {}
+    _fee_fetch_lock = threading.Lock()
+
+    def __init__(
+        self,
+        api_key: str = BYBIT_API_KEY,
+        api_secret: str = BYBIT_API_SECRET,
+        base: str = BYBIT_BASE_URL,
+        *,
+        dry_run: bool = DRY_RUN,
+        timeout: float = BYBIT_HTTP_TIMEOUT_SECONDS,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        super().__init__(
+            api_key,
+            api_secret,
+            base,
+            dry_run=dry_run,
+            timeout=timeout,
+        )
+        # Without an explicit session every client borrows the shared pool,
+        # and close() leaves it open for the next screen refresh.
+        self._owns_session = session is not None
+        if session is None:
+            self.session = shared_session()
+        else:
+            self.session = session
+            _session_headers(session)
+
+    def close(self) -> None:
+        if self._owns_session:
+            self.session.close()
+
     @staticmethod
     def _decode(response: requests.Response) -> dict[str, Any]:
         try:
@@ -303,14 +798,28 @@ class BybitAPI:
             raise BybitAPIError("Bybit вернул JSON неожиданного типа", response=data)
         return data
 
-    def _public_get(self, endpoint: str, params: Optional[dict[str, Any]] = None) -> dict:
+    def _public_get(
+        self,
+        endpoint: str,
+        params: Optional[dict[str, Any]] = None,
+        *,
+        coalesce: bool = True,
+    ) -> dict:
+        if not coalesce:
+            return self._send_public_get(endpoint, params)
+        key = (self.base, endpoint, tuple(sorted((params or {}).items())))
+        return _public_gets.fetch(key, lambda: self._send_public_get(endpoint, params))
+
+    def _send_public_get(self, endpoint: str, params: Optional[dict[str, Any]] = None) -> dict:
         url = f"{self.base}{endpoint}"
         last_error: Optional[Exception] = None
+        limiter = self._rate_limiter("GET", private=False, endpoint=endpoint)
         for attempt in range(1, READ_ATTEMPTS + 1):
             response: Optional[requests.Response] = None
             try:
+                limiter.acquire()
                 response = self.session.get(url, params=params or {}, timeout=self.timeout)
-                self._capture_rate_headers(response)
+                self._capture_rate_headers(response.headers, limiter)
                 if response.status_code == 403:
                     raise BybitAPIError("Bybit отклонил запрос (HTTP 403)", response=response)
                 if response.status_code == 429 or response.status_code >= 500:
@@ -345,30 +854,13 @@ class BybitAPI:
 
     def sync_server_time(self) -> int:
         before = int(time.time() * 1_000)
-        data = self._public_get("/v5/market/time")
+        # Each caller measures its own round trip around the server time.
+        data = self._public_get("/v5/market/time", coalesce=False)
         after = int(time.time() * 1_000)
-        result = data.get("result", {})
-        server_ms = int(data.get("time") or int(result.get("timeNano", "0")) // 1_000_000)
-        if server_ms <= 0:
-            server_ms = int(result.get("timeSecond", "0")) * 1_000
-        if server_ms <= 0:
-            raise BybitAPIError("Bybit не вернул серверное время")
-        self._server_offset_ms = server_ms - ((before + after) // 2)
-        self._last_time_sync = time.monotonic()
-        with self._time_lock:
-            self._time_cache[self.base] = (
-                self._last_time_sync,
-                self._server_offset_ms,
-            )
-        return self._server_offset_ms
+        return self._store_time_offset(self._time_from_response(data), before, after)
 
     def _ensure_time_sync(self) -> None:
-        if time.monotonic() - self._last_time_sync < 300:
-            return
-        with self._time_lock:
-            cached = self._time_cache.get(self.base)
-        if cached and time.monotonic() - cached[0] < 300:
-            self._last_time_sync, self._server_offset_ms = cached
+        if self._reuse_time_sync():
             return
         try:
             self.sync_server_time()
@@ -384,41 +876,28 @@ class BybitAPI:
         method = method.upper()
         payload = dict(params or {})
         if method != "GET" and self.dry_run:
-            logger.info(f"[DRY] Заблокирован {method} {endpoint}")
-            return {
-                "retCode": 0,
-                "retMsg": "DRY preview: запрос не отправлен",
-                "result": {
-                    "simulated": True,
-                    "orderLinkId": payload.get("orderLinkId", ""),
-                },
-            }
+            return self._dry_run_response(method, endpoint, payload)
         if not self.api_key or not self.api_secret:
             raise BybitAPIError("Не заданы BYBIT_API_KEY или BYBIT_API_SECRET")
 
         self._ensure_time_sync()
+        if method == "POST" and endpoint in TRADE_STREAM_OPS:
+            streamed = self._trade_stream_request(endpoint, payload)
+            if streamed is not None:
+                return streamed
         url = f"{self.base}{endpoint}"
         max_attempts = READ_ATTEMPTS if method == "GET" else 2
         resynced = False
 
+        limiter = self._rate_limiter(method, private=True, endpoint=endpoint)
+
         for attempt in range(1, max_attempts + 1):
-            timestamp = self._now_ms()
-            query_string = urlencode(sorted(payload.items())) if method == "GET" else ""
-            body = (
-                ""
-                if method == "GET"
-                else json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
-            )
-            signed_payload = query_string if method == "GET" else body
-            headers = {
-                "X-BAPI-API-KEY": self.api_key,
-                "X-BAPI-SIGN": self._sign_v5(timestamp, signed_payload),
-                "X-BAPI-TIMESTAMP": timestamp,
-                "X-BAPI-RECV-WINDOW": self.recv_window,
-                "cdn-request-id": uuid.uuid4().hex,
-            }
+            # Wait before signing so a long queue cannot expire recv_window.
+            limiter.acquire()
+            query_string, body, headers = self._signed_request(method, payload)
             request_url = f"{url}?{query_string}" if query_string else url
             response: Optional[requests.Response] = None
+            sent_at = time.monotonic()
             try:
                 if method == "GET":
                     response = self.session.get(
@@ -428,7 +907,9 @@ class BybitAPI:
                     response = self.session.post(
                         request_url, headers=headers, data=body, timeout=self.timeout
                     )
-                self._capture_rate_headers(response)
+                if endpoint in TRADE_STREAM_OPS:
+                    _order_acks.record("rest", time.monotonic() - sent_at)
+                self._capture_rate_headers(response.headers, limiter)
                 if response.status_code == 403:
                     raise BybitAPIError("Bybit отклонил запрос (HTTP 403)", response=response)
                 if response.status_code == 429 or response.status_code >= 500:
@@ -501,12 +982,122 @@ class BybitAPI:
 
         raise BybitAPIError(f"Bybit не выполнил запрос {endpoint}")
 
+    def _trade_stream_request(self, endpoint: str, payload: dict[str, Any]) -> Optional[dict]:
+        """Send an order write over the trade WebSocket; ``None`` means use REST.
+
+        The response is returned in the REST shape.  Once the frame is sent,
+        a timeout or disconnect is ambiguous exactly like a lost HTTP response.
+        """
+        stream = trade_stream(self.base, self.api_key)
+        if stream is None or not stream.connected:
+            return None
+        limiter = self._rate_limiter("POST", private=True, endpoint=endpoint)
+        limiter.acquire()
+        header = {"X-BAPI-TIMESTAMP": self._now_ms(), "X-BAPI-RECV-WINDOW": self.recv_window}
+        order_link_id = str(payload.get("orderLinkId") or "") or None
+        sent_at = time.monotonic()
+        try:
+            message = stream.submit(
+                TRADE_STREAM_OPS[endpoint],
+                [payload],
+                header,
+                timeout=self.timeout,
+            )
+        except TradeStreamUnavailable as error:
+            logger.info(f"{endpoint} идёт через REST: {error}")
+            return None
+        except (TimeoutError, ConnectionError) as error:
+            raise BybitAmbiguousWriteError(
+                f"Неопределённый результат {endpoint} через WebSocket: {error}",
+                endpoint=endpoint,
+                order_link_id=order_link_id,
+            ) from error
+        _order_acks.record("ws", time.monotonic() - sent_at)
+        if isinstance(message.get("header"), dict):
+            self._capture_rate_headers(message["header"], limiter)
+        code = message.get("retCode")
+        data = message.get("data")
+        if not isinstance(code, int) or (code == 0 and not isinstance(data, dict)):
+            raise BybitAmbiguousWriteError(
+                f"Bybit вернул неопределённый ответ на {endpoint} через WebSocket",
+                endpoint=endpoint,
+                order_link_id=order_link_id,
+                response=message,
+            )
+        if code in (10002, 10006):
+            # Rejected before matching; REST resyncs the clock or backs off.
+            logger.info(f"{endpoint} через WebSocket отклонён ({code}), повторяю через REST")
+            return None
+        if code != 0:
+            raise BybitAPIError(
+                str(message.get("retMsg", "Unknown error")),
+                code=code,
+                response=message,
+            )
+        return {
+            "retCode": 0,
+            "retMsg": message.get("retMsg", "OK"),
+            "result": data,
+            "retExtInfo": message.get("retExtInfo", {}),
+        }
+
     # ---- Public market data -------------------------------------------------
-    def get_tickers(self, symbol: str) -> dict:
-        return self._public_get(
-            "/v5/market/tickers",
-            params={"category": BYBIT_CATEGORY, "symbol": symbol.upper()},
-        )
+    def _ticker_snapshot(
+        self,
+        max_age: float = TICKER_CACHE_SECONDS,
+    ) -> tuple[int, dict[str, dict]]:
+        """One bulk ticker response shared by every client of this host."""
+        cached = self._cached_tickers(max_age)
+        if cached:
+            return cached
+        requested_at = time.monotonic()
+        with self._ticker_lock:
+            fetch_lock = self._ticker_fetch_locks.setdefault(self.base, threading.Lock())
+        with fetch_lock:
+            # A response fetched while this caller waited is fresh enough,
+            # even for max_age=0.
+            cached = self._fresh_tickers_since(requested_at)
+            if cached:
+                return cached
+            # The ticker cache has its own single-flight and TTL.
+            return self._store_tickers(
+                self._public_get(
+                    "/v5/market/tickers",
+                    params={"category": BYBIT_CATEGORY},
+                    coalesce=False,
+                )
+            )
+
+    def get_all_tickers(self, *, max_age: float = TICKER_CACHE_SECONDS) -> dict[str, dict]:
+        """Return every linear ticker by symbol from one shared bulk request."""
+        _, rows = self._ticker_snapshot(max_age)
+        return {symbol: dict(row) for symbol, row in rows.items()}
+
+    def get_tickers(self, symbol: str, *, max_age: float = TICKER_CACHE_SECONDS) -> dict:
+        """Single-symbol view of the shared bulk ticker snapshot.
+
+        The response keeps the ``/v5/market/tickers`` shape; an unknown symbol
+        yields an empty list.  A fresh row from the public stream is used when
+        available; ``max_age=0`` forces a fresh bulk request.
+        """
+        streamed = self._streamed_ticker_response(symbol, max_age)
+        if streamed is not None:
+            return streamed
+        return self._single_ticker_response(symbol, *self._ticker_snapshot(max_age))
+
+    def get_symbol_tickers(
+        self,
+        symbols: list[str],
+        *,
+        max_age: float = TICKER_CACHE_SECONDS,
+    ) -> dict[str, dict]:
+        """Rows of ``symbols`` from the stream, or one bulk snapshot if any is stale."""
+        if max_age > 0:
+            streamed = {symbol: self._streamed_ticker(symbol) for symbol in symbols}
+            if all(streamed.values()):
+                return streamed  # type: ignore[return-value]
+        _, rows = self._ticker_snapshot(max_age)
+        return {symbol: dict(rows[symbol]) for symbol in symbols if symbol in rows}
 
     def get_kline(self, symbol: str, interval: str, limit: int = 200) -> dict:
         return self._public_get(
@@ -521,24 +1112,39 @@ class BybitAPI:
 
     def get_instrument_rules(self, symbol: str, *, refresh: bool = False) -> InstrumentRules:
         symbol = symbol.upper()
-        cache_key = (self.base, symbol)
-        now = time.monotonic()
-        with self._instrument_lock:
-            cached = self._instrument_cache.get(cache_key)
-            if not refresh and cached and now - cached[0] < INSTRUMENT_CACHE_SECONDS:
-                return cached[1]
+        cached = self._cached_instrument(self.base, symbol, refresh)
+        if cached:
+            return cached
+        fetched_at = time.monotonic()
         response = self._public_get(
             "/v5/market/instruments-info",
             params={"category": BYBIT_CATEGORY, "symbol": symbol},
         )
-        rows = _object_rows(response, "/v5/market/instruments-info")
-        payload = next((row for row in rows if row.get("symbol") == symbol), None)
-        if not payload:
-            raise BybitAPIError(f"Bybit не вернул правила инструмента {symbol}")
-        rules = InstrumentRules.from_payload(payload)
-        with self._instrument_lock:
-            self._instrument_cache[cache_key] = (now, rules)
-        return rules
+        return self._store_instrument(self.base, symbol, response, fetched_at)
+
+    def get_all_instruments(self) -> dict[str, dict[str, Any]]:
+        """Every instrument payload of the category by symbol, all pages."""
+        payloads: dict[str, dict[str, Any]] = {}
+        cursor = ""
+        seen_cursors: set[str] = set()
+        while True:
+            params: dict[str, Any] = {"category": BYBIT_CATEGORY, "limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            response = self._public_get("/v5/market/instruments-info", params=params)
+            for row in _object_rows(response, "/v5/market/instruments-info"):
+                if row.get("symbol"):
+                    payloads[str(row["symbol"])] = row
+            next_cursor = _next_cursor(response, "/v5/market/instruments-info")
+            if not next_cursor:
+                return payloads
+            if next_cursor in seen_cursors:
+                raise BybitAPIError(
+                    "Bybit /v5/market/instruments-info повторил pagination cursor",
+                    response=response,
+                )
+            seen_cursors.add(next_cursor)
+            cursor = next_cursor
 
     # ---- Account and positions ---------------------------------------------
     def get_account_user_id(self) -> str:
@@ -586,9 +1192,7 @@ class BybitAPI:
                 )
             seen_cursors.add(next_cursor)
             cursor = next_cursor
-        merged = dict(first_response or {"retCode": 0, "retMsg": "OK", "result": {}})
-        merged["result"] = {**merged.get("result", {}), "list": rows, "nextPageCursor": ""}
-        return merged
+        return self._merge_pages(first_response, rows)
 
     def get_wallet_balance(self, account_type: str = "UNIFIED") -> dict:
         return self._private_request(
@@ -611,6 +1215,56 @@ class BybitAPI:
             raise BybitAPIError(f"Bybit не вернул комиссию для {symbol}")
         return _decimal(rows[0].get("takerFeeRate", "0"))
 
+    def get_taker_fee_rates(
+        self,
+        symbols: list[str],
+        *,
+        max_age: float = FEE_CACHE_SECONDS,
+    ) -> dict[str, Decimal]:
+        """Taker fees of ``symbols`` from one bulk request shared process-wide.
+
+        If the refresh fails, the last known rates are used, then
+        ``FALLBACK_TAKER_FEE_RATE``, and the refresh is retried only after
+        ``FEE_RETRY_SECONDS``.
+        """
+        rates = self._cached_fee_rates(max_age)
+        refreshed = False
+        if rates is None and self._fee_retry_pending():
+            rates = self._cached_fee_rates(None) or {}
+        if rates is None:
+            with self._fee_fetch_lock:
+                rates = self._cached_fee_rates(max_age)
+                if rates is None and self._fee_retry_pending():
+                    rates = self._cached_fee_rates(None) or {}
+                if rates is None:
+                    refreshed = True
+                    try:
+                        rates = self._store_fee_rates(
+                            self._private_request(
+                                "GET",
+                                "/v5/account/fee-rate",
+                                params={"category": BYBIT_CATEGORY},
+                            )
+                        )
+                    except Exception as error:
+                        with self._fee_lock:
+                            self._fee_retry_at[(self.base, self.api_key)] = (
+                                time.monotonic() + FEE_RETRY_SECONDS
+                            )
+                        rates = self._cached_fee_rates(None) or {}
+                        logger.warning(
+                            "Не удалось обновить taker fee, использую "
+                            f"{'последние известные' if rates else 'запасную ставку'}: {error}"
+                        )
+        result = self._fee_rates_for(symbols, rates)
+        missing = [symbol for symbol in result if symbol not in rates]
+        if refreshed and missing:
+            logger.warning(
+                f"Нет персональной taker fee для {', '.join(missing)}, "
+                f"использую {FALLBACK_TAKER_FEE_RATE}"
+            )
+        return result
+
     def get_open_orders(
         self,
         symbol: Optional[str] = None,
@@ -644,9 +1298,7 @@ class BybitAPI:
                 )
             seen_cursors.add(next_cursor)
             cursor = next_cursor
-        merged = dict(first or {"retCode": 0, "retMsg": "OK", "result": {}})
-        merged["result"] = {**merged.get("result", {}), "list": rows, "nextPageCursor": ""}
-        return merged
+        return self._merge_pages(first, rows)
 
     def set_leverage(self, symbol: str, buy_leverage: Any, sell_leverage: Any) -> dict:
         rules = self.get_instrument_rules(symbol)
@@ -780,6 +1432,9 @@ class BybitAPI:
         history_rows = _object_rows(history, "/v5/order/history")
         return history_rows[0] if history_rows else None
 
+    def _account_stream(self):
+        return account_stream(self.base, self.api_key)
+
     def wait_for_order(
         self,
         *,
@@ -788,9 +1443,20 @@ class BybitAPI:
         order_link_id: Optional[str] = None,
         timeout_seconds: float = 10.0,
     ) -> dict[str, Any]:
+        """Wait for a terminal order state, pushed by the stream or polled."""
         deadline = time.monotonic() + timeout_seconds
+        stream = self._account_stream()
         last_order: Optional[dict[str, Any]] = None
         while time.monotonic() < deadline:
+            if stream is not None:
+                pushed = stream.wait_order(
+                    order_link_id=order_link_id,
+                    order_id=order_id,
+                    done=lambda row: row.get("orderStatus") in TERMINAL_ORDER_STATUSES,
+                    timeout=min(STREAM_RECONCILE_SECONDS, deadline - time.monotonic()),
+                )
+                if pushed is not None:
+                    return pushed
             last_order = self.get_order(
                 symbol=symbol,
                 order_id=order_id,
@@ -798,7 +1464,8 @@ class BybitAPI:
             )
             if last_order and last_order.get("orderStatus") in TERMINAL_ORDER_STATUSES:
                 return last_order
-            time.sleep(0.35)
+            if stream is None or not stream.connected:
+                time.sleep(0.35)
         if last_order:
             raise BybitAPIError(
                 f"Статус ордера не подтверждён: {last_order.get('orderStatus')}",
@@ -806,6 +1473,7 @@ class BybitAPI:
             )
         raise BybitAPIError("Bybit не вернул ордер для подтверждения")
 
+    @order_priority
     def place_order_and_confirm(self, **order: Any) -> dict[str, Any]:
         link_id = str(order.get("order_link_id") or self.new_order_link_id("cb"))
         order["order_link_id"] = link_id
@@ -863,6 +1531,7 @@ class BybitAPI:
             raise BybitOrderNotFilledError(final)
         return final
 
+    @order_priority
     def cancel_order_and_confirm(
         self,
         *,
@@ -916,8 +1585,18 @@ class BybitAPI:
         timeout_seconds: float = 8.0,
     ) -> dict[str, Any]:
         deadline = time.monotonic() + timeout_seconds
+        stream = self._account_stream()
         last: dict[str, Any] = {}
         while time.monotonic() < deadline:
+            if stream is not None:
+                pushed = stream.wait_position(
+                    symbol,
+                    position_idx,
+                    predicate,
+                    timeout=min(STREAM_RECONCILE_SECONDS, deadline - time.monotonic()),
+                )
+                if pushed is not None:
+                    return pushed
             rows = self.get_positions(symbol=symbol).get("result", {}).get("list", [])
             last = next(
                 (
@@ -929,7 +1608,8 @@ class BybitAPI:
             )
             if predicate(last):
                 return last
-            time.sleep(0.35)
+            if stream is None or not stream.connected:
+                time.sleep(0.35)
         raise BybitAPIError(f"Позиция {symbol}/{position_idx} не подтвердила новое состояние")
 
     def set_trading_stop(
@@ -961,6 +1641,7 @@ class BybitAPI:
             },
         )
 
+    @order_priority
     def set_trading_stop_and_verify(
         self,
         symbol: str,
@@ -994,6 +1675,7 @@ class BybitAPI:
 
         return self.wait_for_position(symbol, position_idx, protected)
 
+    @order_priority
     def close_position_market(
         self,
         symbol: str,
@@ -1115,6 +1797,44 @@ class BybitAPI:
                 )
             seen.add(next_cursor)
             cursor = next_cursor
-        merged = dict(first or {"retCode": 0, "retMsg": "OK", "result": {}})
-        merged["result"] = {**merged.get("result", {}), "list": rows, "nextPageCursor": ""}
-        return merged
+        return self._merge_pages(first, rows)
+
+
+def start_account_stream() -> None:
+    """Start the private streams enabled for a configured live account."""
+    if DRY_RUN or not BYBIT_API_KEY or not BYBIT_API_SECRET:
+        return
+    if ORDER_WS_ENABLED and not BYBIT_TRADE_WS_URL:
+        logger.info("Торговый WebSocket недоступен для этого BYBIT_ENV; ордера идут через REST")
+    order_stream = ORDER_WS_ENABLED and bool(BYBIT_TRADE_WS_URL)
+    if not ACCOUNT_STREAM_ENABLED and not order_stream:
+        return
+    clock = BybitAPI()
+    clock._ensure_time_sync()
+    credentials = (clock.base, BYBIT_API_KEY, BYBIT_API_SECRET, clock.server_now_ms)
+    if ACCOUNT_STREAM_ENABLED:
+        start_private_stream(BYBIT_PRIVATE_WS_URL, *credentials)
+    if order_stream:
+        start_trade_stream(BYBIT_TRADE_WS_URL, *credentials)
+
+
+def stop_account_stream() -> None:
+    stop_trade_stream()
+    stop_private_stream()
+    stats = order_ack_stats()
+    if stats:
+        logger.info(
+            "Задержка ACK ордеров: "
+            + "; ".join(
+                f"{transport} n={row['count']} p50={row['p50_ms']:.0f} мс "
+                f"p95={row['p95_ms']:.0f} мс"
+                for transport, row in sorted(stats.items())
+            )
+        )
+
+
+def cached_taker_fee_rates() -> dict[str, Decimal]:
+    """Last known taker fees of the configured account, without a request."""
+    with BybitClientBase._fee_lock:
+        cached = BybitClientBase._fee_cache.get((BYBIT_BASE_URL.rstrip("/"), BYBIT_API_KEY))
+    return dict(cached[1]) if cached else {}
@@ -0,0 +1,267 @@
+"""Authenticated Bybit V5 private WebSocket with a local order/position book.
+
+The stream keeps the latest order row per ``orderLinkId``, the latest
+position row per ``(symbol, positionIdx)`` and recent executions, all as
+received since the current connection was authenticated.  Order flows wait
+on this book and fall back to REST reconciliation whenever the stream is down
+or an event does not arrive.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Optional
+
+import aiohttp
+
+from api.bybit_stream import StreamWorker
+
+AUTH_TIMEOUT_SECONDS = 10.0
+BOOK_SIZE = 1_000
+EXECUTIONS_PER_ORDER = 50
+TOPICS = ("order.linear", "execution.linear", "position.linear")
+
+
+def _updated_ms(row: dict[str, Any]) -> int:
+    try:
+        return int(row.get("updatedTime") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class AuthenticatedStream(StreamWorker):
+    """Stream worker that signs in with the API key before going live."""
+
+    def __init__(
+        self,
+        url: str,
+        rest_base: str,
+        api_key: str,
+        api_secret: str,
+        clock_ms: Callable[[], int],
+    ) -> None:
+        super().__init__(url)
+        self.rest_base = rest_base.rstrip("/")
+        self.api_key = api_key
+        self._api_secret = api_secret
+        self._clock_ms = clock_ms
+
+    async def _authenticate(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        expires = self._clock_ms() + 10_000
+        signature = hmac.new(
+            self._api_secret.encode("utf-8"),
+            f"GET/realtime{expires}".encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+        await self._request(ws, {"op": "auth", "args": [self.api_key, expires, signature]})
+
+    async def _request(self, ws: aiohttp.ClientWebSocketResponse, request: dict) -> None:
+        """Send one operation and require its acknowledgement."""
+        await ws.send_json(request)
+        deadline = time.monotonic() + AUTH_TIMEOUT_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ConnectionError(f"Bybit не подтвердил {request['op']}")
+            try:
+                message = await self._receive(ws, timeout=remaining)
+            except asyncio.TimeoutError as error:
+                raise ConnectionError(f"Bybit не подтвердил {request['op']}") from error
+            if message.get("op") != request["op"]:
+                continue
+            # The private stream answers with ``success``, the trade stream
+            # with ``retCode``.
+            accepted = (
+                message.get("success")
+                if "success" in message
+                else message.get("retCode") == 0
+            )
+            if not accepted:
+                raise ConnectionError(
+                    f"Bybit отклонил {request['op']}: "
+                    f"{message.get('ret_msg') or message.get('retMsg')}"
+                )
+            return
+
+
+class PrivateAccountStream(AuthenticatedStream):
+    thread_name = "bybit-private-ws"
+
+    def __init__(
+        self,
+        url: str,
+        rest_base: str,
+        api_key: str,
+        api_secret: str,
+        clock_ms: Callable[[], int],
+    ) -> None:
+        super().__init__(url, rest_base, api_key, api_secret, clock_ms)
+        self._changed = threading.Condition(self._lock)
+        self._orders: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._order_keys: dict[str, str] = {}
+        self._positions: dict[tuple[str, int], dict[str, Any]] = {}
+        self._executions: OrderedDict[str, deque[dict[str, Any]]] = OrderedDict()
+
+    # ---- Readers -------------------------------------------------------------
+    def _order(self, order_link_id: Optional[str], order_id: Optional[str]) -> Optional[dict]:
+        key = order_link_id or self._order_keys.get(order_id or "")
+        return self._orders.get(key) if key else None
+
+    def wait_order(
+        self,
+        *,
+        order_link_id: Optional[str],
+        order_id: Optional[str],
+        done: Callable[[dict[str, Any]], bool],
+        timeout: float,
+    ) -> Optional[dict[str, Any]]:
+        """Order row once ``done`` holds; ``None`` on timeout or disconnect."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self._connected:
+                row = self._order(order_link_id, order_id)
+                if row is not None and done(row):
+                    return dict(row)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return None
+
+    def wait_position(
+        self,
+        symbol: str,
+        position_idx: int,
+        predicate: Callable[[dict[str, Any]], bool],
+        *,
+        timeout: float,
+    ) -> Optional[dict[str, Any]]:
+        """Position row once ``predicate`` holds; ``None`` on timeout or disconnect."""
+        key = (symbol.upper(), int(position_idx))
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while self._connected:
+                row = self._positions.get(key)
+                if row is not None and predicate(row):
+                    return dict(row)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return None
+
+    def executions(self, order_link_id: str) -> list[dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._executions.get(order_link_id, ())]
+
+    # ---- Connection ----------------------------------------------------------
+    async def _on_open(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        await self._authenticate(ws)
+        await self._request(ws, {"op": "subscribe", "args": list(TOPICS)})
+
+    def _on_close(self) -> None:
+        with self._changed:
+            self._connected = False
+            # Events missed while disconnected make the book untrustworthy.
+            self._orders.clear()
+            self._order_keys.clear()
+            self._positions.clear()
+            self._executions.clear()
+            self._changed.notify_all()
+
+    # ---- Messages --------------------------------------------------------------
+    def _handle(self, message: dict) -> None:
+        kind = str(message.get("topic") or "").partition(".")[0]
+        rows = message.get("data")
+        if not kind or not isinstance(rows, list):
+            return
+        with self._changed:
+            for row in rows:
+                if not isinstance(row, dict):
+                    continue
+                if kind == "order":
+                    self._on_order(row)
+                elif kind == "position":
+                    self._on_position(row)
+                elif kind == "execution":
+                    self._on_execution(row)
+            self._changed.notify_all()
+
+    def _on_order(self, row: dict[str, Any]) -> None:
+        key = str(row.get("orderLinkId") or row.get("orderId") or "")
+        if not key:
+            return
+        current = self._orders.get(key)
+        if current is not None and _updated_ms(current) > _updated_ms(row):
+            return
+        self._orders[key] = dict(row)
+        self._orders.move_to_end(key)
+        if row.get("orderId"):
+            self._order_keys[str(row["orderId"])] = key
+        while len(self._orders) > BOOK_SIZE:
+            _, old = self._orders.popitem(last=False)
+            self._order_keys.pop(str(old.get("orderId") or ""), None)
+
+    def _on_position(self, row: dict[str, Any]) -> None:
+        try:
+            key = (str(row["symbol"]).upper(), int(row.get("positionIdx") or 0))
+        except (KeyError, TypeError, ValueError):
+            return
+        current = self._positions.get(key)
+        if current is not None and _updated_ms(current) > _updated_ms(row):
+            return
+        self._positions[key] = dict(row)
+
+    def _on_execution(self, row: dict[str, Any]) -> None:
+        key = str(row.get("orderLinkId") or row.get("orderId") or "")
+        if not key:
+            return
+        executions = self._executions.setdefault(key, deque(maxlen=EXECUTIONS_PER_ORDER))
+        executions.append(dict(row))
+        self._executions.move_to_end(key)
+        while len(self._executions) > BOOK_SIZE:
+            self._executions.popitem(last=False)
+
+
+_stream: Optional[PrivateAccountStream] = None
+_stream_lock = threading.Lock()
+
+
+def account_stream(rest_base: str, api_key: str) -> Optional[PrivateAccountStream]:
+    """Running stream of this host and API key, if any."""
+    stream = _stream
+    if (
+        stream is not None
+        and stream.rest_base == rest_base.rstrip("/")
+        and stream.api_key == api_key
+    ):
+        return stream
+    return None
+
+
+def start_private_stream(
+    url: str,
+    rest_base: str,
+    api_key: str,
+    api_secret: str,
+    clock_ms: Callable[[], int],
+) -> PrivateAccountStream:
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = PrivateAccountStream(url, rest_base, api_key, api_secret, clock_ms)
+            _stream.start()
+        return _stream
+
+
+def stop_private_stream() -> None:
+    global _stream
+    with _stream_lock:
+        stream, _stream = _stream, None
+    if stream is not None:
+        stream.stop()
@@ -0,0 +1,361 @@
+"""Background Bybit V5 public WebSocket with an in-memory market cache.
+
+One daemon thread runs its own event loop and subscribes to ``tickers.*`` and
+``kline.*.*`` topics supplied by a callback.  Readers in any thread or loop get
+the latest ticker and the confirmed candles received since the last gap; when
+the stream is disconnected or behind, they get ``None`` and fall back to REST.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+import aiohttp
+from loguru import logger
+
+PING_SECONDS = 20.0
+# No message at all for this long means a silently dead connection.
+IDLE_TIMEOUT_SECONDS = 30.0
+TOPIC_REFRESH_SECONDS = 60.0
+TICKER_STALE_SECONDS = 10.0
+RECONNECT_MAX_SECONDS = 30.0
+KLINE_RING_SIZE = 1_000
+# Bybit accepts at most 10 topics per subscribe request.
+SUBSCRIBE_BATCH = 10
+
+Record = tuple[int, float, float, float, float, float]
+
+
+def _interval_ms(interval: str) -> Optional[int]:
+    if interval.isdigit():
+        return int(interval) * 60_000
+    return {"D": 86_400_000, "W": 604_800_000}.get(interval)
+
+
+class StreamWorker:
+    """Reconnecting WebSocket loop in a daemon thread with its own event loop.
+
+    Subclasses react to messages in :meth:`_handle` and may extend the
+    connection and tick hooks; ``_lock`` guards all state read by other
+    threads.
+    """
+
+    thread_name = "bybit-ws"
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self._lock = threading.Lock()
+        self._connected = False
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+
+    @property
+    def connected(self) -> bool:
+        with self._lock:
+            return self._connected
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._run()),
+            name=self.thread_name,
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def _run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        attempt = 0
+        try:
+            async with aiohttp.ClientSession() as session:
+                while not self._stopping.is_set():
+                    try:
+                        async with session.ws_connect(self.url, autoping=True) as ws:
+                            await self._on_open(ws)
+                            logger.info(f"Bybit WebSocket подключён: {self.url}")
+                            attempt = 0
+                            await self._serve(ws)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as error:
+                        logger.warning(f"Bybit WebSocket отключён: {error}")
+                    finally:
+                        self._on_close()
+                    if self._stopping.is_set():
+                        break
+                    attempt += 1
+                    self.reconnects += 1
+                    delay = min(RECONNECT_MAX_SECONDS, 2 ** (attempt - 1))
+                    await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        except asyncio.CancelledError:
+            pass
+
+    async def _serve(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        with self._lock:
+            self._connected = True
+        last_ping = float("-inf")
+        last_message = time.monotonic()
+        while True:
+            now = time.monotonic()
+            await self._on_tick(ws, now)
+            if now - last_ping >= PING_SECONDS:
+                await ws.send_json({"op": "ping"})
+                last_ping = now
+            if now - last_message > IDLE_TIMEOUT_SECONDS:
+                raise ConnectionError("нет сообщений от Bybit")
+            try:
+                message = await self._receive(ws, timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+            last_message = time.monotonic()
+            self._handle(message)
+
+    @staticmethod
+    async def _receive(ws: aiohttp.ClientWebSocketResponse, *, timeout: float) -> dict:
+        message = await ws.receive(timeout=timeout)
+        if message.type == aiohttp.WSMsgType.TEXT:
+            return json.loads(message.data)
+        if message.type in (
+            aiohttp.WSMsgType.CLOSE,
+            aiohttp.WSMsgType.CLOSING,
+            aiohttp.WSMsgType.CLOSED,
+            aiohttp.WSMsgType.ERROR,
+        ):
+            raise ConnectionError(f"соединение закрыто ({message.type.name})")
+        return {}
+
+    async def _on_open(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Runs before the connection counts as live; raise to reconnect."""
+
+    async def _on_tick(self, ws: aiohttp.ClientWebSocketResponse, now: float) -> None:
+        """Runs about once a second while connected."""
+
+    def _on_close(self) -> None:
+        with self._lock:
+            self._connected = False
+
+    def _handle(self, message: dict) -> None:
+        raise NotImplementedError
+
+
+class PublicMarketStream(StreamWorker):
+    thread_name = "bybit-public-ws"
+
+    def __init__(
+        self,
+        url: str,
+        rest_base: str,
+        topics: Callable[[], Iterable[str]],
+    ) -> None:
+        super().__init__(url)
+        self.rest_base = rest_base.rstrip("/")
+        self._topics = topics
+        # symbol -> (monotonic receive time, merged ticker row)
+        self._tickers: dict[str, tuple[float, dict]] = {}
+        # (symbol, interval) -> contiguous confirmed candles, oldest first
+        self._klines: dict[tuple[str, str], deque[Record]] = {}
+        self._subscribed: set[str] = set()
+        self._last_refresh = float("-inf")
+        self.gaps = 0
+
+    # ---- Readers -------------------------------------------------------------
+    def ticker(self, symbol: str) -> Optional[dict]:
+        """Latest ticker row, or ``None`` if it is missing or stale."""
+        with self._lock:
+            entry = self._tickers.get(symbol.upper())
+            if (
+                not self._connected
+                or entry is None
+                or time.monotonic() - entry[0] > TICKER_STALE_SECONDS
+            ):
+                return None
+            return dict(entry[1])
+
+    def closed_candles(
+        self,
+        symbol: str,
+        interval: str,
+        *,
+        after_ms: int,
+        now_ms: int,
+    ) -> Optional[list[Record]]:
+        """Confirmed candles starting after ``after_ms`` up to the last close.
+
+        ``None`` means the stream cannot vouch for the full range: it is
+        disconnected, has not confirmed the latest close yet, or its buffer
+        starts after a gap later than ``after_ms``.
+        """
+        duration_ms = _interval_ms(interval)
+        if duration_ms is None:
+            return None
+        last_closed = (now_ms // duration_ms) * duration_ms - duration_ms
+        first_needed = after_ms + duration_ms
+        with self._lock:
+            ring = self._klines.get((symbol.upper(), interval))
+            if (
+                not self._connected
+                or not ring
+                or ring[-1][0] < last_closed
+                or ring[0][0] > first_needed
+            ):
+                return None
+            return [row for row in ring if first_needed <= row[0] <= last_closed]
+
+    # ---- Connection ----------------------------------------------------------
+    def _on_close(self) -> None:
+        with self._lock:
+            self._connected = False
+            # Deltas after a reconnect only make sense on a fresh snapshot.
+            self._tickers.clear()
+            self._subscribed = set()
+        self._last_refresh = float("-inf")
+
+    async def _on_tick(self, ws: aiohttp.ClientWebSocketResponse, now: float) -> None:
+        if now - self._last_refresh >= TOPIC_REFRESH_SECONDS:
+            await self._sync_topics(ws)
+            self._last_refresh = now
+
+    async def _sync_topics(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        try:
+            desired = set(await asyncio.to_thread(lambda: set(self._topics())))
+        except Exception as error:
+            logger.warning(f"Не удалось получить список WebSocket-топиков: {error}")
+            return
+        with self._lock:
+            added = sorted(desired - self._subscribed)
+            removed = sorted(self._subscribed - desired)
+        for op, topics in (("unsubscribe", removed), ("subscribe", added)):
+            for start in range(0, len(topics), SUBSCRIBE_BATCH):
+                await ws.send_json({"op": op, "args": topics[start : start + SUBSCRIBE_BATCH]})
+        with self._lock:
+            self._subscribed = desired
+            for topic in removed:
+                kind, _, rest = topic.partition(".")
+                if kind == "tickers":
+                    self._tickers.pop(rest, None)
+                elif kind == "kline":
+                    interval, _, symbol = rest.partition(".")
+                    self._klines.pop((symbol, interval), None)
+
+    # ---- Messages --------------------------------------------------------------
+    def _handle(self, message: dict) -> None:
+        topic = str(message.get("topic") or "")
+        if not topic:
+            if message.get("op") == "subscribe" and not message.get("success", True):
+                logger.warning(f"Bybit WebSocket отклонил подписку: {message.get('ret_msg')}")
+            return
+        kind, _, rest = topic.partition(".")
+        if kind == "tickers":
+            self._on_ticker(rest, message)
+        elif kind == "kline":
+            interval, _, symbol = rest.partition(".")
+            self._on_kline(symbol, interval, message.get("data") or [])
+
+    def _on_ticker(self, symbol: str, message: dict) -> None:
+        data = message.get("data")
+        if not isinstance(data, dict):
+            return
+        with self._lock:
+            current = self._tickers.get(symbol)
+            if message.get("type") == "snapshot":
+                row = dict(data)
+            elif current is None:
+                # A delta without its snapshot cannot be trusted; wait.
+                return
+            else:
+                row = {**current[1], **data}
+            row["_snapshot_time_ms"] = int(message.get("ts") or time.time() * 1_000)
+            self._tickers[symbol] = (time.monotonic(), row)
+
+    def _on_kline(self, symbol: str, interval: str, rows: list) -> None:
+        duration_ms = _interval_ms(interval)
+        if duration_ms is None:
+            return
+        for item in rows:
+            if not isinstance(item, dict) or not item.get("confirm"):
+                continue
+            try:
+                record: Record = (
+                    int(item["start"]),
+                    float(item["open"]),
+                    float(item["high"]),
+                    float(item["low"]),
+                    float(item["close"]),
+                    float(item["volume"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+            with self._lock:
+                ring = self._klines.setdefault(
+                    (symbol, interval), deque(maxlen=KLINE_RING_SIZE)
+                )
+                if ring:
+                    last_start = ring[-1][0]
+                    if record[0] == last_start:
+                        ring[-1] = record
+                        continue
+                    if record[0] < last_start:
+                        continue
+                    if record[0] != last_start + duration_ms:
+                        # Candles were missed; restart coverage from here.
+                        self.gaps += 1
+                        logger.info(
+                            f"Bybit WebSocket: пропуск свечей {symbol}/{interval}, "
+                            "буфер начат заново"
+                        )
+                        ring.clear()
+                ring.append(record)
+
+
+_stream: Optional[PublicMarketStream] = None
+_stream_lock = threading.Lock()
+
+
+def market_stream(rest_base: str) -> Optional[PublicMarketStream]:
+    """Running stream for the REST host ``rest_base``, if any."""
+    stream = _stream
+    if stream is not None and stream.rest_base == rest_base.rstrip("/"):
+        return stream
+    return None
+
+
+def start_market_stream(
+    url: str,
+    rest_base: str,
+    topics: Callable[[], Iterable[str]],
+) -> PublicMarketStream:
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = PublicMarketStream(url, rest_base, topics)
+            _stream.start()
+        return _stream
+
+
+def stop_market_stream() -> None:
+    global _stream
+    with _stream_lock:
+        stream, _stream = _stream, None
+    if stream is not None:
+        stream.stop()
@@ -0,0 +1,142 @@
+"""Authenticated Bybit V5 trade WebSocket for order create and cancel.
+
+Requests are matched to responses by ``reqId``.  A request that could not be
+handed to a live connection raises :class:`TradeStreamUnavailable` and is
+safe to repeat over REST; once sent, a timeout or disconnect leaves its
+outcome unknown and the caller must reconcile it like a lost REST response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+import aiohttp
+
+from api.bybit_private_stream import AuthenticatedStream
+
+
+class TradeStreamUnavailable(Exception):
+    """The request was not sent; another transport may carry it."""
+
+
+class TradeStream(AuthenticatedStream):
+    thread_name = "bybit-trade-ws"
+
+    def __init__(
+        self,
+        url: str,
+        rest_base: str,
+        api_key: str,
+        api_secret: str,
+        clock_ms: Callable[[], int],
+    ) -> None:
+        super().__init__(url, rest_base, api_key, api_secret, clock_ms)
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._pending: dict[str, Future] = {}
+
+    def submit(
+        self,
+        op: str,
+        args: list[dict[str, Any]],
+        header: dict[str, str],
+        *,
+        timeout: float,
+    ) -> dict[str, Any]:
+        """Send one trade operation from any thread and wait for its response.
+
+        Raises :class:`TradeStreamUnavailable` before sending and
+        ``TimeoutError``/``ConnectionError`` after sending.
+        """
+        request_id = uuid.uuid4().hex
+        future: Future = Future()
+        with self._lock:
+            ws, loop = self._ws, self._loop
+            if not self._connected or ws is None or loop is None:
+                raise TradeStreamUnavailable("торговый WebSocket не подключён")
+            self._pending[request_id] = future
+        deadline = time.monotonic() + timeout
+        message = {"reqId": request_id, "header": header, "op": op, "args": args}
+        try:
+            try:
+                asyncio.run_coroutine_threadsafe(ws.send_json(message), loop).result(timeout)
+            except FutureTimeoutError as error:
+                raise TimeoutError(f"{op}: отправка не завершилась за {timeout:.1f} с") from error
+            except Exception as error:
+                # A closing transport refuses the frame before writing it.
+                raise TradeStreamUnavailable(f"{op} не отправлен: {error}") from error
+            try:
+                return future.result(max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError as error:
+                raise TimeoutError(f"{op}: нет ответа за {timeout:.1f} с") from error
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    # ---- Connection ----------------------------------------------------------
+    async def _on_open(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        await self._authenticate(ws)
+        with self._lock:
+            self._ws = ws
+
+    def _on_close(self) -> None:
+        with self._lock:
+            self._connected = False
+            self._ws = None
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("соединение закрыто до ответа"))
+
+    # ---- Messages --------------------------------------------------------------
+    def _handle(self, message: dict) -> None:
+        request_id = message.get("reqId")
+        if not request_id:
+            return
+        with self._lock:
+            future = self._pending.get(str(request_id))
+        if future is not None and not future.done():
+            future.set_result(message)
+
+
+_stream: Optional[TradeStream] = None
+_stream_lock = threading.Lock()
+
+
+def trade_stream(rest_base: str, api_key: str) -> Optional[TradeStream]:
+    """Running trade stream of this host and API key, if any."""
+    stream = _stream
+    if (
+        stream is not None
+        and stream.rest_base == rest_base.rstrip("/")
+        and stream.api_key == api_key
+    ):
+        return stream
+    return None
+
+
+def start_trade_stream(
+    url: str,
+    rest_base: str,
+    api_key: str,
+    api_secret: str,
+    clock_ms: Callable[[], int],
+) -> TradeStream:
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = TradeStream(url, rest_base, api_key, api_secret, clock_ms)
+            _stream.start()
+        return _stream
+
+
+def stop_trade_stream() -> None:
+    global _stream
+    with _stream_lock:
+        stream, _stream = _stream, None
+    if stream is not None:
+        stream.stop()
@@ -0,0 +1,220 @@
+"""Process-wide token buckets for Bybit REST requests.
+
+Every client in the process (auto loop, UI threads, alert scheduler and the
+asyncio client) draws from the same bucket per host and endpoint group, and
+from one bucket per endpoint.  Group buckets use Bybit's documented defaults;
+endpoint buckets follow the ``X-Bapi-Limit*`` headers, which describe that
+endpoint only.  Lower-priority callers must leave a share of the group bucket
+untouched, and a backfill also draws from its own slower bucket, so it can
+neither drain the tokens nor take the throughput an order confirmation needs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, Mapping, Optional, TypeVar
+
+PRIORITY_ORDER = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKFILL = 2
+
+GROUP_PUBLIC = "public"
+GROUP_PRIVATE_READ = "private_read"
+GROUP_PRIVATE_WRITE = "private_write"
+
+# Requests per second: public limits are per IP (600 per 5 s), private ones
+# per UID and endpoint; the headers refine the private values.
+DEFAULT_GROUP_RATES = {
+    GROUP_PUBLIC: 100.0,
+    GROUP_PRIVATE_READ: 50.0,
+    GROUP_PRIVATE_WRITE: 10.0,
+}
+# Share of the bucket each priority must leave for more urgent callers.
+PRIORITY_RESERVE = {
+    PRIORITY_ORDER: 0.0,
+    PRIORITY_NORMAL: 0.2,
+    PRIORITY_BACKFILL: 0.5,
+}
+# Share of the group rate a priority may use at most; absent means all of it.
+PRIORITY_RATE_SHARE = {
+    PRIORITY_BACKFILL: 0.5,
+}
+# A reset further away than this is treated as a clock mismatch.
+MAX_RESET_WAIT_SECONDS = 10.0
+# A request still without a token after this long means a broken bucket.
+MAX_ACQUIRE_WAIT_SECONDS = 30.0
+
+_priority: ContextVar[int] = ContextVar("bybit_request_priority", default=PRIORITY_NORMAL)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run Bybit requests of this thread or task at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def order_priority(method: F) -> F:
+    """Give an order flow, including its confirmation reads, top priority."""
+
+    @wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with request_priority(PRIORITY_ORDER):
+            return method(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity or rate))
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait(self, priority: int, now: float) -> float:
+        """Seconds until a ``priority`` caller may take a token.  Hold the lock."""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        self._refill(now)
+        # A bucket of one or two tokens cannot also hold a reserve.
+        needed = min(1.0 + PRIORITY_RESERVE.get(priority, 0.0) * self.capacity, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Correct the bucket from Bybit's limit, remaining and reset headers."""
+        try:
+            limit = int(headers.get("X-Bapi-Limit") or 0)
+            remaining = int(headers.get("X-Bapi-Limit-Status") or -1)
+            reset_ms = int(headers.get("X-Bapi-Limit-Reset-Timestamp") or 0)
+        except ValueError:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit > 0:
+                # Bybit windows are one second long.
+                self.rate = self.capacity = max(1.0, float(limit))
+            if remaining >= 0:
+                self.tokens = min(self.tokens, float(remaining))
+            if remaining == 0 and reset_ms:
+                wait = reset_ms / 1_000 - time.time()
+                if 0 < wait <= MAX_RESET_WAIT_SECONDS:
+                    self._blocked_until = max(self._blocked_until, now + wait)
+
+
+class RequestLimiter:
+    """The buckets one request draws from, taken all together or not at all."""
+
+    def __init__(
+        self,
+        group: TokenBucket,
+        endpoint: TokenBucket,
+        priority: int,
+        share: Optional[TokenBucket] = None,
+    ) -> None:
+        self.group = group
+        self.endpoint = endpoint
+        self.priority = priority
+        self.share = share
+
+    def reserve(self) -> float:
+        """Take a token from every bucket and return 0, or return the wait."""
+        buckets = [self.group, self.endpoint]
+        if self.share is not None:
+            buckets.append(self.share)
+        with ExitStack() as stack:
+            # Always group, endpoint, share, so two requests cannot deadlock.
+            for item in buckets:
+                stack.enter_context(item._lock)
+            now = time.monotonic()
+            wait = max(
+                self.group._wait(self.priority, now),
+                self.endpoint._wait(self.priority, now),
+            )
+            if self.share is not None:
+                # The share bucket is the priority's own; it needs no reserve.
+                wait = max(wait, self.share._wait(PRIORITY_ORDER, now))
+            if wait <= 0:
+                for item in buckets:
+                    item.tokens -= 1.0
+            return wait
+
+    def acquire(self) -> None:
+        deadline = time.monotonic() + MAX_ACQUIRE_WAIT_SECONDS
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return
+            time.sleep(self._bounded(wait, deadline))
+
+    async def acquire_async(self) -> None:
+        deadline = time.monotonic() + MAX_ACQUIRE_WAIT_SECONDS
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(self._bounded(wait, deadline))
+
+    def _bounded(self, wait: float, deadline: float) -> float:
+        if time.monotonic() + wait > deadline:
+            raise TimeoutError(
+                f"Лимит запросов Bybit не выдал токен за {MAX_ACQUIRE_WAIT_SECONDS:.0f} с"
+            )
+        return wait
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        # The headers describe this endpoint's quota, not the whole group.
+        self.endpoint.observe(headers)
+
+
+_buckets: dict[tuple[str, ...], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket(base: str, group: str) -> TokenBucket:
+    with _buckets_lock:
+        result = _buckets.get((base, group))
+        if result is None:
+            result = _buckets[(base, group)] = TokenBucket(DEFAULT_GROUP_RATES[group])
+        return result
+
+
+def request_limiter(base: str, group: str, endpoint: str, priority: int) -> RequestLimiter:
+    """Buckets of one request; a rate-shared priority also gets its own."""
+    rate = DEFAULT_GROUP_RATES[group]
+    group_bucket = bucket(base, group)
+    with _buckets_lock:
+        endpoint_bucket = _buckets.get((base, group, endpoint))
+        if endpoint_bucket is None:
+            endpoint_bucket = _buckets[(base, group, endpoint)] = TokenBucket(rate)
+        share_bucket = None
+        share = PRIORITY_RATE_SHARE.get(priority)
+        if share is not None:
+            key = (base, group, f"priority:{priority}")
+            share_bucket = _buckets.get(key)
+            if share_bucket is None:
+                share_bucket = _buckets[key] = TokenBucket(rate * share)
+    return RequestLimiter(group_bucket, endpoint_bucket, priority, share_bucket)
@@ -106,9 +106,44 @@ _BYBIT_HOSTS = {
 if BYBIT_ENV not in _BYBIT_HOSTS:
     _CONFIG_ERRORS.append("BYBIT_ENV: ожидается mainnet, testnet или demo")
 BYBIT_BASE_URL = _BYBIT_HOSTS.get(BYBIT_ENV, _BYBIT_HOSTS["mainnet"])
+# Demo trading has no public stream of its own and uses mainnet market data.
+_BYBIT_PUBLIC_STREAMS = {
+    "mainnet": "wss://stream.bybit.com/v5/public/linear",
+    "testnet": "wss://stream-testnet.bybit.com/v5/public/linear",
+    "demo": "wss://stream.bybit.com/v5/public/linear",
+}
+BYBIT_PUBLIC_WS_URL = _BYBIT_PUBLIC_STREAMS.get(BYBIT_ENV, _BYBIT_PUBLIC_STREAMS["mainnet"])
+_BYBIT_PRIVATE_STREAMS = {
+    "mainnet": "wss://stream.bybit.com/v5/private",
+    "testnet": "wss://stream-testnet.bybit.com/v5/private",
+    "demo": "wss://stream-demo.bybit.com/v5/private",
+}
+BYBIT_PRIVATE_WS_URL = _BYBIT_PRIVATE_STREAMS.get(BYBIT_ENV, _BYBIT_PRIVATE_STREAMS["mainnet"])
+# Demo trading does not offer the WebSocket trade API; orders stay on REST.
+_BYBIT_TRADE_STREAMS = {
+    "mainnet": "wss://stream.bybit.com/v5/trade",
+    "testnet": "wss://stream-testnet.bybit.com/v5/trade",
+}
+BYBIT_TRADE_WS_URL = _BYBIT_TRADE_STREAMS.get(BYBIT_ENV, "")
 BYBIT_RECV_WINDOW_MS = _env_int("BYBIT_RECV_WINDOW_MS", 5_000)
 BYBIT_HTTP_TIMEOUT_SECONDS = _env_float("BYBIT_HTTP_TIMEOUT_SECONDS", 15.0)
+# Parallel Bybit read requests per process; the shared HTTP pool holds 32.
+BYBIT_MAX_CONCURRENT_REQUESTS = _env_int("BYBIT_MAX_CONCURRENT_REQUESTS", 8)
+# Identical public GETs share one in-flight request and reuse its response
+# for this long; 0 keeps only the in-flight sharing.
+BYBIT_PUBLIC_CACHE_MS = _env_int("BYBIT_PUBLIC_CACHE_MS", 250)
 BYBIT_MAX_SLIPPAGE_PERCENT = _env_float("BYBIT_MAX_SLIPPAGE_PERCENT", 0.30)
+# Confirmed candles are archived in SQLite; only the missing tail is fetched.
+CANDLE_ARCHIVE_ENABLED = _env_bool("CANDLE_ARCHIVE_ENABLED", True)
+# Tickers and confirmed candles of traded and alert symbols arrive over the
+# public WebSocket; REST remains the fallback whenever the stream is stale.
+MARKET_STREAM_ENABLED = _env_bool("MARKET_STREAM_ENABLED", True)
+# Order, execution and position events confirm live orders without polling;
+# REST stays the reconciliation path.
+ACCOUNT_STREAM_ENABLED = _env_bool("ACCOUNT_STREAM_ENABLED", True)
+# Send order create/cancel over the persistent trade WebSocket; REST is the
+# automatic fallback while it is disconnected.
+ORDER_WS_ENABLED = _env_bool("ORDER_WS_ENABLED", False)
 
 # DeepSeek.  deepseek-chat/reasoner were retired on 2026-07-24; Flash is the
 # current cost-efficient model and remains configurable.
@@ -210,6 +245,10 @@ def validate_config(mode: str = "telegram") -> list[str]:
         errors.append("MAX_POSITION_NOTIONAL_PERCENT должен быть больше 0")
     if not 1 <= BYBIT_HTTP_TIMEOUT_SECONDS <= 120:
         errors.append("BYBIT_HTTP_TIMEOUT_SECONDS должен быть в диапазоне 1–120")
+    if not 1 <= BYBIT_MAX_CONCURRENT_REQUESTS <= 10:
+        errors.append("BYBIT_MAX_CONCURRENT_REQUESTS должен быть в диапазоне 1–10")
+    if not 0 <= BYBIT_PUBLIC_CACHE_MS <= 5_000:
+        errors.append("BYBIT_PUBLIC_CACHE_MS должен быть в диапазоне 0–5000")
     if not 1_000 <= BYBIT_RECV_WINDOW_MS <= 60_000:
         errors.append("BYBIT_RECV_WINDOW_MS должен быть в диапазоне 1000–60000")
     if not 5 <= DEEPSEEK_TIMEOUT_SECONDS <= 300:
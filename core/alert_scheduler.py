@@ -6,10 +6,11 @@ import asyncio
 from collections import defaultdict
 from typing import Optional
 
+from api.async_bybit_api import get_async_bybit
 from config import ALERT_CHECK_INTERVAL_SECONDS
 from core.alerts import AlertService
 from telegram_bot.ui import deliver_event_to_chat
-from storage.database import get_store
+from storage.database import get_async_store
 from utils.logger_setup import logger
 
 
@@ -28,8 +29,8 @@ class AlertScheduler:
 
     async def stop(self) -> None:
         if self._task:
-            # Let an in-flight to_thread HTTP check finish before closing its
-            # requests.Session; cancelling the coroutine cannot stop the thread.
+            # Let an in-flight check finish: its RSI and SQLite steps run in
+            # worker threads that cancelling the coroutine cannot stop.
             self._stop_event.set()
             await self._task
             self._task = None
@@ -39,7 +40,7 @@ class AlertScheduler:
     async def _run(self) -> None:
         while not self._stop_event.is_set():
             try:
-                events = await asyncio.to_thread(self.service.check_all)
+                events = await self.service.check_all_async(get_async_bybit())
                 by_chat: dict[int, list] = defaultdict(list)
                 for event in events:
                     by_chat[event.chat_id].append(event)
@@ -58,8 +59,7 @@ class AlertScheduler:
                             str(event.outbox_id) for event in batch
                         ),
                     )
-                    await asyncio.to_thread(
-                        get_store().mark_notification_attempt,
+                    await get_async_store().mark_notification_attempt(
                         [event.outbox_id for event in batch],
                         outcome,
                     )
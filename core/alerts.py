@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import math
+import time
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
 from dataclasses import dataclass
 
+from api.async_bybit_api import AsyncBybitAPI
 from api.bybit_api import BybitAPI
-from core.market_data import calculate_rsi, get_kline_data
+from core.indicators import last_value, rsi_series
+from core.market_data import get_kline_data
 from storage.database import SQLiteStore, get_store
 from utils.helpers import format_price
 from utils.logger_setup import logger
@@ -21,24 +26,82 @@ class AlertEvent:
     message: str
 
 
-def _crossed(previous: float | None, current: float, direction: str, threshold: float) -> bool:
-    """Trigger only on an actual crossing, never immediately after creation."""
-    if previous is None:
-        return False
-    if direction == "above":
-        return previous < threshold <= current
-    return previous > threshold >= current
+AlertKey = tuple[str, str, str | None]
+
+# A full reload also forgets alerts their owners deleted since the last one.
+ALERT_INDEX_RELOAD_SECONDS = 3_600.0
+
+
+class ThresholdIndex:
+    """Thresholds of one (kind, symbol, timeframe) group, sorted per direction.
+
+    ``last_value`` is the group's previous observation, shared by every
+    alert in it.
+    """
+
+    def __init__(self, last_value: float | None = None) -> None:
+        self.last_value = last_value
+        self._above: list[tuple[float, int]] = []
+        self._below: list[tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._above) + len(self._below)
+
+    def _side(self, direction: str) -> list[tuple[float, int]]:
+        return self._above if direction == "above" else self._below
+
+    def add(self, alert_id: int, direction: str, threshold: float) -> None:
+        insort(self._side(direction), (threshold, alert_id))
+
+    def discard(self, alert_id: int, direction: str, threshold: float) -> None:
+        side = self._side(direction)
+        position = bisect_left(side, (threshold, alert_id))
+        if position < len(side) and side[position] == (threshold, alert_id):
+            del side[position]
+
+    def crossed(self, current: float) -> list[int]:
+        """Ids crossed on the way from ``last_value`` to ``current``.
+
+        "above" fires on previous < threshold <= current and "below" on
+        previous > threshold >= current, never right after creation.
+        """
+        previous = self.last_value
+        if previous is None or current == previous:
+            return []
+        if current > previous:
+            side = self._above
+            start = bisect_right(side, (previous, math.inf))
+            stop = bisect_right(side, (current, math.inf))
+        else:
+            side = self._below
+            start = bisect_left(side, (current, -math.inf))
+            stop = bisect_left(side, (previous, -math.inf))
+        return [alert_id for _, alert_id in side[start:stop]]
 
 
 class AlertService:
-    """Checks all users' alerts while sharing market requests per instrument."""
+    """Checks all users' alerts while sharing market requests per instrument.
+
+    Active alerts are indexed in memory, so a pass costs one lookup per
+    group plus the alerts actually crossed.
+    """
 
     def __init__(self, store: SQLiteStore | None = None, bybit: BybitAPI | None = None) -> None:
         self.store = store or get_store()
         self.bybit = bybit or BybitAPI()
+        self._groups: dict[AlertKey, ThresholdIndex] = {}
+        self._alerts: dict[int, dict] = {}
+        # New alerts wait for their first observation before they can fire.
+        self._pending: defaultdict[AlertKey, list[int]] = defaultdict(list)
+        self._last_alert_id = 0
+        self._loaded_at: float | None = None
+        self._owners_version = 0
 
     def _price(self, symbol: str) -> float:
-        response = self.bybit.get_tickers(f"{symbol}USDT")
+        return self._ticker_price(symbol, self.bybit.get_tickers(f"{symbol}USDT"))
+
+    @staticmethod
+    def _ticker_price(symbol: str, response: dict) -> float:
         tickers = response.get("result", {}).get("list", [])
         if not tickers:
             raise ValueError(f"Нет тикера для {symbol}USDT")
@@ -54,62 +117,150 @@ class AlertService:
         candles = get_kline_data(self.bybit, f"{symbol}USDT", interval=timeframe, limit=100)
         if len(candles) < 15:
             raise ValueError(f"Недостаточно свечей для RSI {symbol}/{timeframe}")
-        value = round(calculate_rsi([item["close"] for item in candles]), 2)
+        value = round(last_value(rsi_series(candles.close), 50.0), 2)
         if not math.isfinite(value) or not 0 <= value <= 100:
             raise ValueError(f"Некорректный RSI {symbol}/{timeframe}")
         return value
 
+    def _load_alerts(self) -> list[AlertKey]:
+        """Index alerts created since the last pass; return groups to observe."""
+        now = time.monotonic()
+        owners_version = self.store.alert_owners_version()
+        if (
+            self._loaded_at is None
+            or now - self._loaded_at >= ALERT_INDEX_RELOAD_SECONDS
+            # Alerts of deactivated chats leave the index, reactivated ones return.
+            or owners_version != self._owners_version
+        ):
+            if self._loaded_at is None:
+                last_values = self.store.alert_group_values()
+            else:
+                last_values = {key: index.last_value for key, index in self._groups.items()}
+            self._groups = {key: ThresholdIndex(value) for key, value in last_values.items()}
+            self._alerts = {}
+            self._pending = defaultdict(list)
+            self._last_alert_id = 0
+            self._loaded_at = now
+            self._owners_version = owners_version
+        for alert in self.store.get_active_alerts(self._last_alert_id):
+            alert_id = int(alert["id"])
+            self._last_alert_id = max(self._last_alert_id, alert_id)
+            key = (alert["kind"], alert["symbol"], alert["timeframe"])
+            index = self._groups.setdefault(key, ThresholdIndex())
+            self._alerts[alert_id] = alert
+            if alert["last_value"] is None:
+                # Armed by its first observation, as before the index existed.
+                self._pending[key].append(alert_id)
+            else:
+                index.add(alert_id, alert["direction"], float(alert["threshold"]))
+        return [key for key, index in self._groups.items() if len(index) or self._pending.get(key)]
+
+    def _notifies(self, alert: dict) -> bool:
+        user = self.store.get_user(int(alert["chat_id"]))
+        return bool(
+            user
+            and user["is_active"]
+            and user["telegram_user_id"] == user["chat_id"]
+            and user["notifications_enabled"]
+            and (
+                user["price_alerts_enabled"] if alert["kind"] == "price"
+                else user["rsi_alerts_enabled"]
+            )
+        )
+
+    @staticmethod
+    def _message(alert: dict, current: float) -> str:
+        comparator = "≥" if alert["direction"] == "above" else "≤"
+        value_text = format_price(current) if alert["kind"] == "price" else f"{current:.2f}"
+        unit = "USDT" if alert["kind"] == "price" else ""
+        timeframe = f", {alert['timeframe']}" if alert["kind"] == "rsi" else ""
+        return (
+            f"{'💲 Цена' if alert['kind'] == 'price' else '📊 RSI'} {alert['symbol']}{timeframe}: "
+            f"{value_text} {unit} {comparator} {alert['threshold']}"
+        ).strip()
+
     def check_all(self) -> list[AlertEvent]:
         """Read active alerts, persist observations and return crossed thresholds."""
-        active = self.store.get_active_alerts()
-        grouped: dict[tuple[str, str, str | None], list[dict]] = defaultdict(list)
-        for alert in active:
-            grouped[(alert["kind"], alert["symbol"], alert["timeframe"])].append(alert)
-
-        values: dict[tuple[str, str, str | None], float] = {}
-        for key in grouped:
+        keys = self._load_alerts()
+        values: dict[AlertKey, float] = {}
+        for key in keys:
             kind, symbol, timeframe = key
             try:
                 values[key] = self._price(symbol) if kind == "price" else self._rsi(symbol, timeframe or "15")
             except Exception as error:
                 logger.warning(f"Не удалось проверить алерты {kind}/{symbol}/{timeframe}: {error}")
+        return self._record_observations(values)
 
-        for key, alerts in grouped.items():
-            if key not in values:
-                continue
-            current = values[key]
-            for alert in alerts:
-                enabled = bool(
-                    alert["price_alerts_enabled"] if alert["kind"] == "price"
-                    else alert["rsi_alerts_enabled"]
-                ) and bool(alert["notifications_enabled"])
-                should_trigger = enabled and _crossed(
-                    alert["last_value"], current, alert["direction"], float(alert["threshold"])
-                )
-                comparator = "≥" if alert["direction"] == "above" else "≤"
-                value_text = format_price(current) if alert["kind"] == "price" else f"{current:.2f}"
-                unit = "USDT" if alert["kind"] == "price" else ""
-                timeframe = f", {alert['timeframe']}" if alert["kind"] == "rsi" else ""
-                message = (
-                    f"{'💲 Цена' if alert['kind'] == 'price' else '📊 RSI'} {alert['symbol']}{timeframe}: "
-                    f"{value_text} {unit} {comparator} {alert['threshold']}"
-                ).strip()
-                if not self.store.apply_alert_observation(
-                    int(alert["id"]),
-                    value=current,
-                    should_trigger=should_trigger,
-                    notification_message=message,
-                ):
+    async def check_all_async(self, bybit: AsyncBybitAPI) -> list[AlertEvent]:
+        """Same as :meth:`check_all`, with prices read on the event loop.
+
+        RSI alerts still go through the SQLite candle archive in a worker
+        thread, as do the observation writes.
+        """
+        keys = await asyncio.to_thread(self._load_alerts)
+
+        async def observe(key: AlertKey) -> float:
+            kind, symbol, timeframe = key
+            if kind == "price":
+                return self._ticker_price(symbol, await bybit.get_tickers(f"{symbol}USDT"))
+            return await asyncio.to_thread(self._rsi, symbol, timeframe or "15")
+
+        results = await asyncio.gather(*(observe(key) for key in keys), return_exceptions=True)
+        values: dict[AlertKey, float] = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                kind, symbol, timeframe = key
+                logger.warning(f"Не удалось проверить алерты {kind}/{symbol}/{timeframe}: {result}")
+            else:
+                values[key] = result
+        return await asyncio.to_thread(self._record_observations, values)
+
+    def _record_observations(self, values: dict[AlertKey, float]) -> list[AlertEvent]:
+        observations: list[tuple[int, float, bool, str | None]] = []
+        crossed: list[tuple[dict, float, str]] = []
+        for key, current in values.items():
+            index = self._groups[key]
+            # Only alerts whose threshold lies between the two values are
+            # touched; the rest keep the group's last value.
+            for alert_id in sorted(index.crossed(current)):
+                alert = self._alerts[alert_id]
+                if not self._notifies(alert):
                     continue
+                message = self._message(alert, current)
+                observations.append((alert_id, current, True, message))
+                crossed.append((alert, current, message))
+            for alert_id in self._pending.get(key, ()):
+                observations.append((alert_id, current, False, None))
 
-                self.store.log_activity(
-                    int(alert["chat_id"]),
-                    "alert_triggered",
-                    message,
-                    severity="warning",
-                    symbol=alert["symbol"],
-                    payload={"alert_id": alert["id"], "value": current},
+        # One transaction for the pass: crossed and new alerts plus one row
+        # per group, instead of a rewrite of every alert.
+        triggered = self.store.apply_alert_observations(
+            observations,
+            group_values=[(*key, current) for key, current in values.items()],
+        )
+        for key, current in values.items():
+            index = self._groups[key]
+            index.last_value = current
+            for alert_id in self._pending.pop(key, ()):
+                alert = self._alerts[alert_id]
+                index.add(alert_id, alert["direction"], float(alert["threshold"]))
+        for alert, current, message in crossed:
+            alert_id = int(alert["id"])
+            if alert_id not in triggered:
+                continue
+            if alert["repeat_mode"] == "once":
+                self._groups[(alert["kind"], alert["symbol"], alert["timeframe"])].discard(
+                    alert_id, alert["direction"], float(alert["threshold"])
                 )
+                del self._alerts[alert_id]
+            self.store.queue_activity(
+                int(alert["chat_id"]),
+                "alert_triggered",
+                message,
+                severity="warning",
+                symbol=alert["symbol"],
+                payload={"alert_id": alert["id"], "value": current},
+            )
         return [
             AlertEvent(
                 int(item["id"]),
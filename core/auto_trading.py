@@ -6,6 +6,7 @@ import hashlib
 import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from decimal import Decimal, ROUND_DOWN, ROUND_UP
 from typing import Any, Optional
@@ -35,7 +36,7 @@ from core.decision_engine import (
     selected_candidate,
     validate_trade_decision,
 )
-from core.market_data import get_market_analysis
+from core.market_data import fetch_concurrently, get_market_analysis
 from core.risk_engine import D, TradePlan, build_trade_plan, portfolio_risk_usd
 from core.trade_journal import TradeJournal
 from storage.database import get_store
@@ -45,7 +46,6 @@ from utils.logger_setup import logger
 
 # All exchange mutations, including manual Telegram closes, share this lock.
 EXECUTION_LOCK = threading.RLock()
-FEE_REFRESH_SECONDS = 3_600
 TRADE_HISTORY_SYNC_SECONDS = 15 * 60
 MAX_SAFETY_CLOSE_ATTEMPTS = 3
 SUPPORTED_AUTO_MARGIN_MODES = {"REGULAR_MARGIN"}
@@ -87,41 +87,9 @@ def _set_runtime(**values: Any) -> None:
         _runtime.update(values)
 
 
-def _ticker_rows(
-    bybit: BybitAPI,
-    tokens: list[str],
-) -> dict[str, dict[str, Any]]:
-    result: dict[str, dict[str, Any]] = {}
-    for token in tokens:
-        symbol = f"{token}USDT"
-        response = bybit.get_tickers(symbol)
-        rows = response.get("result", {}).get("list", [])
-        if not rows:
-            raise BybitAPIError(f"Bybit не вернул ticker {symbol}")
-        result[symbol] = {
-            **rows[0],
-            "_snapshot_time_ms": int(response.get("time") or time.time() * 1_000),
-        }
-    return result
-
-
-def _fee_rates(
-    bybit: BybitAPI,
-    previous: Optional[dict[str, Decimal]] = None,
-) -> dict[str, Decimal]:
-    rates: dict[str, Decimal] = {}
-    previous = previous or {}
-    for token in TRADABLE_TOKENS:
-        symbol = f"{token}USDT"
-        try:
-            rates[symbol] = bybit.get_fee_rate(symbol)
-        except Exception as error:
-            rates[symbol] = D(previous.get(symbol, FALLBACK_TAKER_FEE_RATE))
-            logger.warning(
-                f"{symbol}: не удалось получить персональную taker fee, "
-                f"использую {rates[symbol]}: {error}"
-            )
-    return rates
+def _fee_rates(bybit: BybitAPI) -> dict[str, Decimal]:
+    """Taker fees of the traded symbols from the shared hourly fee cache."""
+    return bybit.get_taker_fee_rates([f"{token}USDT" for token in TRADABLE_TOKENS])
 
 
 def _realized_pnl_today(bybit: BybitAPI) -> Decimal:
@@ -270,24 +238,52 @@ def collect_cycle(
     tokens: Optional[list[str]] = None,
 ) -> dict[str, Any]:
     selected_tokens = list(tokens or TRADABLE_TOKENS)
+    started = time.perf_counter()
+    # One parallel round trip for account state and all tickers, then one
+    # for the kline frames whose candle has closed since the last cycle.
+    reads = fetch_concurrently(
+        {
+            "positions": bybit.get_positions,
+            "wallet": bybit.get_wallet_balance,
+            "tickers": lambda: bybit.get_symbol_tickers(
+                [f"{token}USDT" for token in selected_tokens]
+            ),
+        }
+    )
     positions = [
         position
-        for position in bybit.get_positions().get("result", {}).get("list", [])
+        for position in reads["positions"].get("result", {}).get("list", [])
         if D(position.get("size", 0)) > 0
     ]
-    account = parse_account_overview(
-        bybit.get_wallet_balance(),
-        strict=True,
-    )
-    ticker_rows = _ticker_rows(bybit, selected_tokens)
-    analyses: dict[str, dict[str, Any]] = {}
+    account = parse_account_overview(reads["wallet"], strict=True)
+    ticker_rows: dict[str, dict[str, Any]] = {}
     for token in selected_tokens:
         symbol = f"{token}USDT"
-        analyses[token] = get_market_analysis(
-            bybit,
-            symbol,
-            float(D(ticker_rows[symbol].get("lastPrice", 0))),
-        )
+        if symbol not in reads["tickers"]:
+            raise BybitAPIError(f"Bybit не вернул ticker {symbol}")
+        ticker_rows[symbol] = reads["tickers"][symbol]
+    # Analysis threads only wait on the shared fetch pool, so they cannot
+    # starve it of workers.
+    with ThreadPoolExecutor(
+        max_workers=max(1, len(selected_tokens)),
+        thread_name_prefix="market-analysis",
+    ) as pool:
+        futures = {
+            token: pool.submit(
+                get_market_analysis,
+                bybit,
+                f"{token}USDT",
+                float(D(ticker_rows[f"{token}USDT"].get("lastPrice", 0))),
+            )
+            for token in selected_tokens
+        }
+        analyses: dict[str, dict[str, Any]] = {
+            token: future.result() for token, future in futures.items()
+        }
+    logger.info(
+        f"Рыночные данные цикла собраны за "
+        f"{(time.perf_counter() - started) * 1_000:.0f} мс"
+    )
     conservative_fee = max(
         [D(FALLBACK_TAKER_FEE_RATE), *fee_rates.values()]
     )
@@ -905,11 +901,13 @@ def _execute_candidate(
         raise ValueError(
             f"Свежий entry gate заблокировал вход: {fresh['entry_block_reason']}"
         )
-    ticker_response = bybit.get_tickers(symbol)
-    ticker = ticker_response.get("result", {}).get("list", [None])[0]
+    ticker_response = bybit.get_tickers(symbol, max_age=0)
+    ticker = (ticker_response.get("result", {}).get("list") or [None])[0]
     if not ticker:
         raise BybitAPIError(f"Не удалось перепроверить ticker {symbol}")
-    rules = bybit.get_instrument_rules(symbol, refresh=True)
+    # The background refresher keeps these rules current and diffs every
+    # refetch, so the entry path does not wait on instruments-info.
+    rules = bybit.get_instrument_rules(symbol)
 
     def build_current_plan(state: dict[str, Any]) -> TradePlan:
         available_usd = D(state["account"]["available_usd"])
@@ -1423,7 +1421,6 @@ def main_loop(
         deepseek = DeepSeekAPI()
         deepseek.validate_model()
         fees = _fee_rates(bybit)
-        fees_refreshed_at = time.monotonic()
         trade_history_refreshed_at = 0.0
         # Model validation and fee reads may take time; never reuse the
         # startup safety snapshot for the first trading cycle.
@@ -1450,9 +1447,7 @@ def main_loop(
                     if once or _wait(event, POLL_INTERVAL):
                         break
                     continue
-                if time.monotonic() - fees_refreshed_at >= FEE_REFRESH_SECONDS:
-                    fees = _fee_rates(bybit, previous=fees)
-                    fees_refreshed_at = time.monotonic()
+                fees = _fee_rates(bybit)
                 if event.is_set():
                     break
                 cycle = collect_cycle(bybit, fees)
@@ -0,0 +1,156 @@
+"""Columnar container for chronologically ordered OHLCV candles.
+
+Bybit rows are parsed once into one contiguous float block plus two integer
+time columns.  Slices are NumPy views, so tails such as ``candles[-80:]`` do
+not copy, and OHLC invariants are validated with vectorized comparisons.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+import numpy as np
+
+
+_EMPTY_INT = np.empty(0, dtype=np.int64)
+_EMPTY_FLOAT = np.empty(0, dtype=float)
+
+
+@dataclass(frozen=True, slots=True)
+class Candles:
+    """Parallel read-only columns; row ``i`` is one closed candle."""
+
+    timestamp: np.ndarray
+    closed_at: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "Candles":
+        return cls(
+            _EMPTY_INT,
+            _EMPTY_INT,
+            _EMPTY_FLOAT,
+            _EMPTY_FLOAT,
+            _EMPTY_FLOAT,
+            _EMPTY_FLOAT,
+            _EMPTY_FLOAT,
+        )
+
+    @classmethod
+    def from_bybit_rows(
+        cls,
+        rows: Sequence[Sequence[str]],
+        duration_ms: int,
+    ) -> "Candles":
+        """Parse Bybit ``[start, open, high, low, close, volume, ...]`` rows.
+
+        Bybit lists candles newest first; the result is chronological.
+        """
+        return cls.from_records(rows[::-1], duration_ms)
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Sequence[Sequence[object]],
+        duration_ms: int,
+    ) -> "Candles":
+        """Build from chronological ``(start, open, high, low, close, volume)``."""
+        if not records:
+            return cls.empty()
+        timestamps = np.fromiter(
+            (int(record[0]) for record in records), np.int64, len(records)
+        )
+        # One (5, n) block keeps every price column contiguous.
+        block = np.array([record[1:6] for record in records], dtype=float).T.copy()
+        closed_at = timestamps + duration_ms
+        for column in (timestamps, closed_at, block):
+            column.flags.writeable = False
+        return cls(
+            timestamps,
+            closed_at,
+            block[0],
+            block[1],
+            block[2],
+            block[3],
+            block[4],
+        )
+
+    def records(self) -> Iterator[tuple[int, float, float, float, float, float]]:
+        """Iterate ``(start, open, high, low, close, volume)`` rows."""
+        return zip(
+            self.timestamp.tolist(),
+            self.open.tolist(),
+            self.high.tolist(),
+            self.low.tolist(),
+            self.close.tolist(),
+            self.volume.tolist(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, index: slice) -> "Candles":
+        if not isinstance(index, slice):
+            raise TypeError("Candles поддерживает только срезы")
+        return Candles(
+            self.timestamp[index],
+            self.closed_at[index],
+            self.open[index],
+            self.high[index],
+            self.low[index],
+            self.close[index],
+            self.volume[index],
+        )
+
+    def closed_before(self, server_ms: int) -> "Candles":
+        """Drop candles whose close time is still in the future."""
+        closed = self.closed_at <= server_ms
+        count = int(closed.sum())
+        if closed[:count].all():
+            return self[:count]
+        return Candles(
+            *(
+                column[closed]
+                for column in (
+                    self.timestamp,
+                    self.closed_at,
+                    self.open,
+                    self.high,
+                    self.low,
+                    self.close,
+                    self.volume,
+                )
+            )
+        )
+
+    def rows(self) -> Iterator[tuple[float, float, float, float]]:
+        """Iterate ``(open, high, low, close)`` as Python floats."""
+        return zip(
+            self.open.tolist(),
+            self.high.tolist(),
+            self.low.tolist(),
+            self.close.tolist(),
+        )
+
+    def validated(self, *, minimum: int) -> "Candles":
+        """Validate OHLCV invariants and strict chronological ordering."""
+        prices = (self.open, self.high, self.low, self.close, self.volume)
+        if len(self) and (
+            not all(np.isfinite(column).all() for column in prices)
+            or (np.diff(self.timestamp) <= 0).any()
+            or (self.closed_at <= self.timestamp).any()
+            or (np.minimum(self.open, self.close) < self.low).any()
+            or (np.maximum(self.open, self.close) > self.high).any()
+            or (self.high < self.low).any()
+            or (self.low <= 0).any()
+            or (self.volume < 0).any()
+        ):
+            raise ValueError("Bybit вернул некорректную OHLCV-свечу")
+        if len(self) < minimum:
+            raise ValueError(f"Недостаточно закрытых свечей: {len(self)} < {minimum}")
+        return self
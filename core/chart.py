@@ -16,7 +16,11 @@ from datetime import datetime, timezone
 from html import escape
 from typing import Mapping, Optional, Sequence
 
+import numpy as np
+
 from api.bybit_api import BybitAPI
+from core.candles import Candles
+from core.indicators import ema_series as indicator_ema_series
 from core.market_data import (
     calculate_atr,
     calculate_ema,
@@ -89,67 +93,13 @@ def ema_series(
     """Return a deterministic SMA-seeded EMA aligned with ``prices``."""
     if period <= 0:
         raise ValueError("EMA period должен быть положительным")
-    values = [float(price) for price in prices]
-    if any(not math.isfinite(value) for value in values):
+    values = np.asarray(prices, dtype=float)
+    if not np.isfinite(values).all():
         raise ValueError("EMA содержит нечисловую цену")
-    result: list[Optional[float]] = [None] * len(values)
-    if len(values) < period:
-        return result
-    ema = sum(values[:period]) / period
-    result[period - 1] = ema
-    multiplier = 2.0 / (period + 1)
-    for index in range(period, len(values)):
-        ema = (values[index] - ema) * multiplier + ema
-        result[index] = ema
-    return result
-
-
-def _validated_candles(
-    candles: Sequence[Mapping[str, object]],
-    *,
-    minimum: int,
-) -> list[dict]:
-    """Validate OHLCV invariants and chronological ordering."""
-    validated: list[dict] = []
-    previous_timestamp = -1
-    for raw in candles:
-        try:
-            timestamp = int(raw["timestamp"])
-            closed_at = int(raw["closed_at"])
-            open_price = float(raw["open"])
-            high = float(raw["high"])
-            low = float(raw["low"])
-            close = float(raw["close"])
-            volume = float(raw["volume"])
-        except (KeyError, TypeError, ValueError) as error:
-            raise ValueError("Bybit вернул повреждённую свечу") from error
-        values = (open_price, high, low, close, volume)
-        if (
-            timestamp <= previous_timestamp
-            or closed_at <= timestamp
-            or any(not math.isfinite(value) for value in values)
-            or min(open_price, close) < low
-            or max(open_price, close) > high
-            or high < low
-            or low <= 0
-            or volume < 0
-        ):
-            raise ValueError("Bybit вернул некорректную OHLCV-свечу")
-        validated.append(
-            {
-                "timestamp": timestamp,
-                "closed_at": closed_at,
-                "open": open_price,
-                "high": high,
-                "low": low,
-                "close": close,
-                "volume": volume,
-            }
-        )
-        previous_timestamp = timestamp
-    if len(validated) < minimum:
-        raise ValueError(f"Недостаточно закрытых свечей: {len(validated)} < {minimum}")
-    return validated
+    return [
+        None if math.isnan(value) else value
+        for value in indicator_ema_series(values, period).tolist()
+    ]
 
 
 def _ticker(response: Mapping[str, object], symbol: str) -> dict:
@@ -164,18 +114,15 @@ def _ticker(response: Mapping[str, object], symbol: str) -> dict:
     return ticker
 
 
-def _closed_daily_low(candles: Sequence[Mapping[str, object]]) -> Optional[float]:
+def _closed_daily_low(candles: Candles) -> Optional[float]:
     """Return the low of exactly the latest 14 confirmed daily candles."""
     if len(candles) < DAILY_LOW_CANDLES:
         return None
     try:
-        validated = _validated_candles(
-            candles[-DAILY_LOW_CANDLES:],
-            minimum=DAILY_LOW_CANDLES,
-        )
+        validated = candles[-DAILY_LOW_CANDLES:].validated(minimum=DAILY_LOW_CANDLES)
     except ValueError:
         return None
-    return min(float(candle["low"]) for candle in validated)
+    return float(validated.low.min())
 
 
 def _cached_daily_low(bybit: BybitAPI, symbol: str) -> Optional[float]:
@@ -235,7 +182,7 @@ def _interval_label(interval: str) -> str:
 
 
 def _build_chart_text_from_data(
-    candles: Sequence[Mapping[str, object]],
+    candles: Candles,
     ticker: Mapping[str, object],
     symbol: str,
     interval: str,
@@ -245,12 +192,12 @@ def _build_chart_text_from_data(
 ) -> str:
     if len(candles) < 50:
         raise ValueError(f"Недостаточно закрытых свечей {symbol}/{interval}")
-    closes = [float(candle["close"]) for candle in candles]
+    closes = candles.close
     current = to_float(ticker.get("lastPrice"))
-    first = closes[-32]
+    first = float(closes[-32])
     change = (current - first) / first * 100 if first else 0.0
-    high = max(candle["high"] for candle in candles[-32:])
-    low = min(candle["low"] for candle in candles[-32:])
+    high = float(candles.high[-32:].max())
+    low = float(candles.low[-32:].min())
     ema20 = calculate_ema(closes, 20)
     ema50 = calculate_ema(closes, 50)
     rsi = calculate_rsi(closes)
@@ -259,7 +206,7 @@ def _build_chart_text_from_data(
     ask = to_float(ticker.get("ask1Price"))
     spread = (ask - bid) / ((ask + bid) / 2) * 100 if bid > 0 and ask > 0 else 0.0
     closed_at = datetime.fromtimestamp(
-        int(candles[-1]["closed_at"]) / 1_000,
+        int(candles.closed_at[-1]) / 1_000,
         timezone.utc,
     ).strftime("%H:%M:%S")
     updated = datetime.fromtimestamp(
@@ -282,7 +229,7 @@ def _build_chart_text_from_data(
         f"📈 <b>{symbol} · {interval_label}</b>\n"
         f"{direction} <code>{format_price(current)}</code> · "
         f"<code>{change:+.2f}%</code> за 32 свечи\n\n"
-        f"<pre>{sparkline(closes[-32:])}</pre>\n"
+        f"<pre>{sparkline(closes[-32:].tolist())}</pre>\n"
         f"L <code>{format_price(low)}</code> · "
         f"H <code>{format_price(high)}</code>\n"
         f"EMA20 <code>{format_price(ema20)}</code> · "
@@ -306,7 +253,7 @@ def _compact_number(value: float) -> str:
 
 
 def _render_chart_png(
-    candles: Sequence[Mapping[str, object]],
+    candles: Candles,
     *,
     symbol: str,
     interval: str,
@@ -323,11 +270,10 @@ def _render_chart_png(
     except ImportError as error:
         raise RuntimeError("Для PNG-графика не установлен matplotlib") from error
 
-    closes = [float(candle["close"]) for candle in candles]
-    ema20 = ema_series(closes, 20)
-    ema50 = ema_series(closes, 50)
+    ema20 = ema_series(candles.close, 20)
+    ema50 = ema_series(candles.close, 50)
     visible_count = min(CHART_VISIBLE_CANDLES, len(candles))
-    visible = list(candles[-visible_count:])
+    visible = candles[-visible_count:]
     visible_ema20 = ema20[-visible_count:]
     visible_ema50 = ema50[-visible_count:]
     x_values = list(range(visible_count))
@@ -366,14 +312,8 @@ def _render_chart_png(
             for spine in axis.spines.values():
                 spine.set_visible(False)
 
-        visible_low = min(
-            min(float(candle["low"]) for candle in visible),
-            current_price,
-        )
-        visible_high = max(
-            max(float(candle["high"]) for candle in visible),
-            current_price,
-        )
+        visible_low = min(float(visible.low.min()), current_price)
+        visible_high = max(float(visible.high.max()), current_price)
         price_span = max(
             visible_high - visible_low,
             abs(current_price) * 0.002,
@@ -384,11 +324,7 @@ def _render_chart_png(
         body_floor = price_span * 0.0012
 
         candle_colors: list[str] = []
-        for index, candle in enumerate(visible):
-            open_price = float(candle["open"])
-            high = float(candle["high"])
-            low = float(candle["low"])
-            close = float(candle["close"])
+        for index, (open_price, high, low, close) in enumerate(visible.rows()):
             color = green if close >= open_price else red
             candle_colors.append(color)
             price_axis.vlines(
@@ -530,10 +466,9 @@ def _render_chart_png(
         for label in legend.get_texts():
             label.set_color(foreground)
 
-        volumes = [float(candle["volume"]) for candle in visible]
         volume_axis.bar(
             x_values,
-            volumes,
+            visible.volume,
             width=0.62,
             color=candle_colors,
             alpha=0.55,
@@ -561,18 +496,18 @@ def _render_chart_png(
                 for index in range(tick_count)
             }
         )
-        span_ms = int(visible[-1]["timestamp"]) - int(visible[0]["timestamp"])
+        span_ms = int(visible.timestamp[-1]) - int(visible.timestamp[0])
         time_format = "%H:%M" if span_ms < 2 * 86_400_000 else "%d %b\n%H:%M"
         tick_labels = [
             datetime.fromtimestamp(
-                int(visible[index]["timestamp"]) / 1_000,
+                int(visible.timestamp[index]) / 1_000,
                 timezone.utc,
             ).strftime(time_format)
             for index in tick_indices
         ]
         volume_axis.set_xticks(tick_indices, tick_labels)
 
-        first_visible = float(visible[0]["close"])
+        first_visible = float(visible.close[0])
         change = (
             (current_price / first_visible - 1) * 100
             if first_visible > 0
@@ -643,7 +578,7 @@ def _render_chart_png(
 
 
 def _summary_text(
-    candles: Sequence[Mapping[str, object]],
+    candles: Candles,
     *,
     symbol: str,
     interval: str,
@@ -651,12 +586,11 @@ def _summary_text(
     daily_low: Optional[float],
     updated_ms: int,
 ) -> str:
-    closes = [float(candle["close"]) for candle in candles]
-    ema20 = ema_series(closes, 20)[-1]
-    ema50 = ema_series(closes, 50)[-1]
+    ema20 = ema_series(candles.close, 20)[-1]
+    ema50 = ema_series(candles.close, 50)[-1]
     if ema20 is None or ema50 is None:
         raise ValueError("Недостаточно свечей для EMA20/EMA50")
-    first = float(candles[-min(CHART_VISIBLE_CANDLES, len(candles))]["close"])
+    first = float(candles.close[-min(CHART_VISIBLE_CANDLES, len(candles))])
     change = (current / first - 1) * 100 if first else 0.0
     daily_text = "временно недоступен"
     if daily_low is not None:
@@ -684,15 +618,12 @@ def build_chart_payload(
 ) -> ChartPayload:
     """Fetch one coherent market snapshot and render PNG plus text fallback."""
     symbol = symbol.upper()
-    candles = _validated_candles(
-        get_kline_data(
-            bybit,
-            symbol,
-            interval,
-            CHART_HISTORY_CANDLES,
-        ),
-        minimum=50,
-    )
+    candles = get_kline_data(
+        bybit,
+        symbol,
+        interval,
+        CHART_HISTORY_CANDLES,
+    ).validated(minimum=50)
     ticker_response = bybit.get_tickers(symbol)
     ticker = _ticker(ticker_response, symbol)
     current = to_float(ticker.get("lastPrice"))
@@ -0,0 +1,300 @@
+"""Linear-time indicator series over chronologically ordered closed candles.
+
+Every function returns a float array aligned with its input.  Positions where
+the indicator is not yet defined hold ``NaN``.  Seeds and recurrences are the
+same as the historical scalar helpers, so the last element equals the value
+those helpers returned for the same input.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+
+def _float_array(values: Sequence[float] | np.ndarray) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def ema_series(prices: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """SMA-seeded EMA; element ``period - 1`` is the seed."""
+    if period <= 0:
+        raise ValueError("EMA period должен быть положительным")
+    values = _float_array(prices)
+    result = np.full(len(values), np.nan)
+    if len(values) < period:
+        return result
+    ema = float(values[:period].mean())
+    result[period - 1] = ema
+    multiplier = 2 / (period + 1)
+    # The recurrence is inherently sequential.  Python floats keep the exact
+    # arithmetic of the scalar implementation and avoid NumPy scalar boxing.
+    tail = values[period:].tolist()
+    output = [0.0] * len(tail)
+    for index, price in enumerate(tail):
+        ema = (price - ema) * multiplier + ema
+        output[index] = ema
+    result[period:] = output
+    return result
+
+
+def macd_series(
+    prices: Sequence[float] | np.ndarray,
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return aligned MACD line, signal line and histogram."""
+    values = _float_array(prices)
+    line = ema_series(values, fast) - ema_series(values, slow)
+    signal_line = np.full(len(values), np.nan)
+    start = slow - 1
+    if len(values) > start:
+        signal_line[start:] = ema_series(line[start:], signal)
+    return line, signal_line, line - signal_line
+
+
+def rsi_series(prices: Sequence[float] | np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI; element ``period`` is the first defined value."""
+    values = _float_array(prices)
+    result = np.full(len(values), np.nan)
+    if len(values) < period + 1:
+        return result
+    deltas = np.diff(values)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    average_gain = float(gains[:period].mean())
+    average_loss = float(losses[:period].mean())
+    output = [_rsi_value(average_gain, average_loss)]
+    for gain, loss in zip(gains[period:].tolist(), losses[period:].tolist()):
+        average_gain = (average_gain * (period - 1) + gain) / period
+        average_loss = (average_loss * (period - 1) + loss) / period
+        output.append(_rsi_value(average_gain, average_loss))
+    result[period:] = output
+    return result
+
+
+def _rsi_value(average_gain: float, average_loss: float) -> float:
+    if average_loss == 0:
+        return 50.0 if average_gain == 0 else 100.0
+    relative_strength = average_gain / average_loss
+    return float(100 - (100 / (1 + relative_strength)))
+
+
+def true_range(
+    high: Sequence[float] | np.ndarray,
+    low: Sequence[float] | np.ndarray,
+    close: Sequence[float] | np.ndarray,
+) -> np.ndarray:
+    """True range aligned with candles; the first candle has no previous close."""
+    highs, lows, closes = _float_array(high), _float_array(low), _float_array(close)
+    result = np.full(len(closes), np.nan)
+    if len(closes) < 2:
+        return result
+    previous_close = closes[:-1]
+    result[1:] = np.maximum.reduce(
+        [
+            highs[1:] - lows[1:],
+            np.abs(highs[1:] - previous_close),
+            np.abs(lows[1:] - previous_close),
+        ]
+    )
+    return result
+
+
+def atr_series(
+    high: Sequence[float] | np.ndarray,
+    low: Sequence[float] | np.ndarray,
+    close: Sequence[float] | np.ndarray,
+    period: int = 14,
+) -> np.ndarray:
+    """Wilder ATR; element ``period`` is the first defined value."""
+    ranges = true_range(high, low, close)
+    result = np.full(len(ranges), np.nan)
+    if len(ranges) < period + 1:
+        return result
+    atr = float(np.mean(ranges[1 : period + 1]))
+    output = [atr]
+    for value in ranges[period + 1 :].tolist():
+        atr = (atr * (period - 1) + value) / period
+        output.append(atr)
+    result[period:] = output
+    return result
+
+
+def last_value(series: np.ndarray, default: float) -> float:
+    """Return the latest defined element, or ``default`` for a short series."""
+    if not len(series):
+        return default
+    value = float(series[-1])
+    return default if math.isnan(value) else value
+
+
+STREAMING_MIN_CANDLES = 50
+
+
+class IndicatorValues(NamedTuple):
+    ema20: float
+    previous_ema20: float
+    ema50: float
+    macd: float
+    macd_signal: float
+    rsi14: float
+    atr14: float
+
+
+@dataclass(slots=True)
+class IndicatorState:
+    """Recurrence state of one series right after its last folded candle."""
+
+    last_candle: tuple[int, float, float, float]
+    ema20_history: deque[float]
+    ema50: float
+    ema12: float
+    ema26: float
+    macd_signal: float
+    average_gain: float
+    average_loss: float
+    atr: float
+
+    @classmethod
+    def seed(
+        cls,
+        timestamps: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+    ) -> "IndicatorState":
+        """Build the state from a full window; requires 50 candles."""
+        if len(closes) < STREAMING_MIN_CANDLES:
+            raise ValueError("Недостаточно свечей для потокового состояния")
+        ema20 = ema_series(closes, 20)
+        _, signal_line, _ = macd_series(closes)
+        deltas = np.diff(closes)
+        gains = np.where(deltas > 0, deltas, 0)
+        losses = np.where(deltas < 0, -deltas, 0)
+        average_gain = float(gains[:14].mean())
+        average_loss = float(losses[:14].mean())
+        for gain, loss in zip(gains[14:].tolist(), losses[14:].tolist()):
+            average_gain = (average_gain * 13 + gain) / 14
+            average_loss = (average_loss * 13 + loss) / 14
+        return cls(
+            last_candle=(
+                int(timestamps[-1]),
+                float(highs[-1]),
+                float(lows[-1]),
+                float(closes[-1]),
+            ),
+            ema20_history=deque(ema20[-4:].tolist(), maxlen=4),
+            ema50=float(ema_series(closes, 50)[-1]),
+            ema12=float(ema_series(closes, 12)[-1]),
+            ema26=float(ema_series(closes, 26)[-1]),
+            macd_signal=float(signal_line[-1]),
+            average_gain=average_gain,
+            average_loss=average_loss,
+            atr=float(atr_series(highs, lows, closes)[-1]),
+        )
+
+    def advance(self, timestamp: int, high: float, low: float, close: float) -> None:
+        """Fold in exactly one newly confirmed candle."""
+        previous_close = self.last_candle[3]
+        ema20 = self.ema20_history[-1]
+        self.ema20_history.append((close - ema20) * (2 / 21) + ema20)
+        self.ema50 = (close - self.ema50) * (2 / 51) + self.ema50
+        self.ema12 = (close - self.ema12) * (2 / 13) + self.ema12
+        self.ema26 = (close - self.ema26) * (2 / 27) + self.ema26
+        macd = self.ema12 - self.ema26
+        self.macd_signal = (macd - self.macd_signal) * (2 / 10) + self.macd_signal
+        delta = close - previous_close
+        self.average_gain = (self.average_gain * 13 + (delta if delta > 0 else 0.0)) / 14
+        self.average_loss = (self.average_loss * 13 + (-delta if delta < 0 else 0.0)) / 14
+        candle_range = max(high - low, abs(high - previous_close), abs(low - previous_close))
+        self.atr = (self.atr * 13 + candle_range) / 14
+        self.last_candle = (int(timestamp), float(high), float(low), float(close))
+
+    def values(self) -> IndicatorValues:
+        return IndicatorValues(
+            ema20=self.ema20_history[-1],
+            previous_ema20=self.ema20_history[0],
+            ema50=self.ema50,
+            macd=self.ema12 - self.ema26,
+            macd_signal=self.macd_signal,
+            rsi14=_rsi_value(self.average_gain, self.average_loss),
+            atr14=self.atr,
+        )
+
+
+class StreamingIndicators:
+    """Per-(market, symbol, interval) states that fold in only new closed candles.
+
+    Any gap, revised candle or window that no longer contains the last folded
+    candle falls back to a full recompute from the supplied window.
+    """
+
+    def __init__(self) -> None:
+        self._states: dict[tuple[str, str, str], IndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def update(
+        self,
+        key: tuple[str, str, str],
+        timestamps: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        interval_ms: int,
+    ) -> Optional[IndicatorValues]:
+        with self._lock:
+            if len(closes) < STREAMING_MIN_CANDLES:
+                self._states.pop(key, None)
+                return None
+            state = self._states.get(key)
+            if state is not None and self._fold(
+                state, timestamps, highs, lows, closes, interval_ms
+            ):
+                return state.values()
+            state = IndicatorState.seed(timestamps, highs, lows, closes)
+            self._states[key] = state
+            return state.values()
+
+    @staticmethod
+    def _fold(
+        state: IndicatorState,
+        timestamps: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        interval_ms: int,
+    ) -> bool:
+        last_timestamp, last_high, last_low, last_close = state.last_candle
+        index = int(np.searchsorted(timestamps, last_timestamp))
+        if (
+            index >= len(timestamps)
+            or int(timestamps[index]) != last_timestamp
+            or float(highs[index]) != last_high
+            or float(lows[index]) != last_low
+            or float(closes[index]) != last_close
+        ):
+            return False
+        new_timestamps = timestamps[index:]
+        if len(new_timestamps) > 1 and not bool(
+            (np.diff(new_timestamps) == interval_ms).all()
+        ):
+            return False
+        for position in range(index + 1, len(timestamps)):
+            state.advance(
+                int(timestamps[position]),
+                float(highs[position]),
+                float(lows[position]),
+                float(closes[position]),
+            )
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
@@ -0,0 +1,129 @@
+"""Preloaded linear instrument rules, persisted in SQLite.
+
+The full instrument list is fetched in one paginated pass, kept in the
+shared in-memory cache of every Bybit client and refreshed by a background
+thread well before the cache expires, so the order entry path reads rules
+without a blocking request.  Persisted rules make a restart instant.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+from loguru import logger
+
+from api.bybit_api import INSTRUMENT_CACHE_SECONDS, BybitAPI, InstrumentDiff
+from storage.database import get_store
+
+
+# Refresh at a quarter of the cache lifetime; failures retry sooner.
+INSTRUMENT_REFRESH_SECONDS = INSTRUMENT_CACHE_SECONDS / 4
+INSTRUMENT_RETRY_SECONDS = 60.0
+
+_refresher: Optional["InstrumentRefresher"] = None
+_refresher_lock = threading.Lock()
+
+
+def _market(bybit: BybitAPI) -> str:
+    return bybit.base.rstrip("/")
+
+
+def load_persisted_instruments(bybit: BybitAPI) -> Optional[int]:
+    """Install persisted rules; return their fetch time in ms, if any."""
+    rows = get_store().load_instruments(_market(bybit))
+    if not rows:
+        return None
+    fetched_at_ms = min(row[2] for row in rows)
+    age_seconds = max(0.0, time.time() - fetched_at_ms / 1_000)
+    # The in-memory cache ages rules on the monotonic clock.
+    bybit._install_instruments(
+        bybit.base,
+        {symbol: payload for symbol, payload, _ in rows},
+        time.monotonic() - age_seconds,
+    )
+    return fetched_at_ms
+
+
+def refresh_instruments(bybit: BybitAPI) -> InstrumentDiff:
+    """Fetch every instrument, install it and persist only what changed."""
+    fetched_at_ms = int(time.time() * 1_000)
+    fetched_at = time.monotonic()
+    payloads = bybit.get_all_instruments()
+    diff = bybit._install_instruments(bybit.base, payloads, fetched_at)
+    updated = set(diff.added)
+    updated.update(symbol for symbol, _ in diff.changed)
+    get_store().save_instruments(
+        _market(bybit),
+        {symbol: payloads[symbol] for symbol in updated},
+        diff.removed,
+        fetched_at_ms=fetched_at_ms,
+    )
+    if diff.changed:
+        logger.info(
+            "Правила инструментов изменились: "
+            + ", ".join(f"{symbol} ({', '.join(names)})" for symbol, names in diff.changed)
+        )
+    if diff.added or diff.removed:
+        logger.info(
+            f"Инструменты Bybit: +{len(diff.added)} новых, -{len(diff.removed)} снятых"
+        )
+    return diff
+
+
+class InstrumentRefresher:
+    def __init__(self, bybit: Optional[BybitAPI] = None) -> None:
+        self.bybit = bybit or BybitAPI()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="instrument-refresh",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        try:
+            fetched_at_ms = load_persisted_instruments(self.bybit)
+        except Exception as error:
+            logger.warning(f"Не удалось прочитать сохранённые правила инструментов: {error}")
+            fetched_at_ms = None
+        wait = 0.0
+        if fetched_at_ms is not None:
+            wait = max(0.0, fetched_at_ms / 1_000 + INSTRUMENT_REFRESH_SECONDS - time.time())
+        while not self._stopping.wait(wait):
+            try:
+                refresh_instruments(self.bybit)
+                wait = INSTRUMENT_REFRESH_SECONDS
+            except Exception as error:
+                logger.warning(f"Не удалось обновить правила инструментов: {error}")
+                wait = INSTRUMENT_RETRY_SECONDS
+
+
+def start_instrument_preload() -> None:
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = InstrumentRefresher()
+            _refresher.start()
+
+
+def stop_instrument_preload() -> None:
+    global _refresher
+    with _refresher_lock:
+        refresher, _refresher = _refresher, None
+    if refresher is not None:
+        refresher.stop()
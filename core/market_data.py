@@ -2,47 +2,103 @@
 
 from __future__ import annotations
 
+import threading
 import time
-from typing import List, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, List, Mapping, Optional, Sequence, Tuple, TypeVar
 
 import numpy as np
 from loguru import logger
 
 from api.bybit_api import BybitAPI
+from api.bybit_stream import market_stream, start_market_stream
+from config import (
+    BYBIT_BASE_URL,
+    BYBIT_MAX_CONCURRENT_REQUESTS,
+    BYBIT_PUBLIC_WS_URL,
+    CANDLE_ARCHIVE_ENABLED,
+    MARKET_STREAM_ENABLED,
+    TRADABLE_TOKENS,
+)
+from core.candles import Candles
+from core.indicators import (
+    StreamingIndicators,
+    atr_series,
+    ema_series,
+    last_value,
+    macd_series,
+    rsi_series,
+)
 
 
-ANALYSIS_CACHE_TTL_SECONDS = 60
-_analysis_cache: dict[str, tuple[float, dict]] = {}
+# A closed candle can appear a moment after its boundary; retry that soon.
+ANALYSIS_CLOSE_RETRY_MS = 2_000
+ANALYSIS_TIMEFRAMES = {
+    "timeframe_3m": ("3", 100),
+    "timeframe_5m": ("5", 100),
+    "timeframe_1h": ("60", 100),
+    "timeframe_4h": ("240", 60),
+}
+# Bybit serves at most 1000 candles per request; older rows are never read.
+CANDLE_ARCHIVE_ROWS = 1_000
+# (market, symbol, timeframe) -> (next close in server ms, features).
+_analysis_cache: dict[tuple[str, str, str], tuple[int, dict]] = {}
+_analysis_cache_lock = threading.Lock()
+_analysis_fetch_locks: dict[tuple[str, str], threading.Lock] = {}
+# Shared by every caller so the process never exceeds the configured number
+# of parallel Bybit reads.  Tasks must not submit nested fetches themselves.
+_fetch_pool = ThreadPoolExecutor(
+    max_workers=max(1, min(10, BYBIT_MAX_CONCURRENT_REQUESTS)),
+    thread_name_prefix="bybit-fetch",
+)
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+_streaming_indicators = StreamingIndicators()
+
+
+def _timed(label: str, task: Callable[[], _V]) -> _V:
+    started = time.perf_counter()
+    try:
+        return task()
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1_000
+        logger.debug(f"Bybit {label}: {elapsed_ms:.0f} мс")
+
+
+def fetch_concurrently(
+    tasks: Mapping[_K, Callable[[], _V]],
+    *,
+    label: str = "",
+) -> dict[_K, _V]:
+    """Run independent Bybit reads in parallel and keep the input order.
+
+    The first failed task re-raises its exception after all tasks finish.
+    """
+    labels = {key: f"{label} {key}".strip() for key in tasks}
+    if len(tasks) <= 1:
+        return {key: _timed(labels[key], task) for key, task in tasks.items()}
+    futures = {
+        key: _fetch_pool.submit(_timed, labels[key], task)
+        for key, task in tasks.items()
+    }
+    errors = [future.exception() for future in futures.values()]
+    for error in errors:
+        if error is not None:
+            raise error
+    return {key: future.result() for key, future in futures.items()}
 
 
 def calculate_ema(prices: Sequence[float], period: int) -> float:
-    if not prices:
+    if not len(prices):
         return 0.0
     if len(prices) < period:
         return float(sum(prices) / len(prices))
-    values = np.asarray(prices, dtype=float)
-    ema = float(values[:period].mean())
-    multiplier = 2 / (period + 1)
-    for price in values[period:]:
-        ema = (float(price) - ema) * multiplier + ema
-    return float(ema)
+    return float(ema_series(prices, period)[-1])
 
 
 def calculate_rsi(prices: Sequence[float], period: int = 14) -> float:
-    if len(prices) < period + 1:
-        return 50.0
-    deltas = np.diff(prices)
-    gains = np.where(deltas > 0, deltas, 0)
-    losses = np.where(deltas < 0, -deltas, 0)
-    average_gain = float(gains[:period].mean())
-    average_loss = float(losses[:period].mean())
-    for index in range(period, len(deltas)):
-        average_gain = (average_gain * (period - 1) + float(gains[index])) / period
-        average_loss = (average_loss * (period - 1) + float(losses[index])) / period
-    if average_loss == 0:
-        return 50.0 if average_gain == 0 else 100.0
-    relative_strength = average_gain / average_loss
-    return float(100 - (100 / (1 + relative_strength)))
+    return last_value(rsi_series(prices, period), 50.0)
 
 
 def calculate_macd(
@@ -50,26 +106,14 @@ def calculate_macd(
 ) -> Tuple[float, float]:
     if len(prices) < slow + signal - 1:
         return 0.0, 0.0
-    history = [
-        calculate_ema(prices[:index], fast) - calculate_ema(prices[:index], slow)
-        for index in range(slow, len(prices) + 1)
-    ]
-    return float(history[-1]), float(calculate_ema(history, signal))
+    line, signal_line, _ = macd_series(prices, fast, slow, signal)
+    return float(line[-1]), float(signal_line[-1])
 
 
-def calculate_atr(klines: Sequence[dict], period: int = 14) -> float:
+def calculate_atr(klines: Candles, period: int = 14) -> float:
     if len(klines) < period + 1:
         return 0.0
-    true_ranges = []
-    for index in range(1, len(klines)):
-        high = float(klines[index]["high"])
-        low = float(klines[index]["low"])
-        previous_close = float(klines[index - 1]["close"])
-        true_ranges.append(max(high - low, abs(high - previous_close), abs(low - previous_close)))
-    atr = float(np.mean(true_ranges[:period]))
-    for value in true_ranges[period:]:
-        atr = (atr * (period - 1) + value) / period
-    return atr
+    return float(atr_series(klines.high, klines.low, klines.close, period)[-1])
 
 
 def _interval_ms(interval: str) -> int:
@@ -81,53 +125,205 @@ def _interval_ms(interval: str) -> int:
     return mapping[interval]
 
 
+def _server_now_ms(bybit: BybitAPI) -> int:
+    server_now = getattr(bybit, "server_now_ms", None)
+    return int(server_now()) if callable(server_now) else int(time.time() * 1_000)
+
+
+def _fetch_closed_candles(
+    bybit: BybitAPI,
+    symbol: str,
+    interval: str,
+    count: int,
+) -> Candles:
+    response = bybit.get_kline(symbol, interval, limit=min(1_000, count))
+    server_ms = int(response.get("time") or _server_now_ms(bybit))
+    rows = response.get("result", {}).get("list", [])
+    return Candles.from_bybit_rows(rows, _interval_ms(interval)).closed_before(server_ms)
+
+
+def _contiguous_tail(timestamps: np.ndarray, duration_ms: int) -> int:
+    """Length of the newest run of candles without a missing interval."""
+    if not len(timestamps):
+        return 0
+    breaks = np.flatnonzero(np.diff(timestamps) != duration_ms)
+    return len(timestamps) - int(breaks[-1]) - 1 if len(breaks) else len(timestamps)
+
+
+def _archived_kline_data(
+    bybit: BybitAPI,
+    symbol: str,
+    interval: str,
+    limit: int,
+) -> Candles:
+    """Serve from the SQLite archive and fetch only the missing candles."""
+    # storage imports utils, which imports this package.
+    from storage.database import get_store
+
+    store = get_store()
+    market = str(getattr(bybit, "base", "")).rstrip("/")
+    duration_ms = _interval_ms(interval)
+    archived = Candles.from_records(
+        store.load_candles(market, symbol, interval, limit),
+        duration_ms,
+    )
+    if len(archived):
+        # The candle starting at newest + k * duration closes at
+        # newest + (k + 1) * duration; count those already closed locally.
+        newest_ms = int(archived.timestamp[-1])
+        missing_new = max(0, (_server_now_ms(bybit) - newest_ms) // duration_ms - 1)
+        complete = _contiguous_tail(archived.timestamp, duration_ms) >= limit
+        if missing_new == 0 and complete:
+            return archived
+        if complete:
+            streamed = _streamed_candles(bybit, symbol, interval, newest_ms)
+            if streamed is not None:
+                return _archive_and_reload(
+                    bybit, market, symbol, interval, limit, streamed
+                )
+        # Bybit returns the newest rows, so a gap is only covered by
+        # refetching the whole window; +1 is the still-open candle.
+        count = missing_new + (1 if complete else limit + 1)
+    else:
+        count = limit + 1
+    fetched = _fetch_closed_candles(bybit, symbol, interval, count)
+    if not len(fetched):
+        return archived
+    return _archive_and_reload(bybit, market, symbol, interval, limit, fetched)
+
+
+def _streamed_candles(
+    bybit: BybitAPI,
+    symbol: str,
+    interval: str,
+    newest_ms: int,
+) -> Optional[Candles]:
+    """Candles after ``newest_ms`` from the public stream, if it covers them."""
+    stream = market_stream(str(getattr(bybit, "base", "")))
+    if stream is None:
+        return None
+    records = stream.closed_candles(
+        symbol,
+        interval,
+        after_ms=newest_ms,
+        now_ms=_server_now_ms(bybit),
+    )
+    if records is None:
+        return None
+    return Candles.from_records(records, _interval_ms(interval))
+
+
+def _archive_and_reload(
+    bybit: BybitAPI,
+    market: str,
+    symbol: str,
+    interval: str,
+    limit: int,
+    fetched: Candles,
+) -> Candles:
+    from storage.database import get_store
+
+    store = get_store()
+    duration_ms = _interval_ms(interval)
+    if len(fetched):
+        store.save_candles(
+            market,
+            symbol,
+            interval,
+            fetched.records(),
+            keep_since_ms=int(fetched.timestamp[-1])
+            - (CANDLE_ARCHIVE_ROWS - 1) * duration_ms,
+        )
+    return Candles.from_records(
+        store.load_candles(market, symbol, interval, limit),
+        duration_ms,
+    )
+
+
+def market_stream_topics() -> set[str]:
+    """Ticker and analysis kline topics of traded tokens and alert symbols."""
+    topics: set[str] = set()
+    for token in TRADABLE_TOKENS:
+        symbol = f"{token}USDT"
+        topics.add(f"tickers.{symbol}")
+        topics.update(
+            f"kline.{interval}.{symbol}" for interval, _ in ANALYSIS_TIMEFRAMES.values()
+        )
+    from storage.database import get_store
+
+    for alert in get_store().get_active_alerts():
+        symbol = f"{alert['symbol']}USDT"
+        topics.add(f"tickers.{symbol}")
+        if alert["kind"] == "rsi":
+            topics.add(f"kline.{alert['timeframe'] or '15'}.{symbol}")
+    return topics
+
+
+def start_public_stream() -> None:
+    """Start the shared public WebSocket unless it is disabled in config."""
+    if MARKET_STREAM_ENABLED:
+        start_market_stream(BYBIT_PUBLIC_WS_URL, BYBIT_BASE_URL, market_stream_topics)
+
+
 def get_kline_data(
     bybit: BybitAPI,
     symbol: str,
     interval: str = "1",
     limit: int = 200,
-) -> List[dict]:
+) -> Candles:
     """Return only confirmed closed candles in chronological order.
 
     Bybit explicitly documents that the newest open candle's ``closePrice`` is
     merely the latest trade.  Excluding it prevents repainting AI signals.
+    Monthly candles have no fixed duration and always bypass the archive.
     """
+    symbol, interval = symbol.upper(), str(interval)
     try:
-        response = bybit.get_kline(symbol, interval, limit=min(1_000, limit + 1))
-        server_ms = int(response.get("time") or time.time() * 1_000)
-        duration_ms = _interval_ms(str(interval))
-        rows = list(response.get("result", {}).get("list", []))
-        rows.reverse()
-        parsed = [
-            {
-                "timestamp": int(row[0]),
-                "closed_at": int(row[0]) + duration_ms,
-                "open": float(row[1]),
-                "high": float(row[2]),
-                "low": float(row[3]),
-                "close": float(row[4]),
-                "volume": float(row[5]),
-            }
-            for row in rows
-            if int(row[0]) + duration_ms <= server_ms
-        ]
-        return parsed[-limit:]
+        if CANDLE_ARCHIVE_ENABLED and interval != "M":
+            return _archived_kline_data(bybit, symbol, interval, limit)
+        return _fetch_closed_candles(bybit, symbol, interval, limit + 1)[-limit:]
     except Exception as error:
         logger.error(f"Ошибка получения закрытых свечей {symbol}/{interval}: {error}")
-        return []
-
-
-def _timeframe_features(klines: Sequence[dict], now_ms: int) -> dict:
-    closes = [float(candle["close"]) for candle in klines]
-    volumes = [float(candle["volume"]) for candle in klines]
-    ema20 = calculate_ema(closes, 20)
-    ema50 = calculate_ema(closes, 50)
-    previous_ema20 = calculate_ema(closes[:-3], 20) if len(closes) > 23 else ema20
-    macd, macd_signal = calculate_macd(closes)
-    window = list(klines[-20:])
-    average_volume = float(np.mean(volumes[-20:])) if volumes else 0.0
-    volume_ratio = volumes[-1] / average_volume if average_volume > 0 else 0.0
-    last_closed_at = int(klines[-1]["closed_at"])
+        return Candles.empty()
+
+
+def _timeframe_features(
+    klines: Candles,
+    now_ms: int,
+    *,
+    stream_key: Optional[tuple[str, str, str]] = None,
+) -> dict:
+    closes, volumes = klines.close, klines.volume
+    highs, lows = klines.high, klines.low
+    streamed = None
+    if stream_key is not None:
+        streamed = _streaming_indicators.update(
+            stream_key,
+            klines.timestamp,
+            highs,
+            lows,
+            closes,
+            _interval_ms(stream_key[2]),
+        )
+    if streamed is not None:
+        ema20, previous_ema20, ema50 = (
+            streamed.ema20,
+            streamed.previous_ema20,
+            streamed.ema50,
+        )
+        macd, macd_signal = streamed.macd, streamed.macd_signal
+        rsi, atr = streamed.rsi14, streamed.atr14
+    else:
+        ema20_values = ema_series(closes, 20)
+        ema20 = float(ema20_values[-1]) if len(closes) >= 20 else calculate_ema(closes, 20)
+        ema50 = calculate_ema(closes, 50)
+        previous_ema20 = float(ema20_values[-4]) if len(closes) > 23 else ema20
+        macd, macd_signal = calculate_macd(closes)
+        rsi = calculate_rsi(closes)
+        atr = last_value(atr_series(highs, lows, closes), 0.0)
+    average_volume = float(np.mean(volumes[-20:])) if len(volumes) else 0.0
+    volume_ratio = float(volumes[-1]) / average_volume if average_volume > 0 else 0.0
+    last_closed_at = int(klines.closed_at[-1])
     return {
         "ema20": round(ema20, 8),
         "ema50": round(ema50, 8),
@@ -135,12 +331,12 @@ def _timeframe_features(klines: Sequence[dict], now_ms: int) -> dict:
         "macd": round(macd, 8),
         "macd_signal": round(macd_signal, 8),
         "macd_histogram": round(macd - macd_signal, 8),
-        "rsi14": round(calculate_rsi(closes), 3),
-        "atr14": round(calculate_atr(klines), 8),
+        "rsi14": round(rsi, 3),
+        "atr14": round(atr, 8),
         "volume_ratio": round(volume_ratio, 3),
-        "swing_high": round(max(candle["high"] for candle in window), 8),
-        "swing_low": round(min(candle["low"] for candle in window), 8),
-        "price_series": [round(price, 8) for price in closes[-32:]],
+        "swing_high": round(float(highs[-20:].max()), 8),
+        "swing_low": round(float(lows[-20:].min()), 8),
+        "price_series": [round(price, 8) for price in closes[-32:].tolist()],
         "last_closed_candle_at": last_closed_at,
         "age_ms": max(0, now_ms - last_closed_at),
     }
@@ -166,36 +362,100 @@ def _regime(frames: dict[str, dict]) -> str:
     return "range"
 
 
+def _cached_frames(
+    market: str,
+    symbol: str,
+    now_ms: int,
+) -> tuple[dict[str, dict], list[str]]:
+    with _analysis_cache_lock:
+        cached = {
+            name: _analysis_cache.get((market, symbol, name))
+            for name in ANALYSIS_TIMEFRAMES
+        }
+    frames = {
+        name: entry[1]
+        for name, entry in cached.items()
+        if entry is not None and now_ms < entry[0]
+    }
+    return frames, [name for name in ANALYSIS_TIMEFRAMES if name not in frames]
+
+
+def _refresh_frames(
+    bybit: BybitAPI,
+    market: str,
+    symbol: str,
+    names: Sequence[str],
+) -> tuple[dict[str, dict], list[str]]:
+    """Fetch and cache only the given timeframes until their next close."""
+    datasets = fetch_concurrently(
+        {
+            name: lambda name=name: get_kline_data(
+                bybit, symbol, *ANALYSIS_TIMEFRAMES[name]
+            )
+            for name in names
+        },
+        label=f"kline {symbol}",
+    )
+    incomplete = [name for name, candles in datasets.items() if len(candles) < 50]
+    now_ms = _server_now_ms(bybit)
+    frames: dict[str, dict] = {}
+    for name, candles in datasets.items():
+        if name in incomplete:
+            continue
+        interval = ANALYSIS_TIMEFRAMES[name][0]
+        # Each market has its own candle history and indicator state.
+        features = _timeframe_features(
+            candles, now_ms, stream_key=(market, symbol, interval)
+        )
+        next_close_ms = features["last_closed_candle_at"] + _interval_ms(interval)
+        if next_close_ms <= now_ms:
+            next_close_ms = now_ms + ANALYSIS_CLOSE_RETRY_MS
+        frames[name] = features
+        with _analysis_cache_lock:
+            _analysis_cache[(market, symbol, name)] = (next_close_ms, features)
+    return frames, incomplete
+
+
 def get_market_analysis(bybit: BybitAPI, symbol: str, current_price: float) -> dict:
-    cached = _analysis_cache.get(symbol)
-    now = time.monotonic()
-    if cached and now - cached[0] < ANALYSIS_CACHE_TTL_SECONDS:
-        return {**cached[1], "current_price": current_price}
+    """Return closed-candle features, refetching each timeframe after it closes.
 
+    Every timeframe is cached until its next candle boundary in Bybit server
+    time.  Concurrent callers for one symbol share a single refresh.
+    """
+    market = str(getattr(bybit, "base", "")).rstrip("/")
     try:
-        datasets = {
-            "timeframe_3m": get_kline_data(bybit, symbol, "3", 100),
-            "timeframe_5m": get_kline_data(bybit, symbol, "5", 100),
-            "timeframe_1h": get_kline_data(bybit, symbol, "60", 100),
-            "timeframe_4h": get_kline_data(bybit, symbol, "240", 60),
-        }
-        incomplete = [name for name, candles in datasets.items() if len(candles) < 50]
-        if incomplete:
-            return {"error": f"incomplete_timeframes:{','.join(incomplete)}", "complete": False}
-        now_ms = int(time.time() * 1_000)
+        frames, stale = _cached_frames(market, symbol, _server_now_ms(bybit))
+        if stale:
+            with _analysis_cache_lock:
+                fetch_lock = _analysis_fetch_locks.setdefault(
+                    (market, symbol), threading.Lock()
+                )
+            with fetch_lock:
+                # Another thread may have refreshed while this one waited.
+                frames, stale = _cached_frames(market, symbol, _server_now_ms(bybit))
+                if stale:
+                    fresh, incomplete = _refresh_frames(bybit, market, symbol, stale)
+                    if incomplete:
+                        return {
+                            "error": f"incomplete_timeframes:{','.join(incomplete)}",
+                            "complete": False,
+                        }
+                    frames.update(fresh)
+        now_ms = _server_now_ms(bybit)
         frames = {
-            name: _timeframe_features(candles, now_ms)
-            for name, candles in datasets.items()
+            name: {
+                **frames[name],
+                "age_ms": max(0, now_ms - frames[name]["last_closed_candle_at"]),
+            }
+            for name in ANALYSIS_TIMEFRAMES
         }
-        analysis = {
+        return {
             "current_price": float(current_price),
             "complete": True,
             "as_of_ms": now_ms,
             "regime": _regime(frames),
             **frames,
         }
-        _analysis_cache[symbol] = (now, analysis)
-        return analysis
     except Exception as error:
         logger.error(f"Ошибка анализа рынка для {symbol}: {error}")
         return {"error": str(error), "complete": False}
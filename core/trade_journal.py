@@ -12,12 +12,14 @@ import hashlib
 import json
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import asdict, dataclass, is_dataclass
 from decimal import Decimal, InvalidOperation
 from functools import wraps
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 from api.bybit_api import BybitAPI
+from api.rate_limit import PRIORITY_BACKFILL, request_priority
 from storage.database import SQLiteStore, get_store
 from utils.logger_setup import logger
 
@@ -28,6 +30,9 @@ RECENT_OVERLAP_MS = 2 * DAY_MS
 SYNC_FRESH_MS = 60 * 1_000
 MAX_LOOKBACK_DAYS = 365
 UID_RETRY_SECONDS = 60.0
+# Closed PnL windows fetched at once; the shared private-read bucket still
+# paces them at backfill priority.
+CLOSED_PNL_SYNC_WORKERS = 3
 _CLOSED_PNL_SYNC_LOCK = threading.Lock()
 
 
@@ -44,6 +49,14 @@ class SyncSummary:
     skipped_busy: bool = False
 
 
+@dataclass(frozen=True)
+class SyncProgress:
+    windows_done: int
+    windows_total: int
+    fetched: int
+    inserted: int
+
+
 def _single_closed_pnl_sync(method):
     """Avoid duplicate year-long backfills from concurrent Telegram clicks."""
 
@@ -578,10 +591,7 @@ class TradeJournal:
                 str(item["record_id"]),
             )
         )
-        inserted = 0
-        for item in normalized:
-            if self.store.upsert_closed_trade_record(self.account_scope, item):
-                inserted += 1
+        inserted = self.store.upsert_closed_trade_records(self.account_scope, normalized)
         return len(normalized), inserted, ignored
 
     @_single_closed_pnl_sync
@@ -591,7 +601,9 @@ class TradeJournal:
         lookback_days: int,
         force: bool = False,
         now_ms: Optional[int] = None,
+        progress: Optional[Callable[[SyncProgress], None]] = None,
     ) -> SyncSummary:
+        """Import missing Closed PnL windows; ``progress`` runs after each one."""
         days = max(1, min(int(lookback_days), MAX_LOOKBACK_DAYS))
         now = int(now_ms or time.time() * 1_000)
         required_start = now - days * DAY_MS
@@ -629,29 +641,39 @@ class TradeJournal:
                 ranges.append((refresh_start, now))
         ranges = _merge_ranges(ranges)
 
+        pending_windows = [
+            window
+            for range_start, range_end in sorted(ranges, reverse=True)
+            for window in _iter_windows_newest_first(range_start, range_end)
+        ]
         fetched = inserted = ignored = windows = 0
         # Recent data is requested first so a partial outage still leaves the
         # most useful records durably cached. The watermark advances only after
-        # every required window succeeds.
-        for range_start, range_end in sorted(ranges, reverse=True):
-            for window_start, window_end in _iter_windows_newest_first(
-                range_start,
-                range_end,
-            ):
-                response = self.bybit.get_closed_pnl(
-                    limit=100,
-                    start_time=window_start,
-                    end_time=window_end,
-                    all_pages=True,
-                )
-                rows = response.get("result", {}).get("list", [])
-                if not isinstance(rows, list):
-                    raise ValueError("Bybit Closed PnL result.list должен быть массивом")
-                accepted, new_rows, rejected = self.import_closed_pnl_rows(rows)
-                fetched += len(rows)
-                inserted += new_rows
-                ignored += rejected + (len(rows) - accepted - rejected)
-                windows += 1
+        # every required window succeeds.  The pool starts windows in this
+        # order; each one is imported here, in this thread, as soon as it
+        # arrives.
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(CLOSED_PNL_SYNC_WORKERS, len(pending_windows))),
+            thread_name_prefix="closed-pnl",
+        ) as pool:
+            futures = [
+                pool.submit(self._closed_pnl_window, window_start, window_end)
+                for window_start, window_end in pending_windows
+            ]
+            try:
+                for future in as_completed(futures):
+                    rows = future.result()
+                    accepted, new_rows, rejected = self.import_closed_pnl_rows(rows)
+                    fetched += len(rows)
+                    inserted += new_rows
+                    ignored += rejected + (len(rows) - accepted - rejected)
+                    windows += 1
+                    if progress is not None:
+                        progress(SyncProgress(windows, len(futures), fetched, inserted))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
 
         new_coverage_start = (
             required_start if not state else min(required_start, coverage_start)
@@ -672,6 +694,21 @@ class TradeJournal:
             windows,
         )
 
+    def _closed_pnl_window(self, start_ms: int, end_ms: int) -> list[dict[str, Any]]:
+        # History windows yield to screens and order confirmations.  Pool
+        # threads do not inherit the caller's context, so set it here.
+        with request_priority(PRIORITY_BACKFILL):
+            response = self.bybit.get_closed_pnl(
+                limit=100,
+                start_time=start_ms,
+                end_time=end_ms,
+                all_pages=True,
+            )
+        rows = response.get("result", {}).get("list", [])
+        if not isinstance(rows, list):
+            raise ValueError("Bybit Closed PnL result.list должен быть массивом")
+        return rows
+
     def closed_records(
         self,
         *,
@@ -52,8 +52,23 @@ def run_auto_mode():
     """Запуск автоматической торговли"""
     logger.info("Запуск автоматического режима...")
 
+    from api.bybit_api import close_shared_session, start_account_stream, stop_account_stream
+    from api.bybit_stream import stop_market_stream
     from core.auto_trading import main_loop
-    main_loop()
+    from core.instruments import start_instrument_preload, stop_instrument_preload
+    from core.market_data import start_public_stream
+    from storage.database import close_store
+    start_instrument_preload()
+    start_public_stream()
+    start_account_stream()
+    try:
+        main_loop()
+    finally:
+        stop_account_stream()
+        stop_instrument_preload()
+        stop_market_stream()
+        close_shared_session()
+        close_store()
 
 
 def main():
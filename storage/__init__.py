@@ -1,5 +1,5 @@
 """Persistent storage for multi-user bot data."""
 
-from storage.database import SQLiteStore, get_store
+from storage.database import AsyncStore, SQLiteStore, close_store, get_async_store, get_store
 
-__all__ = ["SQLiteStore", "get_store"]
+__all__ = ["AsyncStore", "SQLiteStore", "close_store", "get_async_store", "get_store"]
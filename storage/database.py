@@ -1,25 +1,42 @@
 """Transactional SQLite repository for multi-user bot data.
 
-SQLite is the durable source of truth for one bot process. Its synchronous
-methods are called through asyncio.to_thread from Telegram handlers, so I/O
-does not block the event loop.
+SQLite is the durable source of truth for one bot process. Async code uses
+the AsyncStore facade: writes queue to one writer thread that group-commits
+bursts, reads run on a small reader pool, so I/O never blocks the event loop.
+Each thread reuses one query-only connection; readers run alongside writers.
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
 import math
+import queue
 import sqlite3
 import threading
-from contextlib import contextmanager
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, contextmanager
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Any, Iterable, Iterator, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 from config import ALERT_DEFAULT_COOLDOWN_SECONDS, DATABASE_PATH
 from utils.logger_setup import logger
 
+# Setup states a Closed PnL record may still be attributed to.
+_OPEN_SETUP_STATUSES = ("entry_filled", "open", "closing", "reconcile_required")
+# Most queued write operations the writer folds into one transaction.
+WRITE_BATCH_LIMIT = 64
+ASYNC_READ_WORKERS = 4
+USER_CACHE_SIZE = 1_024
+# Activity rows and last-seen touches are written behind, in batches.
+WRITE_BEHIND_FLUSH_SECONDS = 2.0
+WRITE_BEHIND_FLUSH_ROWS = 100
+WRITE_BEHIND_MAX_ROWS = 1_000
+
 
 def _utcnow() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
@@ -37,6 +54,12 @@ def _json_payload(value: Optional[dict[str, Any]]) -> Optional[str]:
     )
 
 
+def _chunked(values: list[Any], size: int = 500) -> Iterator[list[Any]]:
+    # Stay well below SQLite's bound-parameter limit on older builds.
+    for index in range(0, len(values), size):
+        yield values[index:index + size]
+
+
 def _hex_digest(value: str, length: int, label: str) -> str:
     normalized = str(value).strip().lower()
     if (
@@ -47,34 +70,383 @@ def _hex_digest(value: str, length: int, label: str) -> str:
     return normalized
 
 
+def _write_operation(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Run a write method on the store's writer thread while one is running."""
+
+    @functools.wraps(method)
+    def wrapped(self: "SQLiteStore", *args: Any, **kwargs: Any) -> Any:
+        future = self._submit_write(method, args, kwargs)
+        if future is not None:
+            return future.result()
+        return method(self, *args, **kwargs)
+
+    wrapped.writes = True  # type: ignore[attr-defined]
+    return wrapped
+
+
+class _GroupedConnection:
+    """The writer's connection while it group-commits a batch.
+
+    An operation's own BEGIN/COMMIT/ROLLBACK become a savepoint inside the
+    batch transaction, so each operation keeps its rollback semantics.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._connection = connection
+        # Run once the batch transaction has ended.
+        self.after_commit: list[Callable[[], None]] = []
+
+    def execute(self, sql: str, *parameters: Any) -> sqlite3.Cursor:
+        statement = sql.strip().upper()
+        if statement.startswith("BEGIN"):
+            return self._connection.execute("SAVEPOINT operation")
+        if statement == "COMMIT":
+            return self._connection.execute("RELEASE operation")
+        if statement == "ROLLBACK":
+            self._connection.execute("ROLLBACK TO operation")
+            return self._connection.execute("RELEASE operation")
+        return self._connection.execute(sql, *parameters)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+
+class _StoreWriter:
+    """Single thread that owns the write connection and commits in groups.
+
+    Operations queued while the previous group was committing share the
+    next transaction.  Every caller is answered only after that COMMIT, so
+    an acknowledged write is exactly as durable as a standalone one.
+    """
+
+    def __init__(self, store: "SQLiteStore") -> None:
+        self._store = store
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._state_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run,
+            name="sqlite-writer",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def submit(
+        self,
+        method: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Optional[Future]:
+        """Queue one operation; ``None`` means run it directly instead."""
+        if threading.current_thread() is self._thread:
+            return None
+        future: Future = Future()
+        with self._state_lock:
+            if self._closed:
+                return None
+            self._queue.put((future, method, args, kwargs))
+        return future
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < WRITE_BATCH_LIMIT:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: list[tuple[Future, Callable[..., Any], tuple, dict]]) -> None:
+        store = self._store
+        outcomes: list[tuple[Future, bool, Any]] = []
+        try:
+            with store._write_lock, store._connection() as conn:
+                group = store._local.group = _GroupedConnection(conn)
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    for future, method, args, kwargs in batch:
+                        if not future.set_running_or_notify_cancel():
+                            continue
+                        conn.execute("SAVEPOINT item")
+                        try:
+                            result = method(store, *args, **kwargs)
+                        except Exception as error:
+                            conn.execute("ROLLBACK TO item")
+                            conn.execute("RELEASE item")
+                            outcomes.append((future, False, error))
+                        else:
+                            conn.execute("RELEASE item")
+                            outcomes.append((future, True, result))
+                    conn.execute("COMMIT")
+                except Exception:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    raise
+                finally:
+                    store._local.group = None
+                    for callback in group.after_commit:
+                        callback()
+        except Exception as error:
+            logger.error(f"SQLite: групповая запись не удалась: {error}")
+            for future, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for future, succeeded, value in outcomes:
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+class _WriteBehindBuffer:
+    """Bounded buffer for low-criticality writes.
+
+    Rows are flushed in one transaction once WRITE_BEHIND_FLUSH_ROWS are
+    waiting, every WRITE_BEHIND_FLUSH_SECONDS and at shutdown.  A full buffer
+    drops its oldest activity row; repeated touches of one chat coalesce.
+    """
+
+    def __init__(self, store: "SQLiteStore") -> None:
+        self._store = store
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._activity: deque[tuple[Any, ...]] = deque()
+        self._touches: dict[int, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.stats = {"buffered": 0, "coalesced": 0, "flushed": 0, "dropped": 0}
+
+    def add_activity(self, row: tuple[Any, ...]) -> None:
+        with self._condition:
+            if len(self._activity) >= WRITE_BEHIND_MAX_ROWS:
+                self._activity.popleft()
+                self.stats["dropped"] += 1
+            self._activity.append(row)
+            self._added()
+
+    def touch(self, chat_id: int, seen_at: str) -> None:
+        with self._condition:
+            if chat_id in self._touches:
+                self.stats["coalesced"] += 1
+            self._touches[chat_id] = seen_at
+            self._added()
+
+    def _added(self) -> None:
+        self.stats["buffered"] += 1
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(
+                target=self._run,
+                name="sqlite-write-behind",
+                daemon=True,
+            )
+            self._thread.start()
+        if len(self._activity) + len(self._touches) >= WRITE_BEHIND_FLUSH_ROWS:
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if (
+                    not self._stopping
+                    and len(self._activity) + len(self._touches)
+                    < WRITE_BEHIND_FLUSH_ROWS
+                ):
+                    self._condition.wait(WRITE_BEHIND_FLUSH_SECONDS)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._condition:
+                activity, self._activity = list(self._activity), deque()
+                touches, self._touches = self._touches, {}
+            rows = len(activity) + len(touches)
+            if not rows:
+                return
+            try:
+                self._store._write_buffered(activity, sorted(touches.items()))
+            except Exception as error:
+                logger.warning(f"SQLite: отложенная запись {rows} строк не удалась: {error}")
+                with self._condition:
+                    self.stats["dropped"] += rows
+                return
+            with self._condition:
+                self.stats["flushed"] += rows
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._condition:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._condition.notify()
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+        with self._condition:
+            self._stopping = False
+
+
 class SQLiteStore:
     """Repository for Telegram state, risk controls, and the trade journal."""
 
     def __init__(self, path: Path = DATABASE_PATH) -> None:
         self.path = Path(path)
-        self._lock = threading.RLock()
+        # Serializes writers only; WAL lets readers run alongside them.
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._connections: dict[tuple[threading.Thread, bool], sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        self._writer: Optional[_StoreWriter] = None
+        self._write_behind = _WriteBehindBuffer(self)
+        # LRU of the last persisted profile per chat; unchanged ones skip the
+        # upsert.  deactivate_chat bumps the epoch, so an upsert that raced
+        # it is not remembered.  Both are guarded by ``_users_lock``.
+        self._profiles: OrderedDict[int, tuple[Any, ...]] = OrderedDict()
+        self._profiles_epoch = 0
+        # Alert owners whose active state changed invalidate alert indexes.
+        self._alert_owners_version = 0
+        # LRU of users rows; a version bump makes in-flight reads uncacheable.
+        self._users: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self._user_versions: dict[int, int] = {}
+        self._users_lock = threading.Lock()
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._initialize()
 
-    @contextmanager
-    def _connection(self) -> Iterator[sqlite3.Connection]:
+    def _open(self, *, readonly: bool = False) -> sqlite3.Connection:
         connection = sqlite3.connect(
             self.path,
             timeout=10,
             isolation_level=None,
             check_same_thread=False,
+            cached_statements=256,
         )
         connection.row_factory = sqlite3.Row
         try:
             connection.execute("PRAGMA foreign_keys = ON")
-            connection.execute("PRAGMA journal_mode = WAL")
             connection.execute("PRAGMA busy_timeout = 5000")
+            if readonly:
+                connection.execute("PRAGMA query_only = ON")
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    @contextmanager
+    def _checkout(self, readonly: bool) -> Iterator[sqlite3.Connection]:
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            local.generation = self._generation
+            local.connections = {}
+            local.depth = {False: 0, True: 0}
+        connection = local.connections.get(readonly)
+        if connection is None:
+            connection = self._open(readonly=readonly)
+            with self._connections_lock:
+                # Threads that exited cannot reuse theirs; close them here.
+                for key in [key for key in self._connections if not key[0].is_alive()]:
+                    self._connections.pop(key).close()
+                self._connections[(threading.current_thread(), readonly)] = connection
+            local.connections[readonly] = connection
+        local.depth[readonly] += 1
+        try:
             yield connection
         finally:
+            local.depth[readonly] -= 1
+            if local.depth[readonly] == 0 and connection.in_transaction:
+                connection.rollback()
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Yield the calling thread's long-lived write connection.
+
+        Each thread keeps one connection, with its PRAGMAs and statement cache,
+        until close().  A transaction a failed call left open is rolled back
+        before the connection is handed out again.  Hold ``_write_lock``.
+        On the writer thread this is the batch's grouped connection.
+        """
+        group = getattr(self._local, "group", None)
+        if group is not None:
+            yield group
+            return
+        with self._checkout(False) as connection:
+            yield connection
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Yield the calling thread's query-only connection; no lock needed."""
+        with self._checkout(True) as connection:
+            yield connection
+
+    def start_writer(self) -> None:
+        """Route every write through one group-committing writer thread."""
+        with self._connections_lock:
+            if self._writer is None:
+                self._writer = _StoreWriter(self)
+                self._writer.start()
+
+    def _submit_write(
+        self,
+        method: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Optional[Future]:
+        writer = self._writer
+        return writer.submit(method, args, kwargs) if writer is not None else None
+
+    def write_behind_stats(self) -> dict[str, int]:
+        """Buffered, coalesced, flushed and dropped write-behind rows."""
+        with self._write_behind._condition:
+            return dict(self._write_behind.stats)
+
+    def close(self) -> None:
+        """Flush buffered rows, drain the writer, close every connection.
+
+        Later calls write directly and reconnect.
+        """
+        self._write_behind.stop()
+        stats = self.write_behind_stats()
+        if stats["buffered"]:
+            logger.info(
+                "SQLite write-behind: "
+                + ", ".join(f"{name} {value}" for name, value in stats.items())
+            )
+        with self._connections_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.stop()
+        with self._write_lock, self._connections_lock:
+            self._generation += 1
+            connections, self._connections = self._connections, {}
+        for connection in connections.values():
             connection.close()
 
     def _initialize(self) -> None:
-        with self._lock, self._connection() as conn:
+        # A private connection: WAL mode persists in the file, and
+        # secure_delete below must not stick to a pooled connection.
+        with self._write_lock, closing(self._open()) as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS users (
@@ -266,6 +638,36 @@ class SQLiteStore:
                     PRIMARY KEY(account_scope, bucket_time_ms)
                 );
 
+                CREATE TABLE IF NOT EXISTS candle_archive (
+                    market TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    start_ms INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    volume REAL NOT NULL,
+                    PRIMARY KEY(market, symbol, interval, start_ms)
+                ) WITHOUT ROWID;
+
+                CREATE TABLE IF NOT EXISTS alert_groups (
+                    kind TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL DEFAULT '',
+                    last_value REAL NOT NULL,
+                    checked_at TEXT NOT NULL,
+                    PRIMARY KEY(kind, symbol, timeframe)
+                ) WITHOUT ROWID;
+
+                CREATE TABLE IF NOT EXISTS instrument_rules (
+                    market TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    payload_json TEXT NOT NULL,
+                    fetched_at_ms INTEGER NOT NULL,
+                    PRIMARY KEY(market, symbol)
+                ) WITHOUT ROWID;
+
                 CREATE INDEX IF NOT EXISTS idx_alerts_active
                     ON alerts(is_enabled, kind, symbol, timeframe);
                 CREATE INDEX IF NOT EXISTS idx_alerts_chat ON alerts(chat_id, is_enabled);
@@ -344,6 +746,19 @@ class SQLiteStore:
                 )
                 """
             )
+            # Older revisions kept the last observed value on every alert row.
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO alert_groups (
+                    kind, symbol, timeframe, last_value, checked_at
+                )
+                SELECT kind, symbol, COALESCE(timeframe, ''), last_value,
+                       MAX(last_checked_at)
+                FROM alerts
+                WHERE last_value IS NOT NULL AND last_checked_at IS NOT NULL
+                GROUP BY kind, symbol, COALESCE(timeframe, '')
+                """
+            )
             # The bot now has a strict private-chat invariant.  Deactivate
             # legacy group rows so restart cannot edit or notify an old group.
             conn.execute(
@@ -356,12 +771,82 @@ class SQLiteStore:
                 (_utcnow(),),
             )
 
+    def _invalidate_user(self, chat_id: int) -> None:
+        """Drop a cached users row; inside a write group again after COMMIT."""
+        self._drop_cached_user(chat_id)
+        group = getattr(self._local, "group", None)
+        if group is not None:
+            group.after_commit.append(functools.partial(self._drop_cached_user, chat_id))
+
+    def _after_commit(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` now, or inside a write group once it has committed."""
+        group = getattr(self._local, "group", None)
+        if group is None:
+            callback()
+        else:
+            group.after_commit.append(callback)
+
+    def _remember_profile(self, chat_id: int, profile: tuple[Any, ...], epoch: int) -> None:
+        with self._users_lock:
+            if self._profiles_epoch != epoch:
+                return
+            self._profiles[chat_id] = profile
+            self._profiles.move_to_end(chat_id)
+            while len(self._profiles) > USER_CACHE_SIZE:
+                self._profiles.popitem(last=False)
+
+    def _forget_profile(self, chat_id: int) -> None:
+        with self._users_lock:
+            self._profiles.pop(chat_id, None)
+            self._profiles_epoch += 1
+
+    def _drop_cached_user(self, chat_id: int) -> None:
+        with self._users_lock:
+            self._users.pop(chat_id, None)
+            self._user_versions[chat_id] = self._user_versions.get(chat_id, 0) + 1
+
+    @staticmethod
+    def _profile(user: Any, is_admin: bool) -> tuple[Any, ...]:
+        return (
+            getattr(user, "id", None),
+            getattr(user, "username", None),
+            getattr(user, "first_name", None) or "",
+            getattr(user, "last_name", None) or "",
+            bool(is_admin),
+        )
+
+    def touch_user(self, user: Any, chat_id: int, is_admin: bool = False) -> bool:
+        """Buffer a last-seen touch if the stored profile is unchanged."""
+        with self._users_lock:
+            profile = self._profiles.get(chat_id)
+            if profile is not None:
+                self._profiles.move_to_end(chat_id)
+        if profile != self._profile(user, is_admin):
+            return False
+        self._write_behind.touch(chat_id, _utcnow())
+        return True
+
     def ensure_user(self, user: Any, chat_id: int, is_admin: bool = False) -> None:
-        """Upsert Telegram profile fields without overwriting preferences."""
+        """Upsert Telegram profile fields without overwriting preferences.
+
+        Unchanged profiles only get a write-behind last-seen touch.
+        """
+        if self.touch_user(user, chat_id, is_admin):
+            return
+        epoch = self._profiles_epoch
+        self._upsert_user(user, chat_id, is_admin)
+        self._remember_profile(chat_id, self._profile(user, is_admin), epoch)
+
+    @_write_operation
+    def _upsert_user(self, user: Any, chat_id: int, is_admin: bool) -> None:
         now = _utcnow()
         first_name = getattr(user, "first_name", None) or ""
         last_name = getattr(user, "last_name", None) or ""
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
+            previous = conn.execute(
+                "SELECT is_active, telegram_user_id FROM users WHERE chat_id = ?",
+                (chat_id,),
+            ).fetchone()
             conn.execute(
                 """
                 INSERT INTO users (
@@ -384,12 +869,43 @@ class SQLiteStore:
                     first_name, last_name, first_name, int(is_admin), now, now, now,
                 ),
             )
+            if previous is not None and (
+                not previous["is_active"]
+                or previous["telegram_user_id"] != getattr(user, "id", None)
+            ):
+                self._after_commit(self._bump_alert_owners)
+        self._invalidate_user(chat_id)
+
+    def cached_user(self, chat_id: int) -> Optional[dict[str, Any]]:
+        """Return the cached users row without touching SQLite."""
+        with self._users_lock:
+            cached = self._users.get(chat_id)
+            if cached is None:
+                return None
+            self._users.move_to_end(chat_id)
+            return dict(cached)
 
     def get_user(self, chat_id: int) -> dict[str, Any]:
-        with self._lock, self._connection() as conn:
+        """Return the users row, from the LRU cache when it is warm."""
+        cached = self.cached_user(chat_id)
+        if cached is not None:
+            return cached
+        with self._users_lock:
+            version = self._user_versions.get(chat_id, 0)
+        with self._reader() as conn:
             row = conn.execute("SELECT * FROM users WHERE chat_id = ?", (chat_id,)).fetchone()
-        return dict(row) if row else {}
-
+        if not row:
+            return {}
+        user = dict(row)
+        with self._users_lock:
+            # A write committed meanwhile may not be in this row.
+            if self._user_versions.get(chat_id, 0) == version:
+                self._users[chat_id] = user
+                while len(self._users) > USER_CACHE_SIZE:
+                    self._users.popitem(last=False)
+        return dict(user)
+
+    @_write_operation
     def update_user_settings(self, chat_id: int, **settings: Any) -> None:
         allowed = {
             "display_name", "locale", "timezone", "notifications_enabled",
@@ -403,15 +919,17 @@ class SQLiteStore:
         selected["updated_at"] = _utcnow()
         assignments = ", ".join(f"{column} = ?" for column in selected)
         values = [int(value) if isinstance(value, bool) else value for value in selected.values()]
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute(
                 f"UPDATE users SET {assignments} WHERE chat_id = ?",
                 (*values, chat_id),
             )
+        self._invalidate_user(chat_id)
 
+    @_write_operation
     def save_screen(self, chat_id: int, message_id: int, revision: int = 0) -> None:
         now = _utcnow()
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute(
                 """
                 UPDATE users
@@ -420,10 +938,13 @@ class SQLiteStore:
                 """,
                 (message_id, revision, now, chat_id),
             )
+        self._invalidate_user(chat_id)
 
+    @_write_operation
     def deactivate_chat(self, chat_id: int) -> None:
         """Drop a permanently unreachable Telegram target until it writes again."""
-        with self._lock, self._connection() as conn:
+        self._forget_profile(chat_id)
+        with self._write_lock, self._connection() as conn:
             conn.execute(
                 """
                 UPDATE users
@@ -432,9 +953,13 @@ class SQLiteStore:
                 """,
                 (_utcnow(), chat_id),
             )
+            # Again once committed, past any upsert that raced this update.
+            self._after_commit(functools.partial(self._forget_profile, chat_id))
+            self._after_commit(self._bump_alert_owners)
+        self._invalidate_user(chat_id)
 
     def screen_targets(self) -> list[tuple[int, int, int]]:
-        with self._lock, self._connection() as conn:
+        with self._reader() as conn:
             rows = conn.execute(
                 """
                 SELECT chat_id, screen_message_id, screen_revision FROM users
@@ -451,6 +976,7 @@ class SQLiteStore:
             for row in rows
         ]
 
+    @_write_operation
     def create_alert(
         self,
         chat_id: int,
@@ -477,7 +1003,7 @@ class SQLiteStore:
         ):
             raise ValueError("Порог алерта вне допустимого диапазона")
         now = _utcnow()
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             cursor = conn.execute(
                 """
                 INSERT INTO alerts (
@@ -494,7 +1020,7 @@ class SQLiteStore:
 
     def get_alerts(self, chat_id: int, include_disabled: bool = False) -> list[dict[str, Any]]:
         clause = "" if include_disabled else "AND is_enabled = 1"
-        with self._lock, self._connection() as conn:
+        with self._reader() as conn:
             rows = conn.execute(
                 f"""
                 SELECT * FROM alerts
@@ -505,27 +1031,50 @@ class SQLiteStore:
             ).fetchall()
         return [dict(row) for row in rows]
 
+    @_write_operation
     def delete_alert(self, chat_id: int, alert_id: int) -> bool:
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             cursor = conn.execute(
                 "DELETE FROM alerts WHERE id = ? AND chat_id = ?",
                 (alert_id, chat_id),
             )
             return cursor.rowcount == 1
 
-    def get_active_alerts(self) -> list[dict[str, Any]]:
-        with self._lock, self._connection() as conn:
+    def get_active_alerts(self, after_id: int = 0) -> list[dict[str, Any]]:
+        """Enabled alerts of active owners with an id above ``after_id``."""
+        with self._reader() as conn:
             rows = conn.execute(
                 """
                 SELECT a.*, u.notifications_enabled, u.price_alerts_enabled,
                        u.rsi_alerts_enabled
                 FROM alerts a JOIN users u ON u.chat_id = a.chat_id
                 WHERE a.is_enabled = 1 AND u.is_active = 1
-                  AND u.telegram_user_id = u.chat_id
-                """
+                  AND u.telegram_user_id = u.chat_id AND a.id > ?
+                ORDER BY a.id
+                """,
+                (after_id,),
             ).fetchall()
         return [dict(row) for row in rows]
 
+    def alert_owners_version(self) -> int:
+        """Bumped once a chat has been deactivated or reactivated."""
+        return self._alert_owners_version
+
+    def _bump_alert_owners(self) -> None:
+        self._alert_owners_version += 1
+
+    def alert_group_values(self) -> dict[tuple[str, str, Optional[str]], float]:
+        """Last observed value per (kind, symbol, timeframe) alert group."""
+        with self._reader() as conn:
+            rows = conn.execute(
+                "SELECT kind, symbol, NULLIF(timeframe, '') AS timeframe, last_value "
+                "FROM alert_groups"
+            ).fetchall()
+        return {
+            (row["kind"], row["symbol"], row["timeframe"]): float(row["last_value"])
+            for row in rows
+        }
+
     def apply_alert_observation(
         self,
         alert_id: int,
@@ -535,47 +1084,107 @@ class SQLiteStore:
         notification_message: Optional[str] = None,
     ) -> bool:
         """Persist one observation atomically and report a permitted trigger."""
+        return alert_id in self.apply_alert_observations(
+            [(alert_id, value, should_trigger, notification_message)]
+        )
+
+    @_write_operation
+    def apply_alert_observations(
+        self,
+        observations: Iterable[tuple[int, float, bool, Optional[str]]],
+        group_values: Iterable[tuple[str, str, Optional[str], float]] = (),
+    ) -> set[int]:
+        """Persist one evaluation pass in a single transaction.
+
+        Each observation is ``(alert_id, value, should_trigger, message)`` and
+        is applied in order with the per-alert cooldown and ``once`` rules;
+        returns the ids whose trigger was permitted.  ``group_values`` are
+        ``(kind, symbol, timeframe, value)`` rows for the groups observed.
+        """
+        observations = list(observations)
+        group_values = list(group_values)
+        if not observations and not group_values:
+            return set()
         now = _utcnow()
-        with self._lock, self._connection() as conn:
+        checked_at = datetime.now(timezone.utc)
+        triggered_ids: set[int] = set()
+        updates: list[tuple[Any, ...]] = []
+        notifications: list[tuple[Any, ...]] = []
+        with self._write_lock, self._connection() as conn:
             conn.execute("BEGIN IMMEDIATE")
-            alert = conn.execute(
-                "SELECT * FROM alerts WHERE id = ? AND is_enabled = 1", (alert_id,)
-            ).fetchone()
-            if not alert:
-                conn.execute("COMMIT")
-                return False
-
-            last_triggered = alert["last_triggered_at"]
-            cooldown_passed = True
-            if last_triggered:
-                elapsed = datetime.now(timezone.utc) - datetime.fromisoformat(last_triggered)
-                cooldown_passed = elapsed.total_seconds() >= int(alert["cooldown_seconds"])
-            triggered = bool(should_trigger and cooldown_passed)
-            enabled = 0 if triggered and alert["repeat_mode"] == "once" else 1
-            conn.execute(
-                """
-                UPDATE alerts
-                SET last_value = ?, last_checked_at = ?, last_triggered_at = ?,
-                    trigger_count = trigger_count + ?, is_enabled = ?, updated_at = ?
-                WHERE id = ?
-                """,
-                (
-                    value, now, now if triggered else last_triggered,
-                    1 if triggered else 0, enabled, now, alert_id,
-                ),
-            )
-            if triggered and notification_message:
-                conn.execute(
+            try:
+                alerts: dict[int, dict[str, Any]] = {}
+                ids = sorted({int(alert_id) for alert_id, *_ in observations})
+                for chunk in _chunked(ids):
+                    placeholders = ", ".join("?" for _ in chunk)
+                    for row in conn.execute(
+                        f"SELECT * FROM alerts WHERE id IN ({placeholders}) AND is_enabled = 1",
+                        chunk,
+                    ):
+                        alerts[int(row["id"])] = dict(row)
+                for alert_id, value, should_trigger, message in observations:
+                    alert = alerts.get(int(alert_id))
+                    if not alert or not alert["is_enabled"]:
+                        continue
+                    last_triggered = alert["last_triggered_at"]
+                    cooldown_passed = True
+                    if last_triggered:
+                        elapsed = checked_at - datetime.fromisoformat(last_triggered)
+                        cooldown_passed = elapsed.total_seconds() >= int(alert["cooldown_seconds"])
+                    triggered = bool(should_trigger and cooldown_passed)
+                    enabled = 0 if triggered and alert["repeat_mode"] == "once" else 1
+                    if triggered:
+                        alert["last_triggered_at"] = now
+                        triggered_ids.add(int(alert_id))
+                        if message:
+                            notifications.append(
+                                (int(alert["chat_id"]), alert_id, message, now)
+                            )
+                    alert["is_enabled"] = enabled
+                    updates.append(
+                        (
+                            value, now, alert["last_triggered_at"],
+                            1 if triggered else 0, enabled, now, alert_id,
+                        )
+                    )
+                conn.executemany(
+                    """
+                    UPDATE alerts
+                    SET last_value = ?, last_checked_at = ?, last_triggered_at = ?,
+                        trigger_count = trigger_count + ?, is_enabled = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    updates,
+                )
+                conn.executemany(
+                    """
+                    INSERT INTO alert_groups (
+                        kind, symbol, timeframe, last_value, checked_at
+                    ) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(kind, symbol, timeframe) DO UPDATE SET
+                        last_value = excluded.last_value,
+                        checked_at = excluded.checked_at
+                    """,
+                    (
+                        (kind, symbol, timeframe or "", value, now)
+                        for kind, symbol, timeframe, value in group_values
+                    ),
+                )
+                conn.executemany(
                     """
                     INSERT INTO notification_outbox (
                         chat_id, alert_id, message, created_at
                     ) VALUES (?, ?, ?, ?)
                     """,
-                    (int(alert["chat_id"]), alert_id, notification_message, now),
+                    notifications,
                 )
-            conn.execute("COMMIT")
-            return triggered
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return triggered_ids
 
+    @_write_operation
     def log_activity(
         self,
         chat_id: Optional[int],
@@ -586,7 +1195,7 @@ class SQLiteStore:
         symbol: Optional[str] = None,
         payload: Optional[dict[str, Any]] = None,
     ) -> int:
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             cursor = conn.execute(
                 """
                 INSERT INTO activity_log (
@@ -601,8 +1210,61 @@ class SQLiteStore:
             )
             return int(cursor.lastrowid)
 
+    def queue_activity(
+        self,
+        chat_id: Optional[int],
+        event_type: str,
+        message: str,
+        *,
+        severity: str = "info",
+        symbol: Optional[str] = None,
+        payload: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Like log_activity, but written behind in a later batch."""
+        self._write_behind.add_activity(
+            (
+                chat_id, event_type, severity, symbol, message,
+                json.dumps(payload, ensure_ascii=False) if payload else None,
+                _utcnow(),
+            )
+        )
+
+    @_write_operation
+    def _write_buffered(
+        self,
+        activity: list[tuple[Any, ...]],
+        touches: list[tuple[int, str]],
+    ) -> None:
+        with self._write_lock, self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    """
+                    INSERT INTO activity_log (
+                        chat_id, event_type, severity, symbol, message, payload_json, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    activity,
+                )
+                conn.executemany(
+                    """
+                    UPDATE users
+                    SET last_seen_at = MAX(COALESCE(last_seen_at, ''), ?)
+                    WHERE chat_id = ?
+                    """,
+                    ((seen_at, chat_id) for chat_id, seen_at in touches),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        for chat_id, _ in touches:
+            self._invalidate_user(chat_id)
+
     def list_activity(self, chat_id: int, limit: int = 20) -> list[dict[str, Any]]:
-        with self._lock, self._connection() as conn:
+        # Show rows still waiting in the write-behind buffer as well.
+        self._write_behind.flush()
+        with self._reader() as conn:
             rows = conn.execute(
                 """
                 SELECT event_type, severity, symbol, message, created_at
@@ -613,10 +1275,11 @@ class SQLiteStore:
             ).fetchall()
         return [dict(row) for row in rows]
 
+    @_write_operation
     def reserve_execution_signal(self, candidate_id: str, symbol: str) -> bool:
         """Atomically reserve one deterministic candle candidate."""
         now = _utcnow()
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute("BEGIN IMMEDIATE")
             cursor = conn.execute(
                 """
@@ -637,8 +1300,9 @@ class SQLiteStore:
             conn.execute("COMMIT")
             return cursor.rowcount == 1
 
+    @_write_operation
     def update_execution_signal(self, candidate_id: str, status: str) -> None:
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute(
                 """
                 UPDATE execution_signals
@@ -658,7 +1322,7 @@ class SQLiteStore:
             64,
             "API fingerprint",
         )
-        with self._lock, self._connection() as conn:
+        with self._reader() as conn:
             row = conn.execute(
                 """
                 SELECT account_scope
@@ -669,6 +1333,7 @@ class SQLiteStore:
             ).fetchone()
         return str(row["account_scope"]) if row else None
 
+    @_write_operation
     def save_verified_trade_account_scope(
         self,
         api_fingerprint: str,
@@ -681,7 +1346,7 @@ class SQLiteStore:
             "API fingerprint",
         )
         scope = _hex_digest(account_scope, 24, "Account scope")
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute(
                 """
                 INSERT INTO trade_account_aliases (
@@ -695,6 +1360,7 @@ class SQLiteStore:
                 (fingerprint, scope, _utcnow()),
             )
 
+    @_write_operation
     def migrate_trade_account_scope(
         self,
         fallback_scope: str,
@@ -750,7 +1416,7 @@ class SQLiteStore:
             "created_time_ms", "updated_time_ms", "raw_json", "synced_at",
         )
 
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute("BEGIN IMMEDIATE")
             try:
                 setup_rows = conn.execute(
@@ -1203,6 +1869,7 @@ class SQLiteStore:
                 conn.execute("ROLLBACK")
                 raise
 
+    @_write_operation
     def upsert_trade_setup(
         self,
         *,
@@ -1233,7 +1900,7 @@ class SQLiteStore:
             raw = plan.get(name)
             return None if raw is None else str(raw)
 
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute("BEGIN IMMEDIATE")
             unresolved = conn.execute(
                 """
@@ -1373,6 +2040,7 @@ class SQLiteStore:
             )
             conn.execute("COMMIT")
 
+    @_write_operation
     def update_trade_setup(
         self,
         account_scope: str,
@@ -1398,7 +2066,7 @@ class SQLiteStore:
             return
         selected["updated_at"] = _utcnow()
         assignments = ", ".join(f"{column} = ?" for column in selected)
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute(
                 f"""
                 UPDATE trade_setups
@@ -1408,11 +2076,11 @@ class SQLiteStore:
                 (*selected.values(), account_scope, candidate_id),
             )
 
+    @staticmethod
     def _matching_trade_candidate(
-        self,
-        conn: sqlite3.Connection,
+        setups: dict[str, dict[str, Any]],
+        linked: dict[str, dict[str, tuple[Optional[str], int]]],
         *,
-        account_scope: str,
         symbol: str,
         position_side: Optional[str],
         avg_entry_price: Optional[str],
@@ -1421,22 +2089,19 @@ class SQLiteStore:
     ) -> Optional[str]:
         if position_side not in {"Buy", "Sell"}:
             return None
-        rows = conn.execute(
-            """
-            SELECT candidate_id, actual_entry_price, planned_entry_price,
-                   actual_entry_qty, planned_qty, opened_at_ms
-            FROM trade_setups
-            WHERE account_scope = ? AND symbol = ? AND side = ?
-              AND dry_run = 0
-              AND status IN (
-                  'entry_filled', 'open', 'closing', 'reconcile_required'
-              )
-              AND COALESCE(opened_at_ms, 0) <= ?
-            ORDER BY COALESCE(opened_at_ms, 0) DESC
-            LIMIT 8
-            """,
-            (account_scope, symbol, position_side, closed_at_ms),
-        ).fetchall()
+        rows = sorted(
+            (
+                setup
+                for setup in setups.values()
+                if setup["symbol"] == symbol
+                and setup["side"] == position_side
+                and not setup["dry_run"]
+                and setup["status"] in _OPEN_SETUP_STATUSES
+                and (setup["opened_at_ms"] or 0) <= closed_at_ms
+            ),
+            key=lambda setup: setup["opened_at_ms"] or 0,
+            reverse=True,
+        )[:8]
         if not rows:
             return None
         try:
@@ -1447,7 +2112,7 @@ class SQLiteStore:
             incoming_size = Decimal(str(closed_size))
         except (InvalidOperation, TypeError, ValueError):
             incoming_size = Decimal("0")
-        matching: list[sqlite3.Row] = []
+        matching: list[dict[str, Any]] = []
         for row in rows:
             reference_raw = row["actual_entry_price"] or row["planned_entry_price"]
             try:
@@ -1465,20 +2130,14 @@ class SQLiteStore:
             ):
                 continue
             if abs(reference - observed) / reference <= Decimal("0.005"):
-                linked_rows = conn.execute(
-                    """
-                    SELECT closed_size
-                    FROM closed_trade_records
-                    WHERE account_scope = ? AND candidate_id = ?
-                    """,
-                    (account_scope, row["candidate_id"]),
-                ).fetchall()
                 try:
                     already_closed = sum(
                         (
-                            Decimal(str(linked["closed_size"]))
-                            for linked in linked_rows
-                            if linked["closed_size"] not in (None, "")
+                            Decimal(str(size))
+                            for size, _ in linked.get(
+                                row["candidate_id"], {}
+                            ).values()
+                            if size not in (None, "")
                         ),
                         Decimal("0"),
                     )
@@ -1500,12 +2159,108 @@ class SQLiteStore:
         # multiple price-compatible lifecycles.
         return str(matching[0]["candidate_id"])
 
+    def _closed_trade_context(
+        self,
+        conn: sqlite3.Connection,
+        account_scope: str,
+        records: list[dict[str, Any]],
+    ) -> tuple[
+        dict[str, dict[str, Any]],
+        dict[str, dict[str, Any]],
+        dict[str, dict[str, tuple[Optional[str], int]]],
+    ]:
+        """Prefetch stored rows, open setups and linked sizes for a batch."""
+        existing: dict[str, dict[str, Any]] = {}
+        for chunk in _chunked(sorted({str(r["record_id"]) for r in records})):
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(
+                f"""
+                SELECT record_id, candidate_id, closed_size, updated_time_ms
+                FROM closed_trade_records
+                WHERE account_scope = ? AND record_id IN ({placeholders})
+                """,
+                (account_scope, *chunk),
+            ):
+                existing[str(row["record_id"])] = dict(row)
+
+        setup_columns = """
+            candidate_id, symbol, side, status, dry_run, actual_entry_price,
+            planned_entry_price, actual_entry_qty, planned_qty, opened_at_ms
+        """
+        setups: dict[str, dict[str, Any]] = {}
+        symbols = sorted({str(r["symbol"]).upper() for r in records})
+        latest_close = max(int(r["updated_time_ms"]) for r in records)
+        statuses = ", ".join(f"'{status}'" for status in _OPEN_SETUP_STATUSES)
+        for chunk in _chunked(symbols):
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(
+                f"""
+                SELECT {setup_columns}
+                FROM trade_setups
+                WHERE account_scope = ? AND symbol IN ({placeholders})
+                  AND dry_run = 0
+                  AND status IN ({statuses})
+                  AND COALESCE(opened_at_ms, 0) <= ?
+                """,
+                (account_scope, *chunk, latest_close),
+            ):
+                setups[str(row["candidate_id"])] = dict(row)
+        linked_ids = sorted(
+            {
+                str(row["candidate_id"])
+                for row in existing.values()
+                if row["candidate_id"]
+            }
+            - setups.keys()
+        )
+        for chunk in _chunked(linked_ids):
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(
+                f"""
+                SELECT {setup_columns}
+                FROM trade_setups
+                WHERE account_scope = ? AND candidate_id IN ({placeholders})
+                """,
+                (account_scope, *chunk),
+            ):
+                setups[str(row["candidate_id"])] = dict(row)
+
+        linked: dict[str, dict[str, tuple[Optional[str], int]]] = {}
+        for chunk in _chunked(sorted(setups)):
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(
+                f"""
+                SELECT candidate_id, record_id, closed_size, updated_time_ms
+                FROM closed_trade_records
+                WHERE account_scope = ? AND candidate_id IN ({placeholders})
+                """,
+                (account_scope, *chunk),
+            ):
+                linked.setdefault(str(row["candidate_id"]), {})[
+                    str(row["record_id"])
+                ] = (row["closed_size"], int(row["updated_time_ms"]))
+        return existing, setups, linked
+
     def upsert_closed_trade_record(
         self,
         account_scope: str,
         record: dict[str, Any],
     ) -> bool:
         """Idempotently persist one normalized Bybit Closed PnL record."""
+        return self.upsert_closed_trade_records(account_scope, [record]) == 1
+
+    @_write_operation
+    def upsert_closed_trade_records(
+        self,
+        account_scope: str,
+        records: Iterable[dict[str, Any]],
+    ) -> int:
+        """Persist a batch of normalized Closed PnL records in one transaction.
+
+        Records are applied in the given order exactly as if each was upserted
+        on its own; returns how many of them were new.
+        """
+        records = list(records)
         required = {
             "record_id",
             "symbol",
@@ -1514,240 +2269,239 @@ class SQLiteStore:
             "updated_time_ms",
             "raw_json",
         }
-        if any(record.get(name) is None for name in required):
-            raise ValueError("Normalized closed trade record is incomplete")
+        for record in records:
+            if any(record.get(name) is None for name in required):
+                raise ValueError("Normalized closed trade record is incomplete")
+        if not records:
+            return 0
         now = _utcnow()
-        with self._lock, self._connection() as conn:
+        inserted = 0
+        with self._write_lock, self._connection() as conn:
             conn.execute("BEGIN IMMEDIATE")
-            existing = conn.execute(
-                """
-                SELECT candidate_id
-                FROM closed_trade_records
-                WHERE account_scope = ? AND record_id = ?
-                """,
-                (account_scope, record["record_id"]),
-            ).fetchone()
-            candidate_id = (
-                str(existing["candidate_id"])
-                if existing and existing["candidate_id"]
-                else self._matching_trade_candidate(
-                    conn,
-                    account_scope=account_scope,
-                    symbol=str(record["symbol"]),
-                    position_side=record.get("position_side"),
-                    avg_entry_price=record.get("avg_entry_price"),
-                    closed_size=record.get("closed_size"),
-                    closed_at_ms=int(record["updated_time_ms"]),
-                )
-            )
-            conn.execute(
-                """
-                INSERT INTO closed_trade_records (
-                    account_scope, record_id, order_id, candidate_id, symbol,
-                    close_side, position_side, order_type, exec_type, qty,
-                    closed_size, order_price, avg_entry_price, avg_exit_price,
-                    cum_entry_value, cum_exit_value, closed_pnl, open_fee,
-                    close_fee, fee_data_complete, leverage, fill_count,
-                    created_time_ms, updated_time_ms, raw_json, synced_at
-                ) VALUES (
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?, ?, ?, ?
+            try:
+                existing, setups, linked = self._closed_trade_context(
+                    conn, account_scope, records
                 )
-                ON CONFLICT(account_scope, record_id) DO UPDATE SET
-                    order_id = COALESCE(
-                        excluded.order_id,
-                        closed_trade_records.order_id
-                    ),
-                    candidate_id = COALESCE(
-                        closed_trade_records.candidate_id,
-                        excluded.candidate_id
-                    ),
-                    symbol = excluded.symbol,
-                    close_side = COALESCE(
-                        excluded.close_side,
-                        closed_trade_records.close_side
-                    ),
-                    position_side = COALESCE(
-                        excluded.position_side,
-                        closed_trade_records.position_side
-                    ),
-                    order_type = COALESCE(
-                        excluded.order_type,
-                        closed_trade_records.order_type
-                    ),
-                    exec_type = COALESCE(
-                        excluded.exec_type,
-                        closed_trade_records.exec_type
-                    ),
-                    qty = COALESCE(excluded.qty, closed_trade_records.qty),
-                    closed_size = COALESCE(
-                        excluded.closed_size,
-                        closed_trade_records.closed_size
-                    ),
-                    order_price = COALESCE(
-                        excluded.order_price,
-                        closed_trade_records.order_price
-                    ),
-                    avg_entry_price = COALESCE(
-                        excluded.avg_entry_price,
-                        closed_trade_records.avg_entry_price
-                    ),
-                    avg_exit_price = COALESCE(
-                        excluded.avg_exit_price,
-                        closed_trade_records.avg_exit_price
-                    ),
-                    cum_entry_value = COALESCE(
-                        excluded.cum_entry_value,
-                        closed_trade_records.cum_entry_value
-                    ),
-                    cum_exit_value = COALESCE(
-                        excluded.cum_exit_value,
-                        closed_trade_records.cum_exit_value
-                    ),
-                    closed_pnl = excluded.closed_pnl,
-                    open_fee = COALESCE(
-                        excluded.open_fee,
-                        closed_trade_records.open_fee
-                    ),
-                    close_fee = COALESCE(
-                        excluded.close_fee,
-                        closed_trade_records.close_fee
-                    ),
-                    fee_data_complete = MAX(
-                        closed_trade_records.fee_data_complete,
-                        excluded.fee_data_complete
-                    ),
-                    leverage = COALESCE(
-                        excluded.leverage,
-                        closed_trade_records.leverage
-                    ),
-                    fill_count = COALESCE(
-                        excluded.fill_count,
-                        closed_trade_records.fill_count
-                    ),
-                    created_time_ms = MIN(
-                        closed_trade_records.created_time_ms,
-                        excluded.created_time_ms
-                    ),
-                    updated_time_ms = excluded.updated_time_ms,
-                    raw_json = excluded.raw_json,
-                    synced_at = excluded.synced_at
-                WHERE excluded.updated_time_ms >=
-                      closed_trade_records.updated_time_ms
-                """,
-                (
-                    account_scope,
-                    record["record_id"],
-                    record.get("order_id"),
-                    candidate_id,
-                    str(record["symbol"]).upper(),
-                    record.get("close_side"),
-                    record.get("position_side"),
-                    record.get("order_type"),
-                    record.get("exec_type"),
-                    record.get("qty"),
-                    record.get("closed_size"),
-                    record.get("order_price"),
-                    record.get("avg_entry_price"),
-                    record.get("avg_exit_price"),
-                    record.get("cum_entry_value"),
-                    record.get("cum_exit_value"),
-                    record["closed_pnl"],
-                    record.get("open_fee"),
-                    record.get("close_fee"),
-                    int(bool(record.get("fee_data_complete"))),
-                    record.get("leverage"),
-                    record.get("fill_count"),
-                    int(record["created_time_ms"]),
-                    int(record["updated_time_ms"]),
-                    record["raw_json"],
-                    now,
-                ),
-            )
-            persisted = conn.execute(
-                """
-                SELECT candidate_id
-                FROM closed_trade_records
-                WHERE account_scope = ? AND record_id = ?
-                """,
-                (account_scope, record["record_id"]),
-            ).fetchone()
-            persisted_candidate = (
-                str(persisted["candidate_id"])
-                if persisted and persisted["candidate_id"]
-                else None
-            )
-            if persisted_candidate:
-                setup = conn.execute(
-                    """
-                    SELECT actual_entry_qty, planned_qty
-                    FROM trade_setups
-                    WHERE account_scope = ? AND candidate_id = ?
-                    """,
-                    (account_scope, persisted_candidate),
-                ).fetchone()
-                size_rows = conn.execute(
-                    """
-                    SELECT closed_size, updated_time_ms
-                    FROM closed_trade_records
-                    WHERE account_scope = ? AND candidate_id = ?
-                    """,
-                    (account_scope, persisted_candidate),
-                ).fetchall()
-                try:
-                    expected_size = Decimal(
-                        str(
-                            (
-                                setup["actual_entry_qty"]
-                                or setup["planned_qty"]
-                            )
-                            if setup
-                            else ""
+                upserts: list[tuple[Any, ...]] = []
+                closures: dict[str, int] = {}
+                for record in records:
+                    record_id = str(record["record_id"])
+                    updated_ms = int(record["updated_time_ms"])
+                    stored = existing.get(record_id)
+                    candidate_id = (
+                        str(stored["candidate_id"])
+                        if stored and stored["candidate_id"]
+                        else self._matching_trade_candidate(
+                            setups,
+                            linked,
+                            symbol=str(record["symbol"]).upper(),
+                            position_side=record.get("position_side"),
+                            avg_entry_price=record.get("avg_entry_price"),
+                            closed_size=record.get("closed_size"),
+                            closed_at_ms=updated_ms,
                         )
                     )
-                    closed_size = sum(
+                    upserts.append(
                         (
-                            Decimal(str(row["closed_size"]))
-                            for row in size_rows
-                            if row["closed_size"] not in (None, "")
-                        ),
-                        Decimal("0"),
+                            account_scope,
+                            record["record_id"],
+                            record.get("order_id"),
+                            candidate_id,
+                            str(record["symbol"]).upper(),
+                            record.get("close_side"),
+                            record.get("position_side"),
+                            record.get("order_type"),
+                            record.get("exec_type"),
+                            record.get("qty"),
+                            record.get("closed_size"),
+                            record.get("order_price"),
+                            record.get("avg_entry_price"),
+                            record.get("avg_exit_price"),
+                            record.get("cum_entry_value"),
+                            record.get("cum_exit_value"),
+                            record["closed_pnl"],
+                            record.get("open_fee"),
+                            record.get("close_fee"),
+                            int(bool(record.get("fee_data_complete"))),
+                            record.get("leverage"),
+                            record.get("fill_count"),
+                            int(record["created_time_ms"]),
+                            updated_ms,
+                            record["raw_json"],
+                            now,
+                        )
                     )
-                except (InvalidOperation, TypeError, ValueError):
-                    expected_size = Decimal("0")
-                    closed_size = Decimal("0")
-                tolerance = max(
-                    expected_size * Decimal("0.000001"),
-                    Decimal("0.000000000001"),
-                )
-                if (
-                    expected_size > 0
-                    and closed_size + tolerance >= expected_size
-                ):
-                    closed_at_ms = max(
-                        int(row["updated_time_ms"]) for row in size_rows
+                    # Mirror the conflict clause so later records in the batch
+                    # see the same stored state a row-by-row import would.
+                    if stored is None:
+                        inserted += 1
+                        stored = {
+                            "candidate_id": candidate_id,
+                            "closed_size": record.get("closed_size"),
+                            "updated_time_ms": updated_ms,
+                        }
+                        existing[record_id] = stored
+                    elif updated_ms >= int(stored["updated_time_ms"]):
+                        stored["candidate_id"] = stored["candidate_id"] or candidate_id
+                        if record.get("closed_size") is not None:
+                            stored["closed_size"] = record.get("closed_size")
+                        stored["updated_time_ms"] = updated_ms
+                    persisted_candidate = (
+                        str(stored["candidate_id"]) if stored["candidate_id"] else None
                     )
-                    conn.execute(
-                        """
-                        UPDATE trade_setups
-                        SET status = 'closed',
-                            closed_at_ms = CASE
-                                WHEN closed_at_ms IS NULL OR closed_at_ms < ?
-                                THEN ? ELSE closed_at_ms
-                            END,
-                            updated_at = ?
-                        WHERE account_scope = ? AND candidate_id = ?
-                        """,
-                        (
-                            closed_at_ms,
-                            closed_at_ms,
-                            now,
-                            account_scope,
-                            persisted_candidate,
-                        ),
+                    setup = setups.get(persisted_candidate or "")
+                    if setup is None:
+                        continue
+                    sizes = linked.setdefault(persisted_candidate, {})
+                    sizes[record_id] = (
+                        stored["closed_size"],
+                        int(stored["updated_time_ms"]),
                     )
-            conn.execute("COMMIT")
-        return existing is None
+                    try:
+                        expected_size = Decimal(
+                            str(setup["actual_entry_qty"] or setup["planned_qty"])
+                        )
+                        closed_size = sum(
+                            (
+                                Decimal(str(size))
+                                for size, _ in sizes.values()
+                                if size not in (None, "")
+                            ),
+                            Decimal("0"),
+                        )
+                    except (InvalidOperation, TypeError, ValueError):
+                        expected_size = Decimal("0")
+                        closed_size = Decimal("0")
+                    tolerance = max(
+                        expected_size * Decimal("0.000001"),
+                        Decimal("0.000000000001"),
+                    )
+                    if (
+                        expected_size > 0
+                        and closed_size + tolerance >= expected_size
+                    ):
+                        setup["status"] = "closed"
+                        closures[persisted_candidate] = max(
+                            closed_at for _, closed_at in sizes.values()
+                        )
+                conn.executemany(
+                    """
+                    INSERT INTO closed_trade_records (
+                        account_scope, record_id, order_id, candidate_id, symbol,
+                        close_side, position_side, order_type, exec_type, qty,
+                        closed_size, order_price, avg_entry_price, avg_exit_price,
+                        cum_entry_value, cum_exit_value, closed_pnl, open_fee,
+                        close_fee, fee_data_complete, leverage, fill_count,
+                        created_time_ms, updated_time_ms, raw_json, synced_at
+                    ) VALUES (
+                        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                        ?, ?, ?, ?, ?, ?, ?
+                    )
+                    ON CONFLICT(account_scope, record_id) DO UPDATE SET
+                        order_id = COALESCE(
+                            excluded.order_id,
+                            closed_trade_records.order_id
+                        ),
+                        candidate_id = COALESCE(
+                            closed_trade_records.candidate_id,
+                            excluded.candidate_id
+                        ),
+                        symbol = excluded.symbol,
+                        close_side = COALESCE(
+                            excluded.close_side,
+                            closed_trade_records.close_side
+                        ),
+                        position_side = COALESCE(
+                            excluded.position_side,
+                            closed_trade_records.position_side
+                        ),
+                        order_type = COALESCE(
+                            excluded.order_type,
+                            closed_trade_records.order_type
+                        ),
+                        exec_type = COALESCE(
+                            excluded.exec_type,
+                            closed_trade_records.exec_type
+                        ),
+                        qty = COALESCE(excluded.qty, closed_trade_records.qty),
+                        closed_size = COALESCE(
+                            excluded.closed_size,
+                            closed_trade_records.closed_size
+                        ),
+                        order_price = COALESCE(
+                            excluded.order_price,
+                            closed_trade_records.order_price
+                        ),
+                        avg_entry_price = COALESCE(
+                            excluded.avg_entry_price,
+                            closed_trade_records.avg_entry_price
+                        ),
+                        avg_exit_price = COALESCE(
+                            excluded.avg_exit_price,
+                            closed_trade_records.avg_exit_price
+                        ),
+                        cum_entry_value = COALESCE(
+                            excluded.cum_entry_value,
+                            closed_trade_records.cum_entry_value
+                        ),
+                        cum_exit_value = COALESCE(
+                            excluded.cum_exit_value,
+                            closed_trade_records.cum_exit_value
+                        ),
+                        closed_pnl = excluded.closed_pnl,
+                        open_fee = COALESCE(
+                            excluded.open_fee,
+                            closed_trade_records.open_fee
+                        ),
+                        close_fee = COALESCE(
+                            excluded.close_fee,
+                            closed_trade_records.close_fee
+                        ),
+                        fee_data_complete = MAX(
+                            closed_trade_records.fee_data_complete,
+                            excluded.fee_data_complete
+                        ),
+                        leverage = COALESCE(
+                            excluded.leverage,
+                            closed_trade_records.leverage
+                        ),
+                        fill_count = COALESCE(
+                            excluded.fill_count,
+                            closed_trade_records.fill_count
+                        ),
+                        created_time_ms = MIN(
+                            closed_trade_records.created_time_ms,
+                            excluded.created_time_ms
+                        ),
+                        updated_time_ms = excluded.updated_time_ms,
+                        raw_json = excluded.raw_json,
+                        synced_at = excluded.synced_at
+                    WHERE excluded.updated_time_ms >=
+                          closed_trade_records.updated_time_ms
+                    """,
+                    upserts,
+                )
+                conn.executemany(
+                    """
+                    UPDATE trade_setups
+                    SET status = 'closed',
+                        closed_at_ms = CASE
+                            WHEN closed_at_ms IS NULL OR closed_at_ms < ?
+                            THEN ? ELSE closed_at_ms
+                        END,
+                        updated_at = ?
+                    WHERE account_scope = ? AND candidate_id = ?
+                    """,
+                    [
+                        (closed_at_ms, closed_at_ms, now, account_scope, candidate_id)
+                        for candidate_id, closed_at_ms in closures.items()
+                    ],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return inserted
 
     def list_closed_trade_records(
         self,
@@ -1757,7 +2511,7 @@ class SQLiteStore:
         bot_only: bool = False,
     ) -> list[dict[str, Any]]:
         bot_clause = "AND c.candidate_id IS NOT NULL" if bot_only else ""
-        with self._lock, self._connection() as conn:
+        with self._reader() as conn:
             rows = conn.execute(
                 f"""
                 SELECT c.*,
@@ -1788,7 +2542,7 @@ class SQLiteStore:
         account_scope: str,
         source: str = "closed_pnl",
     ) -> dict[str, Any]:
-        with self._lock, self._connection() as conn:
+        with self._reader() as conn:
             row = conn.execute(
                 """
                 SELECT *
@@ -1799,6 +2553,7 @@ class SQLiteStore:
             ).fetchone()
         return dict(row) if row else {}
 
+    @_write_operation
     def update_trade_sync_state(
         self,
         account_scope: str,
@@ -1808,7 +2563,7 @@ class SQLiteStore:
         last_success_ms: int,
         source: str = "closed_pnl",
     ) -> None:
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute(
                 """
                 INSERT INTO trade_sync_state (
@@ -1840,6 +2595,7 @@ class SQLiteStore:
                 ),
             )
 
+    @_write_operation
     def record_equity_snapshot(
         self,
         account_scope: str,
@@ -1881,7 +2637,7 @@ class SQLiteStore:
         available_text = text(available_usd)
         unrealized_text = text(unrealized_pnl_usd)
 
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute(
                 """
                 INSERT INTO equity_snapshots (
@@ -1928,13 +2684,131 @@ class SQLiteStore:
                 (scope, cutoff),
             )
 
+    def load_candles(
+        self,
+        market: str,
+        symbol: str,
+        interval: str,
+        limit: int,
+    ) -> list[tuple[int, float, float, float, float, float]]:
+        """Return the newest archived closed candles in chronological order."""
+        with self._reader() as conn:
+            rows = conn.execute(
+                """
+                SELECT start_ms, open, high, low, close, volume
+                FROM candle_archive
+                WHERE market = ? AND symbol = ? AND interval = ?
+                ORDER BY start_ms DESC
+                LIMIT ?
+                """,
+                (market, symbol.upper(), str(interval), int(limit)),
+            ).fetchall()
+        return [tuple(row) for row in reversed(rows)]
+
+    @_write_operation
+    def save_candles(
+        self,
+        market: str,
+        symbol: str,
+        interval: str,
+        rows: Iterable[tuple[int, float, float, float, float, float]],
+        *,
+        keep_since_ms: int,
+    ) -> None:
+        """Upsert confirmed candles and prune the series below ``keep_since_ms``."""
+        key = (market, symbol.upper(), str(interval))
+        with self._write_lock, self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    """
+                    INSERT INTO candle_archive (
+                        market, symbol, interval, start_ms,
+                        open, high, low, close, volume
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(market, symbol, interval, start_ms) DO UPDATE SET
+                        open = excluded.open,
+                        high = excluded.high,
+                        low = excluded.low,
+                        close = excluded.close,
+                        volume = excluded.volume
+                    """,
+                    ((*key, *row) for row in rows),
+                )
+                conn.execute(
+                    """
+                    DELETE FROM candle_archive
+                    WHERE market = ? AND symbol = ? AND interval = ? AND start_ms < ?
+                    """,
+                    (*key, int(keep_since_ms)),
+                )
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def load_instruments(self, market: str) -> list[tuple[str, dict[str, Any], int]]:
+        """Return persisted instrument payloads with their fetch time."""
+        with self._reader() as conn:
+            rows = conn.execute(
+                """
+                SELECT symbol, payload_json, fetched_at_ms
+                FROM instrument_rules
+                WHERE market = ?
+                """,
+                (market,),
+            ).fetchall()
+        return [
+            (str(row["symbol"]), json.loads(row["payload_json"]), int(row["fetched_at_ms"]))
+            for row in rows
+        ]
+
+    @_write_operation
+    def save_instruments(
+        self,
+        market: str,
+        payloads: dict[str, dict[str, Any]],
+        removed: Iterable[str],
+        *,
+        fetched_at_ms: int,
+    ) -> None:
+        """Upsert changed payloads, drop delisted symbols and restamp the set."""
+        with self._write_lock, self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    """
+                    INSERT INTO instrument_rules (market, symbol, payload_json, fetched_at_ms)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(market, symbol) DO UPDATE SET
+                        payload_json = excluded.payload_json,
+                        fetched_at_ms = excluded.fetched_at_ms
+                    """,
+                    (
+                        (market, symbol, _json_payload(payload), int(fetched_at_ms))
+                        for symbol, payload in payloads.items()
+                    ),
+                )
+                conn.executemany(
+                    "DELETE FROM instrument_rules WHERE market = ? AND symbol = ?",
+                    ((market, symbol) for symbol in removed),
+                )
+                conn.execute(
+                    "UPDATE instrument_rules SET fetched_at_ms = ? WHERE market = ?",
+                    (int(fetched_at_ms), market),
+                )
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
     def list_equity_snapshots(
         self,
         account_scope: str,
         *,
         since_ms: int,
     ) -> list[dict[str, Any]]:
-        with self._lock, self._connection() as conn:
+        with self._reader() as conn:
             rows = conn.execute(
                 """
                 SELECT captured_at_ms, equity_usd, wallet_balance_usd,
@@ -1947,6 +2821,7 @@ class SQLiteStore:
             ).fetchall()
         return [dict(row) for row in rows]
 
+    @_write_operation
     def update_daily_equity_guard(
         self,
         equity: float,
@@ -1961,7 +2836,7 @@ class SQLiteStore:
         day = utc_day or datetime.now(timezone.utc).date().isoformat()
         guard_key = f"{scope[:96]}|{day}"
         now = _utcnow()
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute("BEGIN IMMEDIATE")
             row = conn.execute(
                 "SELECT * FROM daily_risk_state WHERE utc_day = ?",
@@ -2006,7 +2881,7 @@ class SQLiteStore:
 
     def pending_notifications(self, limit: int = 50) -> list[dict[str, Any]]:
         now = _utcnow()
-        with self._lock, self._connection() as conn:
+        with self._reader() as conn:
             rows = conn.execute(
                 """
                 SELECT id, chat_id, alert_id, message, attempts, created_at,
@@ -2020,6 +2895,7 @@ class SQLiteStore:
             ).fetchall()
         return [dict(row) for row in rows]
 
+    @_write_operation
     def mark_notification_attempt(
         self,
         outbox_ids: int | Iterable[int],
@@ -2052,7 +2928,7 @@ class SQLiteStore:
             normalized = "temporary_failure"
         now_dt = datetime.now(timezone.utc)
         now = now_dt.isoformat(timespec="seconds")
-        with self._lock, self._connection() as conn:
+        with self._write_lock, self._connection() as conn:
             conn.execute("BEGIN IMMEDIATE")
             for outbox_id in ids:
                 row = conn.execute(
@@ -2100,7 +2976,70 @@ class SQLiteStore:
             conn.execute("COMMIT")
 
 
+class AsyncStore:
+    """Awaitable SQLiteStore: ``await store.get_user(chat_id)``.
+
+    Writes are queued to the store's writer thread and awaited without
+    occupying an executor thread; reads run on a small dedicated pool.
+    """
+
+    def __init__(self, store: SQLiteStore) -> None:
+        self.store = store
+        self._readers = ThreadPoolExecutor(
+            max_workers=ASYNC_READ_WORKERS,
+            thread_name_prefix="sqlite-read",
+        )
+        store.start_writer()
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(type(self.store), name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._call(method, args, kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def _call(
+        self,
+        method: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        if getattr(method, "writes", False):
+            future = self.store._submit_write(method.__wrapped__, args, kwargs)
+            if future is not None:
+                return await asyncio.wrap_future(future)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._readers,
+            functools.partial(method, self.store, *args, **kwargs),
+        )
+
+    async def get_user(self, chat_id: int) -> dict[str, Any]:
+        cached = self.store.cached_user(chat_id)
+        if cached is not None:
+            return cached
+        return await self._call(SQLiteStore.get_user, (chat_id,), {})
+
+    async def ensure_user(self, user: Any, chat_id: int, is_admin: bool = False) -> None:
+        store = self.store
+        if store.touch_user(user, chat_id, is_admin):
+            return
+        epoch = store._profiles_epoch
+        await self._call(SQLiteStore._upsert_user, (user, chat_id, is_admin), {})
+        store._remember_profile(chat_id, store._profile(user, is_admin), epoch)
+
+    async def queue_activity(self, *args: Any, **kwargs: Any) -> None:
+        self.store.queue_activity(*args, **kwargs)
+
+    def close(self) -> None:
+        self._readers.shutdown(wait=True)
+
+
 _store: Optional[SQLiteStore] = None
+_async_store: Optional[AsyncStore] = None
 _store_lock = threading.Lock()
 
 
@@ -2112,3 +3051,25 @@ def get_store() -> SQLiteStore:
                 _store = SQLiteStore()
                 logger.info(f"SQLite storage ready: {_store.path}")
     return _store
+
+
+def get_async_store() -> AsyncStore:
+    """Shared awaitable facade; starts the store's writer thread."""
+    global _async_store
+    store = get_store()
+    if _async_store is None:
+        with _store_lock:
+            if _async_store is None:
+                _async_store = AsyncStore(store)
+    return _async_store
+
+
+def close_store() -> None:
+    """Drain pending writes and close the shared store at shutdown."""
+    global _async_store
+    with _store_lock:
+        store, async_store, _async_store = _store, _async_store, None
+    if async_store is not None:
+        async_store.close()
+    if store is not None:
+        store.close()
@@ -2,13 +2,11 @@
 
 from __future__ import annotations
 
-import asyncio
-
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Message, TelegramObject
 
 from config import ADMIN_TELEGRAM_IDS
-from storage.database import get_store
+from storage.database import get_async_store
 from utils.logger_setup import logger
 
 
@@ -28,8 +26,7 @@ class UserActivityMiddleware(BaseMiddleware):
                 return None
         if user:
             try:
-                await asyncio.to_thread(
-                    get_store().ensure_user,
+                await get_async_store().ensure_user(
                     user,
                     chat_id,
                     is_admin=user.id in ADMIN_TELEGRAM_IDS,
@@ -17,6 +17,9 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.fsm.storage.memory import SimpleEventIsolation
 from aiogram.types import Update
 
+from api.async_bybit_api import close_async_bybit
+from api.bybit_api import close_shared_session, start_account_stream, stop_account_stream
+from api.bybit_stream import stop_market_stream
 from config import TELEGRAM_TOKEN, validate_config
 from utils.logger_setup import logger
 
@@ -26,7 +29,9 @@ from telegram_bot.handlers import (
     positions, settings, start, trading,
 )
 from core.alert_scheduler import AlertScheduler
-from storage.database import get_store
+from core.instruments import start_instrument_preload, stop_instrument_preload
+from core.market_data import start_public_stream
+from storage.database import close_store, get_async_store
 from telegram_bot.activity_middleware import TradingAccessMiddleware, UserActivityMiddleware
 from telegram_bot.ui import (
     CancelLiveUpdatesMiddleware,
@@ -108,6 +113,16 @@ async def main():
     try:
         async with AsyncExitStack() as cleanup:
             cleanup.push_async_callback(bot.session.close)
+            cleanup.push_async_callback(asyncio.to_thread, close_store)
+            # Registered early so it runs after every Bybit user has stopped.
+            cleanup.push_async_callback(asyncio.to_thread, close_shared_session)
+            cleanup.push_async_callback(close_async_bybit)
+            start_instrument_preload()
+            cleanup.push_async_callback(asyncio.to_thread, stop_instrument_preload)
+            await asyncio.to_thread(start_public_stream)
+            cleanup.push_async_callback(asyncio.to_thread, stop_market_stream)
+            await asyncio.to_thread(start_account_stream)
+            cleanup.push_async_callback(asyncio.to_thread, stop_account_stream)
 
             dp = Dispatcher(events_isolation=SimpleEventIsolation())
             # Capture visible alert keys before any middleware awaits I/O.
@@ -121,8 +136,8 @@ async def main():
             register_bot(bot)
             cleanup.push_async_callback(unregister_bot)
 
-            store = await asyncio.to_thread(get_store)
-            restore_screen_targets(await asyncio.to_thread(store.screen_targets))
+            store = await asyncio.to_thread(get_async_store)
+            restore_screen_targets(await store.screen_targets())
             await refresh_restored_screens()
 
             alert_scheduler = AlertScheduler()
@@ -11,7 +11,7 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from config import ALERT_DEFAULT_COOLDOWN_SECONDS
-from storage.database import get_store
+from storage.database import get_async_store, get_store
 from telegram_bot.keyboards.alerts_menu import (
     get_alert_list_menu,
     get_alert_type_menu,
@@ -151,12 +151,11 @@ async def save_threshold(message: Message, state: FSMContext) -> None:
         )
         return
 
-    store = get_store()
-    user = await asyncio.to_thread(store.get_user, message.chat.id)
+    store = get_async_store()
+    user = await store.get_user(message.chat.id)
     symbol = user.get("default_symbol", "BTC")
     timeframe = user.get("default_interval", "15") if data["kind"] == "rsi" else None
-    alert_id = await asyncio.to_thread(
-        store.create_alert,
+    alert_id = await store.create_alert(
         message.chat.id,
         kind=data["kind"],
         symbol=symbol,
@@ -166,8 +165,7 @@ async def save_threshold(message: Message, state: FSMContext) -> None:
         repeat_mode=data["repeat_mode"],
         cooldown_seconds=ALERT_DEFAULT_COOLDOWN_SECONDS,
     )
-    await asyncio.to_thread(
-        store.log_activity,
+    await store.queue_activity(
         message.chat.id,
         "alert_created",
         f"Создан алерт #{alert_id}",
@@ -190,10 +188,9 @@ async def delete_alert(callback: CallbackQuery) -> None:
     except ValueError:
         await callback.answer("Некорректный алерт", show_alert=True)
         return
-    deleted = await asyncio.to_thread(get_store().delete_alert, callback.message.chat.id, alert_id)
+    deleted = await get_async_store().delete_alert(callback.message.chat.id, alert_id)
     if deleted:
-        await asyncio.to_thread(
-            get_store().log_activity,
+        await get_async_store().queue_activity(
             callback.message.chat.id,
             "alert_deleted",
             f"Удалён алерт #{alert_id}",
@@ -23,7 +23,7 @@ from config import (
     validate_config,
 )
 from core.auto_trading import get_runtime_status, main_loop
-from storage.database import get_store
+from storage.database import get_async_store
 from telegram_bot.keyboards.main_menu import get_auto_mode_menu, get_main_menu
 from telegram_bot.ui import render_callback_screen, render_live_screen
 from utils.logger_setup import logger
@@ -239,8 +239,7 @@ async def _start_from_callback(callback: CallbackQuery) -> None:
         await callback.answer("Авто-режим уже запускается или работает", show_alert=True)
         return
     await callback.answer("Авто-режим запускается")
-    await asyncio.to_thread(
-        get_store().log_activity,
+    await get_async_store().queue_activity(
         callback.message.chat.id,
         "auto_mode_started",
         "Авто-режим запущен владельцем",
@@ -256,8 +255,7 @@ async def callback_auto_stop(callback: CallbackQuery):
         return
     stop_auto_mode()
     await callback.answer("Останавливаю; новые ордера запрещены")
-    await asyncio.to_thread(
-        get_store().log_activity,
+    await get_async_store().queue_activity(
         callback.message.chat.id,
         "auto_mode_stopping",
         "Владелец запросил остановку авто-режима",
@@ -10,7 +10,7 @@ from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMar
 from api.bybit_api import BybitAPI
 from config import TRADABLE_TOKENS
 from core.chart import RICH_MEDIA_ID, build_chart_payload
-from storage.database import get_store
+from storage.database import get_async_store, get_store
 from telegram_bot.ui import RichPhotoScreen, render_rich_live_screen
 
 router = Router()
@@ -103,8 +103,7 @@ async def select_chart_symbol(callback: CallbackQuery):
     if symbol not in TRADABLE_TOKENS:
         await callback.answer("Недоступный актив", show_alert=True)
         return
-    await asyncio.to_thread(
-        get_store().update_user_settings,
+    await get_async_store().update_user_settings(
         callback.message.chat.id,
         default_symbol=symbol,
     )
@@ -118,8 +117,7 @@ async def select_chart_interval(callback: CallbackQuery):
     if interval not in INTERVALS:
         await callback.answer("Недоступный интервал", show_alert=True)
         return
-    await asyncio.to_thread(
-        get_store().update_user_settings,
+    await get_async_store().update_user_settings(
         callback.message.chat.id,
         default_interval=interval,
     )
@@ -4,15 +4,16 @@ from __future__ import annotations
 
 import asyncio
 import html
+import time
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup
 
 from api.bybit_api import BybitAPI
-from core.trade_journal import TradeJournal
+from core.trade_journal import SyncProgress, TradeJournal
 from telegram_bot.keyboards.history_menu import (
     DEFAULT_HISTORY_PERIOD,
     DEFAULT_HISTORY_SCOPE,
@@ -35,6 +36,8 @@ _SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
 _MAX_SPARK_POINTS = 28
 _MAX_RECENT_TRADES = 5
 _MAX_SCREEN_LENGTH = 2_500
+# A long backfill re-renders the already imported trades at most this often.
+_PARTIAL_RENDER_SECONDS = 2.0
 
 
 def _decimal(value: Any) -> Optional[Decimal]:
@@ -195,6 +198,7 @@ def format_history_screen(
     scope: str,
     cache_warning: bool = False,
     sync_busy: bool = False,
+    sync_progress: Optional[SyncProgress] = None,
 ) -> str:
     """Format only bounded, escaped content suitable for Telegram HTML."""
     scope_label = "🤖 только бот" if scope == "bot" else "🌐 весь аккаунт"
@@ -216,6 +220,15 @@ def format_history_screen(
                 "⏳ <i>Синхронизация уже идёт — показан текущий кэш.</i>",
             ]
         )
+    elif sync_progress is not None:
+        lines.extend(
+            [
+                "",
+                "⏳ <i>Загружаю историю Bybit: "
+                f"{sync_progress.windows_done}/{sync_progress.windows_total} "
+                "недель — показаны уже загруженные сделки.</i>",
+            ]
+        )
 
     trade_count = _integer(analytics.get("trade_count", len(records)))
     if not trade_count:
@@ -348,20 +361,58 @@ def build_history_view(
     scope: str = DEFAULT_HISTORY_SCOPE,
     *,
     force: bool = False,
+    on_partial: Optional[Callable[[str, InlineKeyboardMarkup], None]] = None,
 ) -> tuple[str, InlineKeyboardMarkup]:
-    """Synchronize the journal and render analytics from durable local rows."""
+    """Synchronize the journal and render analytics from durable local rows.
+
+    During a multi-window backfill ``on_partial`` receives screens built from
+    the windows imported so far.
+    """
     if days not in HISTORY_PERIODS or scope not in HISTORY_SCOPES:
         raise ValueError("Некорректный фильтр истории")
 
     bybit = BybitAPI()
     cache_warning = False
     sync_busy = False
+    partial_at = float("-inf")
     try:
         journal = TradeJournal(bybit)
+
+        def report(progress: SyncProgress) -> None:
+            nonlocal partial_at
+            if (
+                on_partial is None
+                or progress.windows_done >= progress.windows_total
+                or time.monotonic() - partial_at < _PARTIAL_RENDER_SECONDS
+            ):
+                return
+            partial_at = time.monotonic()
+            try:
+                records = journal.closed_records(
+                    lookback_days=days,
+                    bot_only=scope == "bot",
+                )
+                equity = journal.equity_snapshots(lookback_days=days)
+                on_partial(
+                    format_history_screen(
+                        records,
+                        _build_analytics(records, equity),
+                        days=days,
+                        scope=scope,
+                        sync_progress=progress,
+                    ),
+                    get_history_menu(days, scope),
+                )
+            except Exception as error:
+                logger.warning(
+                    f"Не удалось показать промежуточную историю ({type(error).__name__})"
+                )
+
         try:
             summary = journal.sync_closed_pnl(
                 lookback_days=days,
                 force=force,
+                progress=report,
             )
             sync_busy = bool(getattr(summary, "skipped_busy", False))
         except Exception as error:
@@ -438,12 +489,24 @@ async def _render_history(
         loading_markup,
     )
     token = current_screen_token(canonical)
+    loop = asyncio.get_running_loop()
+    partial_renders: list[Any] = []
+
+    def show_partial(text: str, markup: InlineKeyboardMarkup) -> None:
+        partial_renders.append(
+            asyncio.run_coroutine_threadsafe(
+                render_if_current(token, canonical, text, markup),
+                loop,
+            )
+        )
+
     try:
         text, markup = await asyncio.to_thread(
             build_history_view,
             days,
             scope,
             force=force,
+            on_partial=show_partial,
         )
     except Exception as error:
         logger.error(f"Ошибка экрана истории ({type(error).__name__})")
@@ -452,6 +515,11 @@ async def _render_history(
             "Локальные данные не повреждены. Попробуйте обновить экран позже."
         )
         markup = get_history_menu(days, scope)
+    # A partial screen must never land after the final one.
+    await asyncio.gather(
+        *(asyncio.wrap_future(render) for render in partial_renders),
+        return_exceptions=True,
+    )
     await render_if_current(token, canonical, text, markup)
 
 
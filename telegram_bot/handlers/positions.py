@@ -12,10 +12,11 @@ from aiogram.types import CallbackQuery
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from api.async_bybit_api import get_async_bybit
 from api.bybit_api import BybitAPI
 from config import DRY_RUN
 from core.auto_trading import execution_lock
-from storage.database import get_store
+from storage.database import get_async_store
 from telegram_bot.keyboards.main_menu import get_main_menu
 from telegram_bot.keyboards.positions_menu import (
     get_close_all_confirmation_menu,
@@ -34,15 +35,10 @@ def _open_positions(positions: list[dict]) -> list[dict]:
     return [position for position in positions if to_float(position.get("size")) > 0]
 
 
-def build_positions_view():
-    """Load the position list. Executed in a worker thread by the live screen."""
-    bybit = BybitAPI()
-    try:
-        positions = _open_positions(
-            bybit.get_positions().get("result", {}).get("list", [])
-        )
-    finally:
-        bybit.close()
+async def build_positions_view():
+    """Load the position list on the bot loop through the shared async client."""
+    response = await get_async_bybit().get_positions()
+    positions = _open_positions(response.get("result", {}).get("list", []))
     if not positions:
         return (
             "📊 <b>Открытые позиции</b> <i>• обновление 8с</i>\n\n"
@@ -69,26 +65,22 @@ def build_positions_view():
     return text, get_positions_list_menu(position_data)
 
 
-def build_position_details_view(symbol: str, position_idx: int):
+async def build_position_details_view(symbol: str, position_idx: int):
     """Load one precise position, including its hedge-mode index."""
-    bybit = BybitAPI()
-    try:
-        positions = _open_positions(
-            bybit.get_positions(symbol=symbol).get("result", {}).get("list", [])
-        )
-        position = next(
-            (
-                candidate
-                for candidate in positions
-                if int(to_float(candidate.get("positionIdx"))) == position_idx
-            ),
-            None,
-        )
-        if not position:
-            raise ValueError("Позиция уже закрыта или не найдена")
-        ticker = bybit.get_tickers(symbol)["result"]["list"][0]
-    finally:
-        bybit.close()
+    bybit = get_async_bybit()
+    response = await bybit.get_positions(symbol=symbol)
+    positions = _open_positions(response.get("result", {}).get("list", []))
+    position = next(
+        (
+            candidate
+            for candidate in positions
+            if int(to_float(candidate.get("positionIdx"))) == position_idx
+        ),
+        None,
+    )
+    if not position:
+        raise ValueError("Позиция уже закрыта или не найдена")
+    ticker = (await bybit.get_tickers(symbol))["result"]["list"][0]
     quantity = to_float(position.get("size"))
     side = position.get("side", "")
     entry_price = to_float(position.get("avgPrice", position.get("entryPrice")))
@@ -185,10 +177,7 @@ def close_all_positions() -> tuple[int, list[str]]:
 async def callback_positions(callback: CallbackQuery):
     await callback.answer("Обновляю позиции...")
 
-    async def load_positions():
-        return await asyncio.to_thread(build_positions_view)
-
-    await render_live_screen(callback.message, load_positions, interval_seconds=8)
+    await render_live_screen(callback.message, build_positions_view, interval_seconds=8)
 
 
 @router.callback_query(F.data == "positions:refresh")
@@ -212,7 +201,7 @@ async def callback_position_details(callback: CallbackQuery):
     await callback.answer("Обновляю позицию...")
 
     async def load_details():
-        return await asyncio.to_thread(build_position_details_view, symbol, position_idx)
+        return await build_position_details_view(symbol, position_idx)
 
     await render_live_screen(callback.message, load_details, interval_seconds=8)
 
@@ -252,8 +241,7 @@ async def callback_position_close_confirm(callback: CallbackQuery):
             if DRY_RUN
             else f"✅ <b>{symbol} {side} закрыта; исполнение подтверждено.</b>"
         )
-        await asyncio.to_thread(
-            get_store().log_activity,
+        await get_async_store().queue_activity(
             callback.message.chat.id,
             "position_close_requested",
             f"Запрошено закрытие {symbol} ({side})",
@@ -291,8 +279,7 @@ async def callback_close_all_confirm(callback: CallbackQuery):
             text += "\n\n❌ <b>Ошибки:</b>\n" + "\n".join(
                 f"• <code>{html.escape(error[:180])}</code>" for error in errors[:8]
             )
-        await asyncio.to_thread(
-            get_store().log_activity,
+        await get_async_store().queue_activity(
             callback.message.chat.id,
             "close_all_requested",
             f"Запрошено закрытие позиций: {closed_count}",
@@ -2,13 +2,11 @@
 
 from __future__ import annotations
 
-import asyncio
-
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 
 from config import TRADABLE_TOKENS
-from storage.database import get_store
+from storage.database import get_async_store
 from telegram_bot.ui import render_callback_screen
 
 router = Router()
@@ -53,7 +51,7 @@ def profile_text(user: dict) -> str:
 
 
 async def show_profile(callback: CallbackQuery) -> None:
-    user = await asyncio.to_thread(get_store().get_user, callback.message.chat.id)
+    user = await get_async_store().get_user(callback.message.chat.id)
     await render_callback_screen(callback.message, profile_text(user), profile_markup(user))
 
 
@@ -84,30 +82,26 @@ async def set_symbol(callback: CallbackQuery) -> None:
     if symbol not in TRADABLE_TOKENS:
         await callback.answer("Недоступный токен", show_alert=True)
         return
-    await asyncio.to_thread(get_store().update_user_settings, callback.message.chat.id, default_symbol=symbol)
+    await get_async_store().update_user_settings(callback.message.chat.id, default_symbol=symbol)
     await callback.answer(f"Актив по умолчанию: {symbol}")
     await show_profile(callback)
 
 
 @router.callback_query(F.data == "settings:interval")
 async def cycle_interval(callback: CallbackQuery) -> None:
-    user = await asyncio.to_thread(get_store().get_user, callback.message.chat.id)
+    user = await get_async_store().get_user(callback.message.chat.id)
     intervals = ["5", "15", "60", "240"]
     current = str(user.get("default_interval", "15"))
     next_interval = intervals[(intervals.index(current) + 1) % len(intervals)] if current in intervals else "15"
-    await asyncio.to_thread(
-        get_store().update_user_settings, callback.message.chat.id, default_interval=next_interval
-    )
+    await get_async_store().update_user_settings(callback.message.chat.id, default_interval=next_interval)
     await callback.answer(f"Интервал: {next_interval} мин")
     await show_profile(callback)
 
 
 @router.callback_query(F.data == "settings:notifications:toggle")
 async def toggle_notifications(callback: CallbackQuery) -> None:
-    user = await asyncio.to_thread(get_store().get_user, callback.message.chat.id)
+    user = await get_async_store().get_user(callback.message.chat.id)
     enabled = not bool(user.get("notifications_enabled"))
-    await asyncio.to_thread(
-        get_store().update_user_settings, callback.message.chat.id, notifications_enabled=enabled
-    )
+    await get_async_store().update_user_settings(callback.message.chat.id, notifications_enabled=enabled)
     await callback.answer("Уведомления включены" if enabled else "Уведомления выключены")
     await show_profile(callback)
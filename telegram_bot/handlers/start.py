@@ -11,7 +11,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from telegram_bot.keyboards.main_menu import get_main_menu, get_settings_menu
-from api.bybit_api import BybitAPI
+from api.async_bybit_api import get_async_bybit
 from utils.helpers import parse_account_overview
 from telegram_bot.ui import render_callback_screen, render_command_screen, render_live_screen
 
@@ -51,23 +51,19 @@ async def callback_main_menu(callback: CallbackQuery, state: FSMContext):
     await render_callback_screen(callback.message, "📊 <b>Главное меню</b>", get_main_menu())
 
 
-def build_balance_view():
+async def build_balance_view():
     """Load the current Unified Account balance for the live dashboard."""
-    bybit = BybitAPI()
-    try:
-        overview = parse_account_overview(bybit.get_wallet_balance())
-        return (
-            "💰 <b>Баланс аккаунта</b> <i>• обновление 10с</i>\n\n"
-            f"💵 <b>Wallet Balance:</b> <code>${overview['balance_usd']:.2f}</code>\n"
-            f"📊 <b>Equity:</b> <code>${overview['equity_usd']:.2f}</code>\n"
-            f"📈 <b>Unrealized PnL:</b> <code>${overview['unrealized_pnl_usd']:+.2f}</code>\n"
-            f"🔒 <b>Маржа позиций:</b> <code>${overview['position_margin_usd']:.2f}</code>\n"
-            f"📋 <b>Маржа ордеров:</b> <code>${overview['order_margin_usd']:.2f}</code>\n"
-            f"✅ <b>Доступно:</b> <code>${overview['available_usd']:.2f}</code>",
-            get_main_menu(),
-        )
-    finally:
-        bybit.close()
+    overview = parse_account_overview(await get_async_bybit().get_wallet_balance())
+    return (
+        "💰 <b>Баланс аккаунта</b> <i>• обновление 10с</i>\n\n"
+        f"💵 <b>Wallet Balance:</b> <code>${overview['balance_usd']:.2f}</code>\n"
+        f"📊 <b>Equity:</b> <code>${overview['equity_usd']:.2f}</code>\n"
+        f"📈 <b>Unrealized PnL:</b> <code>${overview['unrealized_pnl_usd']:+.2f}</code>\n"
+        f"🔒 <b>Маржа позиций:</b> <code>${overview['position_margin_usd']:.2f}</code>\n"
+        f"📋 <b>Маржа ордеров:</b> <code>${overview['order_margin_usd']:.2f}</code>\n"
+        f"✅ <b>Доступно:</b> <code>${overview['available_usd']:.2f}</code>",
+        get_main_menu(),
+    )
 
 
 @router.callback_query(F.data == "menu:balance")
@@ -75,11 +71,7 @@ async def callback_balance(callback: CallbackQuery):
     """Показать баланс аккаунта"""
     await callback.answer("Обновляю баланс...")
 
-    async def load_balance():
-        import asyncio
-        return await asyncio.to_thread(build_balance_view)
-
-    await render_live_screen(callback.message, load_balance, interval_seconds=10)
+    await render_live_screen(callback.message, build_balance_view, interval_seconds=10)
 
 
 @router.callback_query(F.data == "menu:settings")
@@ -47,14 +47,7 @@ async def shutdown_ai_tasks() -> None:
 
 
 def _read_fee_rates(bybit: BybitAPI) -> dict[str, Decimal]:
-    rates: dict[str, Decimal] = {}
-    for token in TRADABLE_TOKENS[:3]:
-        symbol = f"{token}USDT"
-        try:
-            rates[symbol] = bybit.get_fee_rate(symbol)
-        except Exception:
-            rates[symbol] = D(FALLBACK_TAKER_FEE_RATE)
-    return rates
+    return bybit.get_taker_fee_rates([f"{token}USDT" for token in TRADABLE_TOKENS[:3]])
 
 
 def build_ai_recommendations() -> tuple[str, InlineKeyboardMarkup]:
@@ -325,10 +325,9 @@ async def _remember(message: Message) -> None:
     chat_id = message.chat.id
     _screen_messages[chat_id] = message.message_id
     try:
-        from storage.database import get_store
+        from storage.database import get_async_store
 
-        await asyncio.to_thread(
-            get_store().save_screen,
+        await get_async_store().save_screen(
             chat_id,
             message.message_id,
             _screen_revisions.get(chat_id, 0),
@@ -339,10 +338,9 @@ async def _remember(message: Message) -> None:
 
 async def _persist_screen(chat_id: int, message_id: int) -> None:
     try:
-        from storage.database import get_store
+        from storage.database import get_async_store
 
-        await asyncio.to_thread(
-            get_store().save_screen,
+        await get_async_store().save_screen(
             chat_id,
             message_id,
             _screen_revisions.get(chat_id, 0),
@@ -361,9 +359,9 @@ async def _deactivate_target(chat_id: int) -> None:
     _rich_disabled_revisions.pop(chat_id, None)
     _event_banners.pop(chat_id, None)
     try:
-        from storage.database import get_store
+        from storage.database import get_async_store
 
-        await asyncio.to_thread(get_store().deactivate_chat, chat_id)
+        await get_async_store().deactivate_chat(chat_id)
     except Exception as error:
         logger.warning(f"Не удалось деактивировать Telegram target {chat_id}: {error}")
 
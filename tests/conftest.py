@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Never touch the real database under data/ while testing.
+os.environ.setdefault(
+    "CRYPTO_DB_PATH", str(Path(tempfile.mkdtemp(prefix="crypto-bot-tests-")) / "bot.sqlite3")
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,136 @@
+"""Parity of the linear-time series with the original scalar helpers."""
+
+import math
+
+import numpy as np
+import pytest
+
+from core.indicators import atr_series, ema_series, last_value, macd_series, rsi_series
+from core.market_data import calculate_ema, calculate_macd, calculate_rsi
+
+
+# Reference implementations: the scalar helpers before the series rewrite,
+# including the O(n^2) MACD that recomputed both EMAs for every prefix.
+def reference_ema(prices, period):
+    if not len(prices):
+        return 0.0
+    if len(prices) < period:
+        return float(sum(prices) / len(prices))
+    values = np.asarray(prices, dtype=float)
+    ema = float(values[:period].mean())
+    multiplier = 2 / (period + 1)
+    for price in values[period:]:
+        ema = (float(price) - ema) * multiplier + ema
+    return float(ema)
+
+
+def reference_rsi(prices, period=14):
+    if len(prices) < period + 1:
+        return 50.0
+    deltas = np.diff(prices)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    average_gain = float(gains[:period].mean())
+    average_loss = float(losses[:period].mean())
+    for index in range(period, len(deltas)):
+        average_gain = (average_gain * (period - 1) + float(gains[index])) / period
+        average_loss = (average_loss * (period - 1) + float(losses[index])) / period
+    if average_loss == 0:
+        return 50.0 if average_gain == 0 else 100.0
+    relative_strength = average_gain / average_loss
+    return float(100 - (100 / (1 + relative_strength)))
+
+
+def reference_macd(prices, fast=12, slow=26, signal=9):
+    if len(prices) < slow + signal - 1:
+        return 0.0, 0.0
+    history = [
+        reference_ema(prices[:index], fast) - reference_ema(prices[:index], slow)
+        for index in range(slow, len(prices) + 1)
+    ]
+    return float(history[-1]), float(reference_ema(history, signal))
+
+
+def reference_atr(highs, lows, closes, period=14):
+    if len(closes) < period + 1:
+        return 0.0
+    true_ranges = [
+        max(
+            highs[index] - lows[index],
+            abs(highs[index] - closes[index - 1]),
+            abs(lows[index] - closes[index - 1]),
+        )
+        for index in range(1, len(closes))
+    ]
+    atr = float(np.mean(true_ranges[:period]))
+    for value in true_ranges[period:]:
+        atr = (atr * (period - 1) + value) / period
+    return atr
+
+
+def _walk(seed, length=90):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(scale=1.5, size=length))
+    spread = rng.uniform(0.1, 2.0, size=length)
+    return (closes + spread).tolist(), (closes - spread).tolist(), closes.tolist()
+
+
+SERIES = [
+    pytest.param(_walk(seed)[2], id=f"walk-{seed}") for seed in (1, 2, 3)
+] + [
+    pytest.param([100.0] * 40, id="flat"),
+    pytest.param([100.0 + index for index in range(40)], id="rising"),
+]
+
+
+@pytest.mark.parametrize("prices", SERIES)
+@pytest.mark.parametrize("period", [1, 5, 20, 50])
+def test_ema_series_matches_every_prefix(prices, period):
+    series = ema_series(prices, period)
+    for length in range(len(prices) + 1):
+        expected = reference_ema(prices[:length], period)
+        assert calculate_ema(prices[:length], period) == expected
+        if length >= period:
+            assert series[length - 1] == expected
+        elif length:
+            assert math.isnan(series[length - 1])
+
+
+@pytest.mark.parametrize("prices", SERIES)
+def test_rsi_series_matches_every_prefix(prices):
+    series = rsi_series(prices)
+    for length in range(len(prices) + 1):
+        expected = reference_rsi(prices[:length])
+        assert calculate_rsi(prices[:length]) == expected
+        assert last_value(series[:length], 50.0) == expected
+
+
+@pytest.mark.parametrize("prices", SERIES)
+def test_macd_series_matches_quadratic_reference(prices):
+    line, signal_line, histogram = macd_series(prices)
+    for length in range(len(prices) + 1):
+        expected = reference_macd(prices[:length])
+        assert calculate_macd(prices[:length]) == expected
+        if length >= 26 + 9 - 1:
+            assert (line[length - 1], signal_line[length - 1]) == expected
+            assert histogram[length - 1] == expected[0] - expected[1]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_atr_series_matches_every_prefix(seed):
+    highs, lows, closes = _walk(seed)
+    series = atr_series(highs, lows, closes)
+    for length in range(len(closes) + 1):
+        expected = reference_atr(highs[:length], lows[:length], closes[:length])
+        assert last_value(series[:length], 0.0) == expected
+
+
+def test_short_inputs_fall_back_to_defaults():
+    assert calculate_ema([], 20) == 0.0
+    assert calculate_ema([1.0, 2.0, 3.0], 20) == 2.0
+    assert calculate_rsi([100.0] * 14) == 50.0
+    assert calculate_macd([100.0] * 33) == (0.0, 0.0)
+    assert last_value(np.array([]), 7.0) == 7.0
+    assert last_value(rsi_series([1.0, 2.0]), 50.0) == 50.0
+    assert last_value(atr_series([2.0], [1.0], [1.5]), 0.0) == 0.0
+    assert np.isnan(ema_series([1.0, 2.0], 3)).all()
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from api import rate_limit
+from api.rate_limit import (
+    PRIORITY_BACKFILL,
+    PRIORITY_NORMAL,
+    PRIORITY_ORDER,
+    RequestLimiter,
+    TokenBucket,
+)
+
+
+@pytest.mark.parametrize("priority", [PRIORITY_ORDER, PRIORITY_NORMAL, PRIORITY_BACKFILL])
+def test_one_request_per_second_endpoint_serves_every_priority(priority):
+    group = TokenBucket(50.0)
+    endpoint = TokenBucket(50.0)
+    endpoint.observe({"X-Bapi-Limit": "1"})
+    endpoint.tokens = endpoint.capacity
+    limiter = RequestLimiter(group, endpoint, priority)
+
+    assert limiter.reserve() == 0.0
+
+
+def test_reserve_keeps_headroom_for_orders():
+    group = TokenBucket(10.0)
+    endpoint = TokenBucket(10.0)
+    backfill = RequestLimiter(group, endpoint, PRIORITY_BACKFILL)
+    order = RequestLimiter(group, endpoint, PRIORITY_ORDER)
+
+    while backfill.reserve() == 0.0:
+        pass
+
+    assert group.tokens >= 5.0
+    assert order.reserve() == 0.0
+
+
+def test_acquire_fails_instead_of_waiting_forever(monkeypatch):
+    monkeypatch.setattr(rate_limit, "MAX_ACQUIRE_WAIT_SECONDS", 0.05)
+    endpoint = TokenBucket(10.0)
+    endpoint._blocked_until = time.monotonic() + 60.0
+    limiter = RequestLimiter(TokenBucket(10.0), endpoint, PRIORITY_NORMAL)
+
+    with pytest.raises(TimeoutError):
+        limiter.acquire()
@@ -0,0 +1,89 @@
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from storage.database import SQLiteStore
+
+CHAT_ID = 42
+
+
+def _user(first_name="Ann"):
+    return SimpleNamespace(id=CHAT_ID, username="ann", first_name=first_name, last_name="")
+
+
+@pytest.fixture(params=[False, True], ids=["direct", "writer"])
+def store(request, tmp_path):
+    store = SQLiteStore(tmp_path / "bot.sqlite3")
+    if request.param:
+        store.start_writer()
+    store.ensure_user(_user(), CHAT_ID)
+    yield store
+    store.close()
+
+
+def test_settings_change_is_visible_to_the_next_read(store):
+    assert store.get_user(CHAT_ID)["notifications_enabled"] == 1
+    assert store.cached_user(CHAT_ID) is not None
+
+    store.update_user_settings(CHAT_ID, notifications_enabled=False)
+
+    assert store.cached_user(CHAT_ID) is None
+    assert store.get_user(CHAT_ID)["notifications_enabled"] == 0
+    assert store.cached_user(CHAT_ID)["notifications_enabled"] == 0
+
+
+def test_read_racing_an_update_is_not_cached(store, monkeypatch):
+    reader = store._reader
+    raced = []
+
+    @contextmanager
+    def racing_reader():
+        with reader() as conn:
+            yield conn
+        # The row is read; commit an update before get_user caches it.
+        if not raced:
+            raced.append(True)
+            update = threading.Thread(
+                target=store.update_user_settings,
+                args=(CHAT_ID,),
+                kwargs={"default_symbol": "ETH"},
+            )
+            update.start()
+            update.join()
+
+    monkeypatch.setattr(store, "_reader", racing_reader)
+    stale = store.get_user(CHAT_ID)
+
+    assert raced and stale["default_symbol"] != "ETH"
+    assert store.cached_user(CHAT_ID) is None
+    assert store.get_user(CHAT_ID)["default_symbol"] == "ETH"
+
+
+def test_deactivated_chat_is_reactivated_by_its_next_update(store):
+    assert store.touch_user(_user(), CHAT_ID)
+
+    store.deactivate_chat(CHAT_ID)
+
+    assert store.get_user(CHAT_ID)["is_active"] == 0
+    assert not store.touch_user(_user(), CHAT_ID)
+    store.ensure_user(_user(), CHAT_ID)
+    assert store.get_user(CHAT_ID)["is_active"] == 1
+
+
+def test_upsert_racing_deactivation_is_not_remembered(store, monkeypatch):
+    upsert = SQLiteStore._upsert_user
+
+    def upsert_then_deactivate(self, *args, **kwargs):
+        upsert(self, *args, **kwargs)
+        self.deactivate_chat(CHAT_ID)
+
+    monkeypatch.setattr(SQLiteStore, "_upsert_user", upsert_then_deactivate)
+    store.ensure_user(_user("Renamed"), CHAT_ID)
+    monkeypatch.undo()
+
+    assert store.get_user(CHAT_ID)["is_active"] == 0
+    assert not store.touch_user(_user("Renamed"), CHAT_ID)
+    store.ensure_user(_user("Renamed"), CHAT_ID)
+    assert store.get_user(CHAT_ID)["is_active"] == 1
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import math
+from decimal import Decimal
 from typing import Any, Iterable, Optional, Tuple
 
+from api.bybit_api import cached_taker_fee_rates
 from config import FALLBACK_TAKER_FEE_RATE, MAX_LEVERAGE
-from core.risk_engine import portfolio_risk_usd
+from core.risk_engine import D, portfolio_risk_usd
 
 
 def to_float(value: Any, default: float = 0.0) -> float:
@@ -152,18 +154,29 @@ def validate_sl_vs_liquidation(
     return True, None
 
 
+def _positions_fee_rate(positions: list[dict]) -> Decimal:
+    """Highest known taker fee of these symbols, never below the fallback."""
+    rates = cached_taker_fee_rates()
+    symbols = {str(position.get("symbol", "")).upper() for position in positions}
+    return max(
+        [D(FALLBACK_TAKER_FEE_RATE), *(rates[symbol] for symbol in symbols if symbol in rates)]
+    )
+
+
 def calculate_position_risk(positions: Iterable[dict]) -> float:
+    positions = list(positions)
     risk, _ = portfolio_risk_usd(
         positions,
-        taker_fee_rate=FALLBACK_TAKER_FEE_RATE,
+        taker_fee_rate=_positions_fee_rate(positions),
     )
     return float(risk)
 
 
 def find_unprotected_positions(positions: Iterable[dict]) -> list[str]:
+    positions = list(positions)
     _, symbols = portfolio_risk_usd(
         positions,
-        taker_fee_rate=FALLBACK_TAKER_FEE_RATE,
+        taker_fee_rate=_positions_fee_rate(positions),
     )
     return symbols
 